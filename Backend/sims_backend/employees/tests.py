@@ -1,3 +1,45 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from inventory.models import Item, Tool
+from item_issuance.models import IssueItem, IssueRecord, ToolCustody
+from users.models import CustomUser
+
+from .models import Employee
+
+
+class FireEmployeeTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _hold_tool(self, name, returnable):
+        item = Item.objects.create(name=name, category="tool", unit="pcs", quantity_to_add=5)
+        Tool.objects.create(item=item, condition="Good", returnable=returnable)
+        record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="tool", status="Issued"
+        )
+        issue_item = IssueItem.objects.create(issue_record=record, item=item, quantity_issued=1)
+        ToolCustody.objects.get_or_create(
+            issue_item=issue_item, defaults={"employee": self.employee, "outstanding_quantity": 1}
+        )
+
+    def test_fire_ignores_non_returnable_tools(self):
+        self._hold_tool("Sandpaper", returnable=False)
+
+        response = self.client.post(f"/api/employees/{self.employee.pk}/fire/")
+
+        self.assertEqual(response.status_code, 200)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.status, "Inactive")
+
+    def test_fire_refused_while_holding_a_returnable_tool(self):
+        self._hold_tool("Hammer", returnable=True)
+
+        response = self.client.post(f"/api/employees/{self.employee.pk}/fire/")
+
+        self.assertEqual(response.status_code, 400)
+        self.employee.refresh_from_db()
+        self.assertNotEqual(self.employee.status, "Inactive")
@@ -50,6 +50,14 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Non-returnable tools stay in custody for good; returns refuse them
+        held = employee.tool_custody.filter(issue_item__item__tool__returnable=True).count()
+        if held:
+            return Response(
+                {"error": f"Employee still holds {held} tool{'s' if held != 1 else ''}. Record the returns before marking them inactive."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         employee.status = "Inactive"
         employee.save(update_fields=["status"])
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Item, Fuel, Vehicle, Tool, Material
+from .models import Item, Fuel, Vehicle, Tool, Material, StockMovement, LowStockItem
 
 
 @admin.register(Item)
@@ -33,4 +33,24 @@ class ToolAdmin(admin.ModelAdmin):
 @admin.register(Material)
 class MaterialAdmin(admin.ModelAdmin):
     list_display = ("item",)
-    list_select_related = ("item",)
\ No newline at end of file
+    list_select_related = ("item",)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("item", "movement_type", "quantity", "balance_after", "reference", "created_by", "created_at")
+    list_filter = ("movement_type",)
+    search_fields = ("item__name", "reference")
+    list_select_related = ("item", "created_by")
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LowStockItem)
+class LowStockItemAdmin(admin.ModelAdmin):
+    list_display = ("item", "quantity_in_stock", "reorder_level", "since")
+    list_select_related = ("item",)
@@ -0,0 +1,113 @@
+# inventory/catalog.py
+"""
+Flat read projection of the item catalog.
+
+Tool and vehicle details are pulled in through joins on the same
+``.values()`` query instead of separate lookups, so listing a page of items
+costs a single query.
+"""
+from django.db.models import F
+from rest_framework import serializers
+
+from .models import Item
+
+ITEM_COLUMNS = (
+    "id", "name", "category", "unit", "quantity_in_stock", "quantity_to_add",
+    "reorder_level", "requires_approval", "created_at",
+)
+
+TOOL_ANNOTATIONS = {
+    "tool_id": F("tool__id"),
+    "tool_uses_fuel": F("tool__uses_fuel"),
+    "tool_returnable": F("tool__returnable"),
+    "tool_condition": F("tool__condition"),
+    "tool_fuel_id": F("tool__fuel_type_id"),
+    "tool_fuel_item_id": F("tool__fuel_type__item_id"),
+    "tool_fuel_name": F("tool__fuel_type__item__name"),
+    "tool_fuel_unit": F("tool__fuel_type__item__unit"),
+}
+
+VEHICLE_ANNOTATIONS = {
+    "vehicle_id": F("vehicle__id"),
+    "vehicle_plate_number": F("vehicle__plate_number"),
+    "vehicle_fuel_id": F("vehicle__fuel_type_id"),
+    "vehicle_fuel_item_id": F("vehicle__fuel_type__item_id"),
+    "vehicle_fuel_name": F("vehicle__fuel_type__item__name"),
+    "vehicle_fuel_unit": F("vehicle__fuel_type__item__unit"),
+}
+
+# Output fields that need the tool / vehicle joins
+TOOL_FIELDS = {"uses_fuel", "returnable", "condition", "fuel_type", "fuel_type_display"}
+VEHICLE_FIELDS = {"vehicle_display", "plate_number", "fuel_type", "fuel_type_display"}
+
+CATEGORY_DISPLAY = dict(Item.CATEGORY_CHOICES)
+
+_decimal = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def parse_fields(raw):
+    """Turn ``?fields=a,b`` into a set, or None when every field is wanted."""
+    if not raw:
+        return None
+    return {f.strip() for f in raw.split(",") if f.strip()}
+
+
+def catalog_queryset(queryset, fields=None):
+    """Project ``queryset`` to plain rows with tool/vehicle details joined in."""
+    annotations = {}
+    if fields is None or fields & TOOL_FIELDS:
+        annotations.update(TOOL_ANNOTATIONS)
+    if fields is None or fields & VEHICLE_FIELDS:
+        annotations.update(VEHICLE_ANNOTATIONS)
+    return queryset.select_related(None).values(*ITEM_COLUMNS, **annotations)
+
+
+def _fuel(fuel_id, name, unit):
+    return {"id": fuel_id, "name": name, "unit": unit}
+
+
+def catalog_row(row, fields=None):
+    """Shape one projected row like ``ItemSerializer`` plus the tool/vehicle extras."""
+    def decimal(value):
+        return _decimal.to_representation(value) if value is not None else None
+
+    data = {
+        "id": row["id"],
+        "name": row["name"],
+        "category": row["category"],
+        "category_display": CATEGORY_DISPLAY.get(row["category"], row["category"]),
+        "unit": row["unit"],
+        "quantity_in_stock": decimal(row["quantity_in_stock"]),
+        "quantity_to_add": decimal(row["quantity_to_add"]),
+        "reorder_level": decimal(row["reorder_level"]),
+        "requires_approval": row["requires_approval"],
+        "created_at": _datetime.to_representation(row["created_at"]) if row["created_at"] else None,
+        "vehicle_display": None,
+        "fuel_type_display": None,
+    }
+
+    if row["category"] == "tool" and row.get("tool_id") is not None:
+        if row["tool_fuel_id"] is not None:
+            data["fuel_type_display"] = _fuel(row["tool_fuel_item_id"], row["tool_fuel_name"], row["tool_fuel_unit"])
+        data.update({
+            "uses_fuel": row["tool_uses_fuel"],
+            "returnable": row["tool_returnable"],
+            "condition": row["tool_condition"],
+            "fuel_type": _fuel(row["tool_fuel_id"], row["tool_fuel_name"], row["tool_fuel_unit"])
+            if row["tool_uses_fuel"] and row["tool_fuel_id"] is not None else None,
+        })
+
+    if row["category"] == "vehicle" and row.get("vehicle_id") is not None:
+        if row["vehicle_fuel_id"] is not None:
+            data["fuel_type_display"] = _fuel(row["vehicle_fuel_item_id"], row["vehicle_fuel_name"], row["vehicle_fuel_unit"])
+        data.update({
+            "vehicle_display": f"{row['name'].capitalize()} ({row['vehicle_plate_number']})",
+            "plate_number": row["vehicle_plate_number"],
+            "fuel_type": _fuel(row["vehicle_fuel_id"], row["vehicle_fuel_name"], row["vehicle_fuel_unit"])
+            if row["vehicle_fuel_id"] is not None else None,
+        })
+
+    if fields is not None:
+        data = {key: value for key, value in data.items() if key in fields}
+    return data
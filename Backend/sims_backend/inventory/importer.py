@@ -0,0 +1,319 @@
+# inventory/importer.py
+"""
+Streaming bulk import of catalog items from CSV or XLSX.
+
+Rows are read lazily and written in chunks with ``bulk_create``. Duplicates
+are detected against (name, category) pairs and plate numbers loaded once up
+front, instead of one ``exists()`` query per row. ``bulk_create`` skips the
+``post_save`` signals, so managers get one summary notification for the whole
+import rather than one per item, and the search index, low-stock set and
+stock valuation are updated in bulk.
+
+Expected columns (header row, case-insensitive):
+    name, category, unit, quantity, reorder_level, unit_cost,
+    plate_number, fuel_type            (vehicles; fuel_type is the fuel name)
+    condition, returnable, uses_fuel   (tools; fuel_type when uses_fuel)
+"""
+import csv
+import io
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from notifications_app.models import Notification
+from search.index import index_instances
+from valuation.costing import open_valuations
+from .lowstock import track_new_items
+from .models import Item, Fuel, Vehicle, Tool, Material, StockMovement, normalize_item_name
+
+User = get_user_model()
+
+DEFAULT_CHUNK_SIZE = 500
+CATEGORIES = {key for key, _ in Item.CATEGORY_CHOICES}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class ImportFormatError(ValueError):
+    """Raised when the uploaded file cannot be read as CSV or XLSX."""
+
+
+# ----------------------------- READERS -----------------------------
+
+def _clean_header(header):
+    return [str(h or "").strip().lower() for h in header]
+
+
+def iter_csv_rows(fileobj):
+    """Yield dict rows from a binary or text CSV stream."""
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = _clean_header(next(reader, []))
+    for values in reader:
+        if any(v.strip() for v in values):
+            yield dict(zip(header, values))
+
+
+def iter_xlsx_rows(fileobj):
+    """Yield dict rows from the first sheet of an XLSX workbook in read-only mode."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import requires the openpyxl package.")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _clean_header(next(rows, []))
+        for values in rows:
+            if any(v not in (None, "") for v in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_rows(fileobj)
+    if name.endswith(".xlsx"):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError("Unsupported file type. Upload a .csv or .xlsx file.")
+
+
+# ----------------------------- PARSING -----------------------------
+
+def _text(row, key):
+    value = row.get(key)
+    return str(value).strip() if value not in (None, "") else ""
+
+
+def _decimal(row, key):
+    value = _text(row, key)
+    if not value:
+        return None
+    try:
+        number = Decimal(value).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Invalid {key} '{value}'.")
+    # "nan" quantizes fine but cannot be compared or stored
+    if not number.is_finite():
+        raise ValueError(f"Invalid {key} '{value}'.")
+    return number
+
+
+def _bool(row, key, default):
+    value = _text(row, key).lower()
+    return value in TRUE_VALUES if value else default
+
+
+# ----------------------------- IMPORTER -----------------------------
+
+class ItemImporter:
+    """Import item rows in chunks. Use ``run(rows)`` and read the returned stats."""
+
+    def __init__(self, user=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.existing = set(Item.objects.exclude(category="vehicle").values_list("name", "category"))
+        self.plates = set(Vehicle.objects.values_list("plate_number", flat=True))
+        self.fuels = {fuel.item.name: fuel for fuel in Fuel.objects.select_related("item")}
+        self.stats = {"rows": 0, "created": 0, "duplicates": 0, "low_stock": 0, "errors": []}
+
+    def run(self, rows):
+        started = time.perf_counter()
+        rows = iter(rows)
+        line = 1  # header
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk, first_line=line + 1)
+            line += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["rows_per_second"] = round(self.stats["rows"] / elapsed, 1) if elapsed else None
+        if self.stats["created"]:
+            self._notify()
+        return self.stats
+
+    # ------------------- chunk handling -------------------
+    def _import_chunk(self, chunk, first_line):
+        pending = []
+        pending_fuels = set()
+        for line, row in enumerate(chunk, start=first_line):
+            self.stats["rows"] += 1
+            try:
+                parsed = self._parse(row, pending_fuels)
+            except ValueError as e:
+                self.stats["errors"].append({"line": line, "error": str(e)})
+                continue
+            if parsed is None:
+                self.stats["duplicates"] += 1
+                continue
+            pending.append(parsed)
+            if parsed["item"].category == "fuel":
+                pending_fuels.add(parsed["item"].name)
+
+        if pending:
+            with transaction.atomic():
+                self._create(pending)
+            self.stats["created"] += len(pending)
+
+    def _parse(self, row, pending_fuels):
+        """Validate one row. Returns None for duplicates, raises ValueError for bad rows."""
+        name = normalize_item_name(_text(row, "name"))
+        category = _text(row, "category").lower()
+        if not name:
+            raise ValueError("Name is required.")
+        if category not in CATEGORIES:
+            raise ValueError(f"Invalid category '{category}'.")
+
+        item = Item(
+            name=name,
+            category=category,
+            unit=_text(row, "unit") or None,
+            quantity_in_stock=_decimal(row, "quantity") or Decimal("0"),
+            reorder_level=_decimal(row, "reorder_level"),
+        )
+        parsed = {"item": item, "unit_cost": _decimal(row, "unit_cost")}
+
+        if item.quantity_in_stock < 0:
+            raise ValueError("Quantity cannot be negative.")
+        if parsed["unit_cost"] is not None and parsed["unit_cost"] < 0:
+            raise ValueError("Unit cost cannot be negative.")
+
+        if category == "vehicle":
+            plate = _text(row, "plate_number")
+            if not plate:
+                raise ValueError("Vehicle must have a plate number.")
+            if plate in self.plates:
+                return None
+            fuel_name = normalize_item_name(_text(row, "fuel_type"))
+            if not fuel_name:
+                raise ValueError("Vehicle must have a fuel type.")
+            self._check_fuel(fuel_name, pending_fuels)
+            item.quantity_in_stock = Decimal("1")
+            item.reorder_level = Decimal("0")
+            parsed.update(plate_number=plate, fuel_name=fuel_name)
+            self.plates.add(plate)
+            return parsed
+
+        if (name, category) in self.existing:
+            return None
+
+        if category == "tool":
+            uses_fuel = _bool(row, "uses_fuel", False)
+            fuel_name = normalize_item_name(_text(row, "fuel_type")) if uses_fuel else ""
+            if uses_fuel and not fuel_name:
+                raise ValueError("Fuel type required for fuel-using tools.")
+            if fuel_name:
+                self._check_fuel(fuel_name, pending_fuels)
+            parsed.update(
+                condition=_text(row, "condition") or "New",
+                returnable=_bool(row, "returnable", True),
+                uses_fuel=uses_fuel,
+                fuel_name=fuel_name or None,
+            )
+
+        self.existing.add((name, category))
+        return parsed
+
+    def _check_fuel(self, fuel_name, pending_fuels):
+        if fuel_name not in self.fuels and fuel_name not in pending_fuels:
+            raise ValueError(f"Unknown fuel type '{fuel_name}'.")
+
+    def _create(self, pending):
+        items = [p["item"] for p in pending]
+        Item.objects.bulk_create(items)
+        self._resolve_item_pks(items)
+
+        fuel_items = [item for item in items if item.category == "fuel"]
+        if fuel_items:
+            Fuel.objects.bulk_create([Fuel(item=item) for item in fuel_items])
+            for fuel in Fuel.objects.filter(item__in=fuel_items).select_related("item"):
+                self.fuels[fuel.item.name] = fuel
+
+        Material.objects.bulk_create([Material(item=p["item"]) for p in pending if p["item"].category == "material"])
+        Tool.objects.bulk_create([
+            Tool(
+                item=p["item"],
+                condition=p["condition"],
+                returnable=p["returnable"],
+                uses_fuel=p["uses_fuel"],
+                fuel_type=self.fuels[p["fuel_name"]] if p["fuel_name"] else None,
+            )
+            for p in pending if p["item"].category == "tool"
+        ])
+        Vehicle.objects.bulk_create([
+            Vehicle(item=p["item"], plate_number=p["plate_number"], fuel_type=self.fuels[p["fuel_name"]])
+            for p in pending if p["item"].category == "vehicle"
+        ])
+
+        vehicle_items = [item for item in items if item.category == "vehicle"]
+        vehicles = list(Vehicle.objects.filter(item__in=vehicle_items).select_related("item")) if vehicle_items else []
+        index_instances(items + vehicles)
+        self.stats["low_stock"] += len(track_new_items(items))
+        open_valuations(items, {p["item"].pk: p["unit_cost"] for p in pending if p["unit_cost"] is not None})
+
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                item=item,
+                movement_type=StockMovement.RECEIPT,
+                quantity=item.quantity_in_stock,
+                balance_after=item.quantity_in_stock,
+                note="Opening balance (bulk import)",
+                created_by=self.user,
+            )
+            for item in items if item.quantity_in_stock
+        ])
+
+    def _resolve_item_pks(self, items):
+        """Backends such as MySQL do not return ids from bulk inserts; look them up."""
+        missing = [item for item in items if item.pk is None]
+        if not missing:
+            return
+
+        fresh = {}
+        rows = (
+            Item.objects.filter(name__in={i.name for i in missing}, category__in={i.category for i in missing})
+            .filter(fuel__isnull=True, tool__isnull=True, material__isnull=True, vehicle__isnull=True)
+            .order_by("id")
+            .values_list("id", "name", "category")
+        )
+        for pk, name, category in rows:
+            fresh.setdefault((name, category), []).append(pk)
+
+        # The rows just inserted are the newest ones for each key
+        wanted = {}
+        for item in missing:
+            wanted.setdefault((item.name, item.category), []).append(item)
+        for key, key_items in wanted.items():
+            for item, pk in zip(key_items, fresh[key][-len(key_items):]):
+                item.pk = pk
+
+    def _notify(self):
+        created = self.stats["created"]
+        message = f"Bulk import: {created} new item{'s' if created != 1 else ''} added to the system."
+        if self.stats["low_stock"]:
+            low = self.stats["low_stock"]
+            message += f" {low} of them {'is' if low == 1 else 'are'} below the reorder level."
+        recipients = User.objects.filter(role__in=["ManagingDirector", "StoreManager"])
+        Notification.objects.bulk_create([
+            Notification(
+                user=user,
+                message=message,
+            )
+            for user in recipients
+        ])
+
+
+def import_items(fileobj, filename, user=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Import an uploaded CSV/XLSX file and return the import stats."""
+    return ItemImporter(user=user, chunk_size=chunk_size).run(iter_rows(fileobj, filename))
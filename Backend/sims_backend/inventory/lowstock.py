@@ -0,0 +1,114 @@
+# inventory/lowstock.py
+"""
+Maintenance of the ``LowStockItem`` set and its reorder alerts.
+
+An item enters the set when its stock drops below ``reorder_level`` and
+leaves it when stock is back at or above it. Managers are notified once when
+the item enters the set, not on every movement while it stays low.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from notifications_app.models import Notification
+from .models import Item, LowStockItem
+
+User = get_user_model()
+
+ALERT_ROLES = ["ManagingDirector", "StoreManager"]
+
+
+def is_low(quantity, reorder_level):
+    return reorder_level is not None and quantity is not None and quantity < reorder_level
+
+
+def _tracked(item):
+    return item.category != "vehicle"
+
+
+def _sync(item, balance):
+    """Bring the item's ``LowStockItem`` row in line with ``balance``."""
+    if not is_low(balance, item.reorder_level):
+        LowStockItem.objects.filter(item_id=item.pk).delete()
+        return
+
+    updated = LowStockItem.objects.filter(item_id=item.pk).update(
+        quantity_in_stock=balance, reorder_level=item.reorder_level
+    )
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            LowStockItem.objects.create(item=item, quantity_in_stock=balance, reorder_level=item.reorder_level)
+    except IntegrityError:
+        # A concurrent movement recorded the same crossing first.
+        return
+    item.quantity_in_stock = balance
+    notify_low_stock([item])
+
+
+def record_stock_change(item, previous, balance):
+    """Called for every stock movement; only touches the table around the reorder level."""
+    if not _tracked(item):
+        return
+    if is_low(previous, item.reorder_level) or is_low(balance, item.reorder_level):
+        _sync(item, balance)
+
+
+def refresh_low_stock(item):
+    """Re-check an item after its reorder level (or anything else) was edited."""
+    if not _tracked(item):
+        LowStockItem.objects.filter(item_id=item.pk).delete()
+        return
+    balance = Item.objects.filter(pk=item.pk).values_list("quantity_in_stock", flat=True).first()
+    if balance is not None:
+        _sync(item, balance)
+
+
+def track_new_items(items):
+    """Add freshly bulk-created items that start out low. Returns the rows added."""
+    rows = [
+        LowStockItem(item=item, quantity_in_stock=item.quantity_in_stock, reorder_level=item.reorder_level)
+        for item in items
+        if _tracked(item) and is_low(item.quantity_in_stock, item.reorder_level)
+    ]
+    return LowStockItem.objects.bulk_create(rows)
+
+
+def rebuild_low_stock():
+    """Recompute the whole set from ``Item``. Existing rows keep their ``since``."""
+    low = {
+        pk: (quantity, level)
+        for pk, quantity, level in Item.objects.exclude(category="vehicle")
+        .filter(reorder_level__isnull=False)
+        .values_list("pk", "quantity_in_stock", "reorder_level")
+        if is_low(quantity, level)
+    }
+    with transaction.atomic():
+        LowStockItem.objects.exclude(item_id__in=list(low)).delete()
+        existing = LowStockItem.objects.in_bulk(list(low))
+        for pk, row in existing.items():
+            row.quantity_in_stock, row.reorder_level = low[pk]
+        LowStockItem.objects.bulk_update(existing.values(), ["quantity_in_stock", "reorder_level"])
+        LowStockItem.objects.bulk_create([
+            LowStockItem(item_id=pk, quantity_in_stock=quantity, reorder_level=level)
+            for pk, (quantity, level) in low.items() if pk not in existing
+        ])
+    return len(low)
+
+
+def notify_low_stock(items):
+    """One alert per item that just crossed below its reorder level."""
+    recipients = list(User.objects.filter(role__in=ALERT_ROLES))
+    Notification.objects.bulk_create([
+        Notification(
+            user=user,
+            message=(
+                f"Low stock alert: {item.name.capitalize()} is down to "
+                f"{' '.join(filter(None, [str(item.quantity_in_stock), item.unit]))} "
+                f"(reorder level {item.reorder_level})."
+            ),
+        )
+        for item in items
+        for user in recipients
+    ])
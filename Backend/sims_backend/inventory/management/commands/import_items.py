@@ -0,0 +1,37 @@
+# inventory/management/commands/import_items.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importer import DEFAULT_CHUNK_SIZE, ImportFormatError, import_items
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Bulk import catalog items from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the .csv or .xlsx file")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--user", help="Email of the user recorded on the stock ledger")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = User.objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}")
+
+        try:
+            with open(options["path"], "rb") as fileobj:
+                stats = import_items(fileobj, options["path"], user=user, chunk_size=options["chunk_size"])
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for error in stats["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rows']} rows read, {stats['created']} created, {stats['duplicates']} duplicates, "
+            f"{len(stats['errors'])} errors in {stats['seconds']}s ({stats['rows_per_second']} rows/s)"
+        ))
@@ -0,0 +1,12 @@
+# inventory/management/commands/rebuild_low_stock.py
+from django.core.management.base import BaseCommand
+
+from inventory.lowstock import rebuild_low_stock
+
+
+class Command(BaseCommand):
+    help = "Recompute the low-stock set from current item stock and reorder levels."
+
+    def handle(self, *args, **options):
+        count = rebuild_low_stock()
+        self.stdout.write(self.style.SUCCESS(f"{count} item{'s' if count != 1 else ''} below reorder level."))
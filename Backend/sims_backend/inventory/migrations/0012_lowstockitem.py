@@ -0,0 +1,42 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_low_stock(apps, schema_editor):
+    Item = apps.get_model("inventory", "Item")
+    LowStockItem = apps.get_model("inventory", "LowStockItem")
+    rows = (
+        Item.objects.exclude(category="vehicle")
+        .filter(reorder_level__isnull=False, quantity_in_stock__lt=models.F("reorder_level"))
+        .values_list("pk", "quantity_in_stock", "reorder_level")
+    )
+    LowStockItem.objects.bulk_create([
+        LowStockItem(item_id=pk, quantity_in_stock=quantity, reorder_level=level)
+        for pk, quantity, level in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_stockmovement_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockItem',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='low_stock', serialize=False, to='inventory.item')),
+                ('quantity_in_stock', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('reorder_level', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('since', models.DateTimeField(auto_now_add=True, help_text='When stock last dropped below the reorder level.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['since'],
+            },
+        ),
+        migrations.RunPython(backfill_low_stock, migrations.RunPython.noop),
+    ]
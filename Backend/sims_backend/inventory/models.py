@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import logging
@@ -9,6 +10,11 @@ logger = logging.getLogger(__name__)
 
 # ----------------------------- MODELS -----------------------------
 
+def normalize_item_name(name):
+    """Canonical item name used for storage and duplicate checks."""
+    return (name or "").strip().lower().rstrip("s")
+
+
 class Item(models.Model):
     CATEGORY_CHOICES = [
         ("fuel", "Fuel"),
@@ -26,9 +32,20 @@ class Item(models.Model):
     requires_approval = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(quantity_in_stock__gte=0),
+                name="item_quantity_in_stock_non_negative",
+            )
+        ]
+
     def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        opening_quantity = None
+
         # Normalize name
-        self.name = self.name.strip().lower().rstrip("s")
+        self.name = normalize_item_name(self.name)
 
         # Prevent duplicates for non-vehicle items
         if self.category != "vehicle":
@@ -41,17 +58,38 @@ class Item(models.Model):
             self.quantity_to_add = None
             self.reorder_level = 0  # vehicles always have 0 reorder_level
         else:
-            # Add new quantity if provided
-            if self.quantity_to_add:
-                self.quantity_in_stock += self.quantity_to_add
-                self.quantity_to_add = None
+            # New quantity is posted to the stock ledger; only the opening
+            # balance of a brand new item is written directly.
+            quantity_to_add = self.quantity_to_add
+            self.quantity_to_add = None
+            if quantity_to_add and is_new:
+                self.quantity_in_stock = quantity_to_add
+                opening_quantity = quantity_to_add
 
             # Keep reorder_level as None if not provided
             if self.reorder_level is None:
                 self.reorder_level = None
 
+        # Never write a possibly stale quantity_in_stock back over an existing
+        # row; stock on existing items only changes through inventory.services.
+        if not is_new and self.category != "vehicle" and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "quantity_in_stock"
+            ]
+
         super().save(*args, **kwargs)
 
+        from .lowstock import refresh_low_stock
+        from .services import receive_stock, record_opening_balance
+        if opening_quantity:
+            record_opening_balance(self, opening_quantity)
+        else:
+            if not is_new and self.category != "vehicle" and quantity_to_add:
+                receive_stock(self, quantity_to_add, note="Quantity added on item update")
+            # The reorder level may have moved past the current stock
+            refresh_low_stock(self)
+
     def __str__(self):
         return f"{self.name.capitalize()} ({self.category})"
 
@@ -133,6 +171,69 @@ class Material(models.Model):
         return self.item.name
 
 
+class StockMovement(models.Model):
+    """Append-only ledger of every change to ``Item.quantity_in_stock``."""
+    RECEIPT = "receipt"
+    ISSUE = "issue"
+    RETURN = "return"
+    ADJUSTMENT = "adjustment"
+    MOVEMENT_TYPES = [
+        (RECEIPT, "Receipt"),
+        (ISSUE, "Issue"),
+        (RETURN, "Return"),
+        (ADJUSTMENT, "Adjustment"),
+    ]
+
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="stock_movements")
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, help_text="Signed change applied to stock.")
+    balance_after = models.DecimalField(max_digits=10, decimal_places=2)
+    reference = models.CharField(max_length=100, blank=True, default="")
+    note = models.CharField(max_length=255, blank=True, default="")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="stock_movements"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["item", "created_at"]),
+            models.Index(fields=["movement_type", "created_at"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValidationError("Stock movements are append-only and cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Stock movements are append-only and cannot be deleted.")
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity} of {self.item.name}"
+
+
+class LowStockItem(models.Model):
+    """
+    Items currently below their reorder level.
+
+    A small materialized set kept in step with stock changes by
+    ``inventory.lowstock`` so dashboards never have to scan the catalog.
+    """
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, primary_key=True, related_name="low_stock")
+    quantity_in_stock = models.DecimalField(max_digits=10, decimal_places=2)
+    reorder_level = models.DecimalField(max_digits=10, decimal_places=2)
+    since = models.DateTimeField(auto_now_add=True, help_text="When stock last dropped below the reorder level.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["since"]
+
+    def __str__(self):
+        return f"{self.item.name}: {self.quantity_in_stock} (reorder at {self.reorder_level})"
+
+
 class Employee(models.Model):
     name = models.CharField(max_length=100)
     department = models.CharField(max_length=100)
@@ -179,11 +280,11 @@ class IssuedItem(models.Model):
         is_new = self.pk is None
         self.clean()
 
-        if is_new:
-            self.item.quantity_in_stock -= self.issued_quantity
-            self.item.save()
-
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                from .services import issue_stock
+                issue_stock(self.item, self.issued_quantity, reference=f"issued-item-{self.pk}")
 
     def __str__(self):
         vehicle_info = f" for {self.vehicle.plate_number}" if self.vehicle else ""
@@ -203,15 +304,16 @@ class ReturnedItem(models.Model):
             raise ValidationError(f"Cannot return more than remaining quantity ({self.issued_item.remaining_quantity})")
 
     def save(self, *args, **kwargs):
+        from .services import return_stock
+
         self.clean()
-        self.issued_item.returned_quantity += self.returned_quantity
-        self.issued_item.save()
-        self.issued_item.item.quantity_in_stock += self.returned_quantity
-        self.issued_item.item.save()
-        if self.issued_item.remaining_quantity <= 0:
-            self.issued_item.is_active = False
+        with transaction.atomic():
+            self.issued_item.returned_quantity += self.returned_quantity
+            if self.issued_item.remaining_quantity <= 0:
+                self.issued_item.is_active = False
             self.issued_item.save()
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
+            return_stock(self.issued_item.item, self.returned_quantity, reference=f"returned-item-{self.pk}")
 
     def __str__(self):
         return f"{self.issued_item.item.name} returned by {self.employee.name}"
@@ -0,0 +1,221 @@
+# inventory/services.py
+"""
+Single entry point for every change to ``Item.quantity_in_stock``.
+
+Stock is never edited in Python and saved back. Each change is applied as a
+conditional ``F()`` update, so concurrent issue-outs cannot lose each other's
+writes, and is appended to the ``StockMovement`` ledger in the same
+transaction. Crossings of the reorder level update ``LowStockItem`` and every
+movement is costed by ``valuation.costing``.
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from valuation.costing import record_movement, record_receipts
+from .lowstock import record_stock_change
+from .models import Item, StockMovement
+
+
+class InsufficientStockError(ValidationError):
+    """Raised when an issue would take an item's stock below zero."""
+
+    def __init__(self, item, requested, available):
+        self.item = item
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Insufficient stock for {item.name}. Requested: {requested}, available: {available}"
+        )
+
+
+def to_decimal(value):
+    """
+    Convert user or model input to a two-place Decimal without float drift.
+    Raises ValueError for NaN and infinity, which cannot be stored or compared.
+    """
+    number = value if isinstance(value, Decimal) else Decimal(str(value))
+    if not number.is_finite():
+        raise ValueError(f"{value!r} is not a finite quantity")
+    return number.quantize(Decimal("0.01"))
+
+
+def adjust_stock(item, quantity, movement_type, reference="", user=None, note="", unit_cost=None):
+    """
+    Apply a signed ``quantity`` to ``item`` and record it in the ledger.
+
+    Negative quantities only succeed while enough stock remains; the check and
+    the decrement happen in one UPDATE so the database arbitrates concurrent
+    callers. ``item.quantity_in_stock`` is refreshed with the new balance.
+    ``unit_cost`` prices a receipt; without it the last purchase price is used.
+    """
+    quantity = to_decimal(quantity)
+    if quantity == 0:
+        return None
+
+    with transaction.atomic():
+        rows = Item.objects.filter(pk=item.pk)
+        if quantity < 0:
+            rows = rows.filter(quantity_in_stock__gte=-quantity)
+
+        if not rows.update(quantity_in_stock=F("quantity_in_stock") + quantity):
+            available = Item.objects.filter(pk=item.pk).values_list("quantity_in_stock", flat=True).first()
+            raise InsufficientStockError(item, -quantity, available)
+
+        balance = Item.objects.filter(pk=item.pk).values_list("quantity_in_stock", flat=True).get()
+        item.quantity_in_stock = balance
+        record_stock_change(item, balance - quantity, balance)
+
+        movement = StockMovement.objects.create(
+            item=item,
+            movement_type=movement_type,
+            quantity=quantity,
+            balance_after=balance,
+            reference=reference or "",
+            note=note or "",
+            created_by=user,
+        )
+        record_movement(movement, unit_cost)
+        return movement
+
+
+def receive_stock(item, quantity, **kwargs):
+    """Add received goods to stock."""
+    return adjust_stock(item, abs(to_decimal(quantity)), StockMovement.RECEIPT, **kwargs)
+
+
+def issue_stock(item, quantity, **kwargs):
+    """Take issued goods out of stock, failing if stock would go negative."""
+    return adjust_stock(item, -abs(to_decimal(quantity)), StockMovement.ISSUE, **kwargs)
+
+
+def return_stock(item, quantity, **kwargs):
+    """Put returned goods back into stock."""
+    return adjust_stock(item, abs(to_decimal(quantity)), StockMovement.RETURN, **kwargs)
+
+
+def receive_stock_bulk(quantities, reference="", user=None, note="", unit_costs=None):
+    """
+    Receive many items at once. ``quantities`` maps item id to quantity and
+    the optional ``unit_costs`` maps item id to purchase price.
+
+    The rows are locked once, in id order, the new balances are written with
+    a single ``bulk_update`` and the ledger with a single ``bulk_create``.
+    Either every line is applied or none is. Returns the updated items.
+    """
+    return _add_stock_bulk(quantities, StockMovement.RECEIPT, reference, user, note, unit_costs)
+
+
+def return_stock_bulk(quantities, reference="", user=None, note=""):
+    """Put many items back into stock at once; see ``receive_stock_bulk``."""
+    return _add_stock_bulk(quantities, StockMovement.RETURN, reference, user, note)
+
+
+def _add_stock_bulk(quantities, movement_type, reference, user, note, unit_costs=None):
+    quantities = {int(pk): to_decimal(quantity) for pk, quantity in quantities.items()}
+
+    with transaction.atomic():
+        items = list(Item.objects.select_for_update().filter(pk__in=list(quantities)).order_by("pk"))
+
+        missing = sorted(set(quantities) - {item.pk for item in items})
+        if missing:
+            raise ValidationError(f"Items not found: {', '.join(map(str, missing))}")
+        vehicles = [item.name for item in items if item.category == "vehicle"]
+        if vehicles:
+            raise ValidationError(f"Cannot restock vehicles: {', '.join(vehicles)}")
+
+        previous = {}
+        for item in items:
+            previous[item.pk] = item.quantity_in_stock
+            item.quantity_in_stock += quantities[item.pk]
+        Item.objects.bulk_update(items, ["quantity_in_stock"])
+
+        movements = StockMovement.objects.bulk_create([
+            StockMovement(
+                item=item,
+                movement_type=movement_type,
+                quantity=quantities[item.pk],
+                balance_after=item.quantity_in_stock,
+                reference=reference or "",
+                note=note or "",
+                created_by=user,
+            )
+            for item in items
+        ])
+        record_receipts(movements, unit_costs)
+        for item in items:
+            record_stock_change(item, previous[item.pk], item.quantity_in_stock)
+
+    return items
+
+
+def issue_stock_bulk(lines, user=None, note=""):
+    """
+    Issue many lines at once. ``lines`` is a list of
+    ``(item_id, quantity, reference)``; an item may appear on several lines.
+
+    The rows are locked once, in id order, and the total asked of each item
+    is checked against its stock before anything is written. Balances go out
+    in a single ``bulk_update`` and the ledger in a single ``bulk_create``.
+    Raises ``InsufficientStockError`` for the first item that runs short.
+    Returns the updated items by id.
+    """
+    lines = [(int(pk), abs(to_decimal(quantity)), reference) for pk, quantity, reference in lines]
+    lines = [line for line in lines if line[1]]
+    totals = {}
+    for pk, quantity, _ in lines:
+        totals[pk] = totals.get(pk, Decimal("0")) + quantity
+
+    with transaction.atomic():
+        items = {
+            item.pk: item
+            for item in Item.objects.select_for_update().filter(pk__in=list(totals)).order_by("pk")
+        }
+        missing = sorted(set(totals) - set(items))
+        if missing:
+            raise ValidationError(f"Items not found: {', '.join(map(str, missing))}")
+        for pk in sorted(totals):
+            if items[pk].quantity_in_stock < totals[pk]:
+                raise InsufficientStockError(items[pk], totals[pk], items[pk].quantity_in_stock)
+
+        previous = {pk: item.quantity_in_stock for pk, item in items.items()}
+        movements = []
+        for pk, quantity, reference in lines:
+            item = items[pk]
+            item.quantity_in_stock -= quantity
+            movements.append(StockMovement(
+                item=item,
+                movement_type=StockMovement.ISSUE,
+                quantity=-quantity,
+                balance_after=item.quantity_in_stock,
+                reference=reference or "",
+                note=note or "",
+                created_by=user,
+            ))
+        Item.objects.bulk_update(list(items.values()), ["quantity_in_stock"])
+
+        for movement in StockMovement.objects.bulk_create(movements):
+            record_movement(movement)
+        for item in items.values():
+            record_stock_change(item, previous[item.pk], item.quantity_in_stock)
+
+    return items
+
+
+def record_opening_balance(item, quantity, user=None, unit_cost=None):
+    """Ledger entry for the quantity a new item was created with."""
+    quantity = to_decimal(quantity)
+    with transaction.atomic():
+        record_stock_change(item, Decimal("0"), quantity)
+        movement = StockMovement.objects.create(
+            item=item,
+            movement_type=StockMovement.RECEIPT,
+            quantity=quantity,
+            balance_after=quantity,
+            note="Opening balance",
+            created_by=user,
+        )
+        record_movement(movement, unit_cost)
+        return movement
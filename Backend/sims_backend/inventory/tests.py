@@ -1,3 +1,264 @@
-from django.test import TestCase
+import io
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from notifications_app.models import Notification
+from users.models import CustomUser
+
+from .importer import import_items
+from .models import Fuel, Item, LowStockItem, Material, StockMovement, Tool, Vehicle
+from .serializers import ItemSerializer
+from .services import InsufficientStockError, issue_stock, issue_stock_bulk, receive_stock, receive_stock_bulk
+
+
+class StockServiceTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+
+    def test_opening_balance_is_recorded(self):
+        movement = StockMovement.objects.get(item=self.item)
+        self.assertEqual(movement.movement_type, StockMovement.RECEIPT)
+        self.assertEqual(movement.balance_after, Decimal("10"))
+
+    def test_issue_cannot_take_stock_below_zero(self):
+        with self.assertRaises(InsufficientStockError):
+            issue_stock(self.item, 11)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_in_stock, Decimal("10"))
+
+    def test_stale_item_save_does_not_overwrite_stock(self):
+        stale = Item.objects.get(pk=self.item.pk)
+        receive_stock(self.item, 5)
+        stale.unit = "sacks"
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.quantity_in_stock, Decimal("15"))
+
+    def test_non_finite_quantities_never_reach_the_ledger(self):
+        for quantity in ("NaN", Decimal("NaN"), "Infinity", float("inf")):
+            with self.assertRaises(ValueError):
+                receive_stock(self.item, quantity)
+            with self.assertRaises(ValueError):
+                receive_stock_bulk({self.item.pk: quantity})
+        self.assertEqual(StockMovement.objects.filter(item=self.item).count(), 1)
+
+
+class RestockValidationTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        )
+
+    def test_non_numeric_quantities_are_rejected(self):
+        for quantity in ("NaN", "Infinity"):
+            response = self.client.post(
+                "/api/inventory/items/bulk_restock/",
+                {"items": [{"item_id": self.item.pk, "quantity": quantity}]},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400)
+
+            response = self.client.post(
+                f"/api/inventory/items/{self.item.pk}/restock/", {"quantity_to_add": quantity}, format="json"
+            )
+            self.assertEqual(response.status_code, 400)
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity_in_stock, Decimal("10"))
+
+
+class ItemImporterTests(TestCase):
+    HEADER = "name,category,unit,quantity,reorder_level,unit_cost,plate_number,fuel_type,condition,returnable,uses_fuel\n"
+
+    def setUp(self):
+        self.md = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+
+    def _import(self, body, chunk_size=500):
+        return import_items(io.BytesIO((self.HEADER + body).encode()), "items.csv", chunk_size=chunk_size)
+
+    def test_duplicates_are_skipped(self):
+        stats = self._import(
+            "cement,material,bags,5,,,,,,,\n"     # already in the catalog
+            "Nails,material,kg,5,,,,,,,\n"
+            " nail ,material,kg,9,,,,,,,\n"       # repeated in the file
+            "Nails,tool,pcs,1,,,,,,,\n"           # same name, other category
+        )
+
+        self.assertEqual((stats["created"], stats["duplicates"]), (2, 2))
+        self.assertEqual(Item.objects.get(name="nail", category="material").quantity_in_stock, Decimal("5"))
+
+    def test_subtype_rows_are_created(self):
+        # The fuel is defined in an earlier chunk than the rows using it
+        stats = self._import(
+            "Diesel,fuel,litres,100,,,,,,,\n"
+            "Lorry,vehicle,,,,,KAA 123A,diesel,,,\n"
+            "Saw,tool,pcs,2,,,,diesel,Good,no,yes\n"
+            "Sand,material,tonnes,3,,,,,,,\n",
+            chunk_size=1,
+        )
+
+        self.assertEqual(stats["created"], 4)
+        diesel = Fuel.objects.get(item__name="diesel")
+        vehicle = Vehicle.objects.get(plate_number="KAA 123A")
+        self.assertEqual((vehicle.fuel_type, vehicle.item.quantity_in_stock), (diesel, Decimal("1")))
+        tool = Tool.objects.get(item__name="saw")
+        self.assertEqual((tool.condition, tool.returnable, tool.uses_fuel, tool.fuel_type), ("Good", False, True, diesel))
+        self.assertTrue(Material.objects.filter(item__name="sand").exists())
+        self.assertEqual(StockMovement.objects.filter(item__name="diesel").count(), 1)
+
+    def test_one_summary_notification_per_manager(self):
+        rows = "".join(f"Part {i},material,pcs,1,,,,,,,\n" for i in range(25))
+
+        stats = self._import(rows, chunk_size=10)
+
+        self.assertEqual(stats["created"], 25)
+        notes = Notification.objects.filter(message__startswith="Bulk import")
+        self.assertEqual(sorted(note.user.username for note in notes), ["md", "sm"])
+        self.assertTrue(all("25 new items" in note.message for note in notes))
+
+    def test_bad_cells_are_reported_per_line(self):
+        client = APIClient()
+        client.force_authenticate(self.md)
+        body = (
+            "Nails,material,kg,nan,,,,,,,\n"
+            "Sand,material,tonnes,inf,,,,,,,\n"
+            "Glue,material,tins,2,NaN,,,,,,\n"
+            "Wire,material,rolls,-1,,,,,,,\n"
+            "Tape,material,rolls,4,,,,,,,\n"
+        )
+        upload = io.BytesIO((self.HEADER + body).encode())
+        upload.name = "items.csv"
+
+        response = client.post("/api/inventory/items/import/", {"file": upload})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 3, 4, 5])
+        self.assertFalse(Item.objects.filter(name__in=["nail", "sand", "glue", "wire"]).exists())
+
+
+class ReorderAlertTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        CustomUser.objects.create(username="am", email="am@example.com", role="AccountsManager", password="x")
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=15, reorder_level=10)
+
+    def _alerts(self):
+        return Notification.objects.filter(message__startswith="Low stock alert")
+
+    def test_one_alert_per_crossing(self):
+        issue_stock(self.item, 3)
+        self.assertFalse(self._alerts().exists())
+
+        issue_stock(self.item, 4)
+        issue_stock(self.item, 1)
+        issue_stock_bulk([(self.item.pk, 2, "bulk")])
+        # Both managers were told once; staying low does not repeat it
+        self.assertEqual(sorted(self._alerts().values_list("user__username", flat=True)), ["md", "sm"])
+        self.assertEqual(LowStockItem.objects.get(item=self.item).quantity_in_stock, Decimal("5"))
+
+        receive_stock(self.item, 10)
+        self.assertFalse(LowStockItem.objects.exists())
+
+        issue_stock(self.item, 6)
+        self.assertEqual(self._alerts().count(), 4)
+
+    def test_raising_the_reorder_level_is_a_crossing(self):
+        self.item.reorder_level = 20
+        self.item.save()
+        self.item.save()
+
+        self.assertEqual(self._alerts().count(), 2)
+        row = self.client.get("/api/inventory/low-stock/").data[0]
+        self.assertEqual((row["name"], row["shortfall"]), ("Cement", Decimal("5")))
+
+
+class CatalogListTests(TestCase):
+    URL = "/api/inventory/items/"
+
+    def setUp(self):
+        diesel = Item.objects.create(name="Diesel", category="fuel", unit="litres", quantity_to_add=100)
+        fuel = Fuel.objects.create(item=diesel)
+        for i in range(30):
+            item = Item.objects.create(name=f"Lorry {i}", category="vehicle", unit="unit")
+            Vehicle.objects.create(item=item, plate_number=f"KAA {i}", fuel_type=fuel)
+            saw = Item.objects.create(name=f"Saw {i}", category="tool", unit="pcs", quantity_to_add=2)
+            Tool.objects.create(item=saw, condition="Good", uses_fuel=True, fuel_type=fuel)
+        self.client = APIClient()
+
+    def test_a_page_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.URL, {"page_size": 40})
+        self.assertEqual(response.status_code, 200)
+        categories = {row["category"] for row in response.data["results"]}
+        self.assertEqual(categories, {"fuel", "vehicle", "tool"})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.client.get(response.data["next"]).data["results"]), 21)
+
+        # Without pagination parameters the whole catalog is still one query
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.client.get(self.URL).data), 61)
+
+    def test_rows_match_the_item_serializer(self):
+        lorry = Item.objects.get(name="lorry 1")
+        row = next(row for row in self.client.get(self.URL, {"category": "vehicle", "page_size": 100}).data["results"]
+                   if row["id"] == lorry.pk)
+        self.assertEqual(row["vehicle_display"], "Lorry 1 (KAA 1)")
+        self.assertEqual(row["vehicle_display"], ItemSerializer(lorry).data["vehicle_display"])
+        self.assertEqual(row["fuel_type"]["name"], "diesel")
+
+        slim = self.client.get(self.URL, {"fields": "id,name"}).data[0]
+        self.assertEqual(set(slim), {"id", "name"})
+
+
+class ConcurrentIssueTests(TransactionTestCase):
+    WORKERS = 50
+
+    def _issue_concurrently(self, item, quantity):
+        barrier = threading.Barrier(self.WORKERS)
+        failures = []
+
+        def worker():
+            try:
+                barrier.wait()
+                issue_stock(Item.objects.get(pk=item.pk), quantity)
+            except InsufficientStockError:
+                failures.append(quantity)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return failures
+
+    def test_no_lost_updates(self):
+        item = Item.objects.create(name="Diesel", category="fuel", unit="litres", quantity_to_add=100)
+
+        failures = self._issue_concurrently(item, 1)
+
+        item.refresh_from_db()
+        self.assertEqual(failures, [])
+        self.assertEqual(item.quantity_in_stock, Decimal("50"))
+        self.assertEqual(StockMovement.objects.filter(item=item, movement_type=StockMovement.ISSUE).count(), 50)
+
+    def test_oversubscribed_issues_never_go_negative(self):
+        item = Item.objects.create(name="Petrol", category="fuel", unit="litres", quantity_to_add=30)
+
+        failures = self._issue_concurrently(item, 1)
+
+        item.refresh_from_db()
+        self.assertEqual(len(failures), 20)
+        self.assertEqual(item.quantity_in_stock, Decimal("0"))
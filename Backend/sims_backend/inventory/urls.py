@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ItemViewSet, CategoryListView
+from .views import ItemViewSet, CategoryListView, LowStockView
 
 router = DefaultRouter()
 router.register(r"items", ItemViewSet, basename="item")
@@ -8,4 +8,5 @@ router.register(r"items", ItemViewSet, basename="item")
 urlpatterns = [
     path("", include(router.urls)),
     path("categories/", CategoryListView.as_view(), name="category-list"),
+    path("low-stock/", LowStockView.as_view(), name="low-stock"),
 ]
@@ -3,9 +3,16 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
+from django.core.exceptions import ValidationError
 from django.db import transaction
-from .models import Item, Fuel, Vehicle, Tool, Material, IssuedItem, Employee, ReturnedItem
+from decimal import InvalidOperation
+from .models import Item, Fuel, Vehicle, Tool, Material, IssuedItem, Employee, ReturnedItem, LowStockItem
 from .serializers import ItemSerializer, IssuedItemSerializer, EmployeeSerializer, VehicleSerializer
+from .services import receive_stock, receive_stock_bulk, to_decimal
+from .catalog import catalog_queryset, catalog_row, parse_fields
+from .pagination import ItemCursorPagination
+from .importer import ImportFormatError, import_items
 
 
 # ==========================================================
@@ -14,11 +21,12 @@ from .serializers import ItemSerializer, IssuedItemSerializer, EmployeeSerialize
 class ItemViewSet(viewsets.ModelViewSet):
     serializer_class = ItemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ItemCursorPagination
 
     def get_queryset(self):
         queryset = Item.objects.all().select_related(
             "tool__fuel_type__item", "vehicle__fuel_type__item"
-        ).order_by("name")
+        ).order_by("name", "id")
         category = self.request.query_params.get("category")
         if category:
             queryset = queryset.filter(category=category)
@@ -28,11 +36,10 @@ class ItemViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def restock(self, request, pk=None):
         item = self.get_object()
-        quantity_to_add = request.data.get("quantity_to_add")
 
         try:
-            quantity_to_add = float(quantity_to_add)
-        except (TypeError, ValueError):
+            quantity_to_add = to_decimal(request.data.get("quantity_to_add"))
+        except (TypeError, ValueError, InvalidOperation):
             return Response({"error": "Valid quantity_to_add is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         if quantity_to_add <= 0:
@@ -40,10 +47,60 @@ class ItemViewSet(viewsets.ModelViewSet):
         if item.category == "vehicle":
             return Response({"error": "Cannot restock vehicles"}, status=status.HTTP_400_BAD_REQUEST)
 
-        item.quantity_in_stock += quantity_to_add
-        item.save()
+        receive_stock(item, quantity_to_add, user=request.user, note="Restock")
         return Response({"message": f"{quantity_to_add} units added to {item.name}.", "new_stock": item.quantity_in_stock})
 
+    # ------------------- BULK RESTOCK -------------------
+    @action(detail=False, methods=["post"])
+    def bulk_restock(self, request):
+        lines = request.data.get("items")
+        if not isinstance(lines, list) or not lines:
+            return Response({"error": "items must be a non-empty list of {item_id, quantity}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        quantities = {}
+        for index, line in enumerate(lines):
+            try:
+                item_id = int(line["item_id"])
+                quantity = to_decimal(line["quantity"])
+            except (KeyError, TypeError, ValueError, InvalidOperation):
+                return Response({"error": f"Line {index + 1}: valid item_id and quantity are required"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if quantity <= 0:
+                return Response({"error": f"Line {index + 1}: quantity must be greater than zero"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            # The same item listed twice is received once with the total
+            quantities[item_id] = quantities.get(item_id, 0) + quantity
+
+        try:
+            items = receive_stock_bulk(
+                quantities, reference=request.data.get("reference", ""), user=request.user, note="Bulk restock"
+            )
+        except ValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "message": f"{len(items)} item{'s' if len(items) != 1 else ''} restocked.",
+            "items": [
+                {"item_id": item.pk, "name": item.name, "added": quantities[item.pk], "new_stock": item.quantity_in_stock}
+                for item in items
+            ],
+        })
+
+    # ------------------- BULK IMPORT -------------------
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "A .csv or .xlsx file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stats = import_items(upload.file, upload.name, user=request.user)
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(stats, status=status.HTTP_201_CREATED if stats["created"] else status.HTTP_200_OK)
+
     # ------------------- RETRIEVE -------------------
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -79,43 +136,13 @@ class ItemViewSet(viewsets.ModelViewSet):
 
     # ------------------- LIST -------------------
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        items = self.get_queryset()
-
-        # TOOL MAP
-        tool_map = {
-            t.item_id: {
-                "uses_fuel": t.uses_fuel,
-                "returnable": t.returnable,
-                "condition": t.condition,
-                "fuel_type": {
-                    "id": t.fuel_type.id,
-                    "name": t.fuel_type.item.name,
-                    "unit": t.fuel_type.item.unit,
-                } if t.uses_fuel and t.fuel_type else None
-            } for t in Tool.objects.select_related("fuel_type__item")
-        }
-
-        # VEHICLE MAP
-        vehicle_map = {
-            v.item_id: {
-                "vehicle_display": f"{v.item.name} ({v.plate_number})",
-                "plate_number": v.plate_number,
-                "fuel_type": {
-                    "id": v.fuel_type.id,
-                    "name": v.fuel_type.item.name,
-                    "unit": v.fuel_type.item.unit,
-                } if v.fuel_type else None,
-            } for v in Vehicle.objects.select_related("fuel_type__item")
-        }
+        fields = parse_fields(request.query_params.get("fields"))
+        rows = catalog_queryset(self.filter_queryset(self.get_queryset()), fields)
 
-        for item_data in response.data:
-            if item_data["category"] == "tool" and item_data["id"] in tool_map:
-                item_data.update(tool_map[item_data["id"]])
-            if item_data["category"] == "vehicle" and item_data["id"] in vehicle_map:
-                item_data.update(vehicle_map[item_data["id"]])
-
-        return response
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([catalog_row(row, fields) for row in page])
+        return Response([catalog_row(row, fields) for row in rows])
 
 
 # ==========================================================
@@ -129,6 +156,37 @@ class CategoryListView(APIView):
         return Response(categories)
 
 
+# ==========================================================
+#                   LOW STOCK VIEW
+# ==========================================================
+class LowStockView(APIView):
+    """Items below their reorder level, read from the materialized low-stock set."""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        rows = LowStockItem.objects.order_by("since", "item_id")
+        category = request.query_params.get("category")
+        if category and category != "all":
+            rows = rows.filter(item__category=category)
+
+        return Response([
+            {
+                "id": row["item_id"],
+                "name": row["item__name"].capitalize(),
+                "category": row["item__category"],
+                "unit": row["item__unit"],
+                "quantity_in_stock": row["quantity_in_stock"],
+                "reorder_level": row["reorder_level"],
+                "shortfall": row["reorder_level"] - row["quantity_in_stock"],
+                "since": row["since"],
+            }
+            for row in rows.values(
+                "item_id", "item__name", "item__category", "item__unit",
+                "quantity_in_stock", "reorder_level", "since",
+            )
+        ])
+
+
 # ==========================================================
 #                  FUEL TYPES VIEW
 # ==========================================================
@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import IssueRecord, IssueItem
+from .models import IssueRecord, IssueItem, ToolCustody
 
 admin.site.register(IssueRecord)
 admin.site.register(IssueItem)
+
+
+@admin.register(ToolCustody)
+class ToolCustodyAdmin(admin.ModelAdmin):
+    list_display = ("employee", "issue_item", "outstanding_quantity", "updated_at")
+    search_fields = ("employee__first_name", "employee__last_name", "employee__job_number")
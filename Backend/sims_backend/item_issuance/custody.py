@@ -0,0 +1,57 @@
+# item_issuance/custody.py
+"""
+Maintenance of the ``ToolCustody`` table.
+
+Every change that can move a tool line in or out of custody (issue,
+return, status change) ends in ``sync_custody`` for the affected
+``IssueItem`` rows, in the caller's transaction.
+"""
+from django.db import transaction
+
+from .models import IssueItem, ToolCustody
+
+
+def outstanding(issue_item):
+    """Quantity of ``issue_item`` still held by the employee; 0 once it leaves custody."""
+    if issue_item.item.category != 'tool' or issue_item.issue_record.status not in ToolCustody.STATUSES:
+        return 0
+    return max(issue_item.quantity_issued - issue_item.returned_quantity, 0)
+
+
+def sync_custody(issue_items):
+    """Rewrite the custody rows of ``issue_items`` from their current in-memory state."""
+    issue_items = list(issue_items)
+    if not issue_items:
+        return
+
+    rows = []
+    for issue_item in issue_items:
+        quantity = outstanding(issue_item)
+        if quantity > 0:
+            rows.append(ToolCustody(
+                issue_item=issue_item,
+                employee_id=issue_item.issue_record.issued_to_id,
+                outstanding_quantity=quantity,
+            ))
+
+    with transaction.atomic():
+        ToolCustody.objects.filter(issue_item_id__in=[i.pk for i in issue_items]).delete()
+        ToolCustody.objects.bulk_create(rows)
+
+
+def rebuild_custody():
+    """Recompute the whole table from ``IssueItem``. Returns the number of rows."""
+    issue_items = IssueItem.objects.filter(
+        item__category='tool',
+        issue_record__status__in=ToolCustody.STATUSES,
+    ).select_related('item', 'issue_record')
+
+    rows = [
+        ToolCustody(issue_item=i, employee_id=i.issue_record.issued_to_id, outstanding_quantity=outstanding(i))
+        for i in issue_items.iterator(chunk_size=2000)
+        if outstanding(i) > 0
+    ]
+    with transaction.atomic():
+        ToolCustody.objects.all().delete()
+        ToolCustody.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
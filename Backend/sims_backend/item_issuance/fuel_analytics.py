@@ -0,0 +1,192 @@
+# item_issuance/fuel_analytics.py
+"""
+Fleet fuel analytics.
+
+All issued vehicle-fuel ``IssueItem`` rows are loaded in one query and
+processed with NumPy: each vehicle's km/L series is compared with a rolling
+baseline of its previous fills, and fills more than ``k`` standard
+deviations away are flagged. A sharp drop in km/L is the usual sign of fuel
+going somewhere other than the tank.
+
+Per-vehicle series are cached and dropped when the vehicle's
+``VehicleFuelState`` changes, i.e. when a new fill is issued.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from .models import IssueItem, VehicleFuelState
+
+BASELINE_WINDOW = 6        # previous fills forming the baseline
+MIN_BASELINE_FILLS = 3     # fewer than this and a fill is never flagged
+MIN_STD_RATIO = 0.05       # spread floor as a share of the baseline mean
+DEFAULT_SIGMA = 2.5
+
+CACHE_PREFIX = "fleet-fuel"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def cache_key(vehicle_id):
+    return f"{CACHE_PREFIX}:{vehicle_id}"
+
+
+def invalidate_vehicles(vehicle_ids):
+    cache.delete_many([cache_key(pk) for pk in vehicle_ids])
+
+
+# ----------------------------- MATHS -----------------------------
+
+def sort_fills(vehicles, dates, ids):
+    """Order that sorts fills by vehicle, then date, then id."""
+    return np.lexsort((ids, dates, vehicles))
+
+
+def fill_efficiency(vehicles, odometer, litres):
+    """
+    Distance and km/L of each fill against the previous fill of the same
+    vehicle. Arrays must already be sorted with ``sort_fills``. Efficiency
+    uses the litres of the previous fill (full-tank method).
+
+    Returns ``(previous_odometer, distance, efficiency)``; missing values are NaN.
+    """
+    count = len(vehicles)
+    has_previous = np.zeros(count, dtype=bool)
+    has_previous[1:] = vehicles[1:] == vehicles[:-1]
+
+    previous_odometer = np.full(count, np.nan)
+    previous_odometer[1:] = odometer[:-1]
+    previous_odometer[~has_previous] = np.nan
+    previous_litres = np.full(count, np.nan)
+    previous_litres[1:] = litres[:-1]
+
+    distance = np.where(has_previous, odometer - previous_odometer, 0.0)
+    efficiency = np.full(count, np.nan)
+    valid = has_previous & (previous_litres > 0) & (distance > 0)
+    np.divide(distance, previous_litres, out=efficiency, where=valid)
+    return previous_odometer, distance, efficiency
+
+
+def rolling_baseline(vehicles, efficiency, window=BASELINE_WINDOW):
+    """
+    Mean, standard deviation and size of the baseline for each fill: the
+    valid km/L values among the ``window`` previous fills of the same vehicle.
+
+    The deviation is floored at ``MIN_STD_RATIO`` of the mean so a vehicle
+    with near-identical fills is not flagged for ordinary noise.
+    """
+    count = len(vehicles)
+    valid = ~np.isnan(efficiency)
+    values = np.where(valid, efficiency, 0.0)
+
+    # Exclusive prefix sums: sums[i] covers fills 0..i-1
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    squares = np.concatenate(([0.0], np.cumsum(values ** 2)))
+    sizes = np.concatenate(([0], np.cumsum(valid)))
+
+    index = np.arange(count)
+    starts = np.flatnonzero(np.concatenate(([True], vehicles[1:] != vehicles[:-1])))
+    segment_start = starts[np.searchsorted(starts, index, side="right") - 1]
+    low = np.maximum(index - window, segment_start)
+
+    size = sizes[index] - sizes[low]
+    total = sums[index] - sums[low]
+    total_sq = squares[index] - squares[low]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(size > 0, total / size, np.nan)
+        variance = np.where(size > 0, total_sq / size - mean ** 2, np.nan)
+    std = np.maximum(np.sqrt(np.maximum(variance, 0.0)), MIN_STD_RATIO * mean)
+    return mean, std, size
+
+
+def z_scores(efficiency, mean, std, size):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (efficiency - mean) / std
+    usable = (size >= MIN_BASELINE_FILLS) & (std > 0) & ~np.isnan(efficiency)
+    return np.where(usable, z, np.nan)
+
+
+# ----------------------------- SERIES -----------------------------
+
+def _number(value, places=2):
+    return None if np.isnan(value) else round(float(value), places)
+
+
+def build_series(vehicle_ids=None):
+    """Load issued fuel fills once and return ``{vehicle_id: [fill, ...]}`` in date order."""
+    rows = IssueItem.objects.filter(
+        issue_record__status__in=VehicleFuelState.ISSUED_STATUSES,
+        issue_record__vehicle__isnull=False,
+        item__category="fuel",
+        current_odometer__isnull=False,
+    )
+    if vehicle_ids is not None:
+        rows = rows.filter(issue_record__vehicle_id__in=vehicle_ids)
+    rows = list(rows.values_list(
+        "id", "issue_record__vehicle_id", "issue_record__issue_date", "issue_record__issue_id",
+        "current_odometer", "quantity_issued",
+    ))
+
+    series = {pk: [] for pk in (vehicle_ids or [])}
+    if not rows:
+        return series
+
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    vehicles = np.array([r[1] for r in rows], dtype=np.int64)
+    dates = np.array([r[2].timestamp() for r in rows])
+    order = sort_fills(vehicles, dates, ids)
+
+    vehicles = vehicles[order]
+    odometer = np.array([r[4] for r in rows], dtype=float)[order]
+    litres = np.array([float(r[5]) for r in rows])[order]
+    _, distance, efficiency = fill_efficiency(vehicles, odometer, litres)
+    mean, std, size = rolling_baseline(vehicles, efficiency)
+    z = z_scores(efficiency, mean, std, size)
+
+    for i, row_index in enumerate(order.tolist()):
+        issue_item_id, vehicle_id, issue_date, issue_id, _, quantity = rows[row_index]
+        series.setdefault(vehicle_id, []).append({
+            "issue_item_id": issue_item_id,
+            "issue_id": issue_id,
+            "issue_date": issue_date,
+            "odometer": float(odometer[i]),
+            "litres": float(quantity),
+            "distance_travelled": float(distance[i]),
+            "efficiency": _number(efficiency[i]),
+            "baseline_efficiency": _number(mean[i]),
+            "baseline_std": _number(std[i], 3),
+            "z_score": _number(z[i]),
+        })
+    return series
+
+
+def vehicle_series(vehicle_ids):
+    """Cached series for ``vehicle_ids``; only vehicles missing from the cache are computed."""
+    cached = cache.get_many([cache_key(pk) for pk in vehicle_ids])
+    series = {pk: cached[cache_key(pk)] for pk in vehicle_ids if cache_key(pk) in cached}
+
+    missing = [pk for pk in vehicle_ids if pk not in series]
+    if missing:
+        fresh = build_series(missing)
+        cache.set_many({cache_key(pk): fills for pk, fills in fresh.items()}, CACHE_TIMEOUT)
+        series.update(fresh)
+    return series
+
+
+def flag_anomalies(fills, sigma=DEFAULT_SIGMA):
+    """Copy of ``fills`` with an ``anomaly`` flag on fills beyond ``sigma`` deviations."""
+    return [
+        {**fill, "anomaly": fill["z_score"] is not None and abs(fill["z_score"]) > sigma}
+        for fill in fills
+    ]
+
+
+def summarize(fills):
+    efficiencies = [f["efficiency"] for f in fills if f["efficiency"] is not None]
+    anomalies = [f for f in fills if f["anomaly"]]
+    return {
+        "fills": len(fills),
+        "litres": round(sum(f["litres"] for f in fills), 2),
+        "distance_travelled": round(sum(f["distance_travelled"] for f in fills), 2),
+        "average_efficiency": round(float(np.mean(efficiencies)), 2) if efficiencies else None,
+        "latest_efficiency": efficiencies[-1] if efficiencies else None,
+        "anomalies": len(anomalies),
+    }
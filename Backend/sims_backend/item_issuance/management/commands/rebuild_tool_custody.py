@@ -0,0 +1,12 @@
+# item_issuance/management/commands/rebuild_tool_custody.py
+from django.core.management.base import BaseCommand
+
+from item_issuance.custody import rebuild_custody
+
+
+class Command(BaseCommand):
+    help = "Recompute the tool custody table from issued tool lines and their returns."
+
+    def handle(self, *args, **options):
+        count = rebuild_custody()
+        self.stdout.write(self.style.SUCCESS(f"{count} tool line{'s' if count != 1 else ''} in custody."))
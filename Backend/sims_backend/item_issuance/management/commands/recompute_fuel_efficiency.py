@@ -0,0 +1,81 @@
+# item_issuance/management/commands/recompute_fuel_efficiency.py
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from item_issuance.fuel_analytics import fill_efficiency, invalidate_vehicles, sort_fills
+from item_issuance.models import IssueItem, VehicleFuelState
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute previous_odometer, distance_travelled and efficiency for every issued "
+        "vehicle fuel fill in one sorted pass, and rebuild VehicleFuelState."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = list(
+            IssueItem.objects.filter(
+                issue_record__status__in=VehicleFuelState.ISSUED_STATUSES,
+                issue_record__vehicle__isnull=False,
+                item__category="fuel",
+                current_odometer__isnull=False,
+            ).values_list("id", "issue_record__vehicle_id", "issue_record__issue_date",
+                          "current_odometer", "quantity_issued")
+        )
+        if not rows:
+            VehicleFuelState.objects.all().delete()
+            self.stdout.write("No vehicle fuel fills found.")
+            return
+
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        vehicles = np.array([r[1] for r in rows], dtype=np.int64)
+        dates = np.array([r[2].timestamp() for r in rows])
+        odometer = np.array([r[3] for r in rows], dtype=float)
+        litres = np.array([float(r[4]) for r in rows])
+
+        order = sort_fills(vehicles, dates, ids)
+        ids, vehicles, odometer, litres = ids[order], vehicles[order], odometer[order], litres[order]
+        previous_odometer, distance, efficiency = fill_efficiency(vehicles, odometer, litres)
+
+        def value(array, index):
+            return None if np.isnan(array[index]) else float(array[index])
+
+        items = [
+            IssueItem(
+                pk=int(ids[i]),
+                previous_odometer=value(previous_odometer, i),
+                distance_travelled=float(distance[i]),
+                efficiency=value(efficiency, i),
+            )
+            for i in range(len(ids))
+        ]
+
+        # The last fill of each vehicle becomes its state
+        last = np.flatnonzero(np.append(vehicles[1:] != vehicles[:-1], True))
+        states = [
+            VehicleFuelState(
+                vehicle_id=int(vehicles[i]),
+                last_issue_item_id=int(ids[i]),
+                last_odometer=float(odometer[i]),
+                last_litres=rows[order[i]][4],
+                last_fill_date=rows[order[i]][2],
+            )
+            for i in last
+        ]
+
+        with transaction.atomic():
+            IssueItem.objects.bulk_update(
+                items, ["previous_odometer", "distance_travelled", "efficiency"], batch_size=1000
+            )
+            VehicleFuelState.objects.all().delete()
+            VehicleFuelState.objects.bulk_create(states)
+        invalidate_vehicles(np.unique(vehicles).tolist())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {len(items)} fuel fills for {len(states)} vehicles "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
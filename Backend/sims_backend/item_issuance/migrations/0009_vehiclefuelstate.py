@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_lowstockitem'),
+        ('item_issuance', '0008_remove_issueitem_odometer_reading_valid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleFuelState',
+            fields=[
+                ('vehicle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fuel_state', serialize=False, to='inventory.vehicle')),
+                ('last_odometer', models.FloatField(blank=True, null=True)),
+                ('last_litres', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('last_fill_date', models.DateTimeField(blank=True, null=True)),
+                ('last_issue_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='item_issuance.issueitem')),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_custody(apps, schema_editor):
+    IssueItem = apps.get_model("item_issuance", "IssueItem")
+    ToolCustody = apps.get_model("item_issuance", "ToolCustody")
+    rows = (
+        IssueItem.objects.filter(
+            item__category="tool",
+            issue_record__status__in=["Issued", "Partially_Returned"],
+            returned_quantity__lt=models.F("quantity_issued"),
+        )
+        .values_list("pk", "issue_record__issued_to_id", "quantity_issued", "returned_quantity")
+    )
+    ToolCustody.objects.bulk_create([
+        ToolCustody(issue_item_id=pk, employee_id=employee_id, outstanding_quantity=issued - returned)
+        for pk, employee_id, issued, returned in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0010_remove_employee_approval_status_and_more'),
+        ('item_issuance', '0009_vehiclefuelstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolCustody',
+            fields=[
+                ('issue_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='custody', serialize=False, to='item_issuance.issueitem')),
+                ('outstanding_quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tool_custody', to='employees.employee')),
+            ],
+            options={
+                'verbose_name_plural': 'tool custody',
+            },
+        ),
+        migrations.RunPython(backfill_custody, migrations.RunPython.noop),
+    ]
@@ -2,13 +2,16 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.core.exceptions import ValidationError
-import uuid
 import logging
 
+from inventory.services import issue_stock, return_stock
+from sequences.services import next_numbers
+from sims_backend.tracking import FieldTrackerMixin
+
 logger = logging.getLogger(__name__)
 
 
-class IssueRecord(models.Model):
+class IssueRecord(FieldTrackerMixin, models.Model):
     ISSUE_TYPES = [('material', 'Material'), ('tool', 'Tool'), ('fuel', 'Fuel')]
     STATUS_CHOICES = [
         ('Pending', 'Pending'), ('Approved', 'Approved'), ('Rejected', 'Rejected'),
@@ -16,6 +19,7 @@ class IssueRecord(models.Model):
         ('Partially_Returned', 'Partially Returned'),
     ]
     FUEL_TYPES = [('vehicle', 'Vehicle Fuel'), ('machine', 'Machine Fuel')]
+    tracked_fields = ('status', 'issue_date', 'issued_to')
 
     issue_id = models.CharField(max_length=100, unique=True, blank=True)
     issued_to = models.ForeignKey('employees.Employee', on_delete=models.PROTECT, related_name="issues_received")
@@ -54,10 +58,20 @@ class IssueRecord(models.Model):
     def save(self, *args, **kwargs):
         """Auto-generate issue_id."""
         if not self.issue_id:
-            self.issue_id = f"ISSUE-{uuid.uuid4().hex[:6].upper()}"
+            self.issue_id = IssueRecord.allocate_numbers()[0]
 
         super().save(*args, **kwargs)
 
+    @classmethod
+    def allocate_numbers(cls, count=1):
+        """
+        Reserve the next ``count`` issue IDs (ISSUE-0000001, ...).
+
+        Seven digits keep them distinct from the six-character random IDs
+        issued before the sequence existed.
+        """
+        return [f"ISSUE-{n:07d}" for n in next_numbers("issue", count)]
+
     def __str__(self):
         return f"Issue {self.issue_id} to {self.issued_to}"
 
@@ -70,7 +84,9 @@ class IssueRecord(models.Model):
         return self.issue_type == 'fuel' and self.fuel_type == 'machine'
 
 
-class IssueItem(models.Model):
+class IssueItem(FieldTrackerMixin, models.Model):
+    tracked_fields = ('returned_quantity',)
+
     issue_record = models.ForeignKey(IssueRecord, on_delete=models.CASCADE, related_name='items')
     item = models.ForeignKey('inventory.Item', on_delete=models.PROTECT)
     quantity_issued = models.DecimalField(max_digits=10, decimal_places=2)
@@ -90,27 +106,29 @@ class IssueItem(models.Model):
     class Meta:
         ordering = ['-id']
 
-    def calculate_fuel_efficiency(self):
-        """Calculate fuel efficiency based on previous fuel issuance."""
-        if not (self.item.category == 'fuel' and 
-                self.issue_record.vehicle and 
-                self.current_odometer is not None):
+    @property
+    def tracks_fuel(self):
+        return (self.item.category == 'fuel' and
+                self.issue_record.vehicle_id is not None and
+                self.current_odometer is not None)
+
+    def calculate_fuel_efficiency(self, state=None):
+        """Calculate fuel efficiency against the vehicle's previous fuel fill."""
+        if not self.tracks_fuel:
             return
-        
-        # Get the previous fuel issuance for this vehicle
-        last_fuel = IssueItem.objects.filter(
-            issue_record__vehicle=self.issue_record.vehicle,
-            item__category='fuel',
-            current_odometer__isnull=False
-        ).exclude(pk=self.pk).order_by('-issue_record__issue_date').first()
 
-        if last_fuel and last_fuel.current_odometer is not None:
-            self.previous_odometer = last_fuel.current_odometer
-            self.distance_travelled = (self.current_odometer or 0) - (last_fuel.current_odometer or 0)
-            
+        if state is None:
+            state = VehicleFuelState.for_vehicle(self.issue_record.vehicle_id)
+        if state.last_issue_item_id is not None and state.last_issue_item_id == self.pk:
+            return  # already the latest fill; its figures were set when it was issued
+
+        if state.last_odometer is not None:
+            self.previous_odometer = state.last_odometer
+            self.distance_travelled = self.current_odometer - state.last_odometer
+
             # CORRECT: Calculate efficiency based on PREVIOUS fuel quantity
-            if last_fuel.quantity_issued > 0 and self.distance_travelled > 0:
-                self.efficiency = self.distance_travelled / float(last_fuel.quantity_issued)
+            if state.last_litres and state.last_litres > 0 and self.distance_travelled > 0:
+                self.efficiency = self.distance_travelled / float(state.last_litres)
             else:
                 self.efficiency = None
         else:
@@ -119,25 +137,65 @@ class IssueItem(models.Model):
             self.distance_travelled = 0
             self.efficiency = None
 
+    def record_fuel_fill(self):
+        """
+        On issue-out: settle this fill's efficiency and make it the vehicle's
+        latest fill. Runs inside the issue-out transaction.
+        """
+        if not self.tracks_fuel:
+            return
+
+        state = VehicleFuelState.for_vehicle(self.issue_record.vehicle_id, lock=True)
+        self.calculate_fuel_efficiency(state)
+        IssueItem.objects.filter(pk=self.pk).update(
+            previous_odometer=self.previous_odometer,
+            distance_travelled=self.distance_travelled,
+            efficiency=self.efficiency,
+        )
+
+        state.advance(self)
+        state.save()
+
+    @classmethod
+    def record_fuel_fills(cls, issue_items):
+        """
+        ``record_fuel_fill`` for a batch: the vehicles' states are locked in one
+        query and fills are applied in issue-date order, so two fills of the
+        same vehicle in the batch chain onto each other.
+        """
+        fills = sorted(
+            (i for i in issue_items if i.tracks_fuel),
+            key=lambda i: (i.issue_record.issue_date, i.pk),
+        )
+        if not fills:
+            return
+
+        states = VehicleFuelState.for_vehicles({i.issue_record.vehicle_id for i in fills}, lock=True)
+        for issue_item in fills:
+            state = states[issue_item.issue_record.vehicle_id]
+            issue_item.calculate_fuel_efficiency(state)
+            state.advance(issue_item)
+
+        cls.objects.bulk_update(fills, ["previous_odometer", "distance_travelled", "efficiency"])
+        for state in states.values():
+            state.save()
+
     def save(self, *args, **kwargs):
         is_new = not self.pk
 
-        # Track previous values
-        if self.pk:
-            previous = IssueItem.objects.get(pk=self.pk)
-            self._previous_returned_quantity = previous.returned_quantity
-            self._previous_status = previous.issue_record.status
-        else:
-            self._previous_returned_quantity = 0
-            self._previous_status = None
+        # Values before this save; the snapshots reset once it completes
+        previous_returned_quantity = self.previous('returned_quantity') or 0
+        previous_status = None if is_new else self.issue_record.previous('status')
 
         # Set unit from item if not provided
         if not self.unit:
             self.unit = self.item.unit
 
         # ----------------- Vehicle Fuel Tracking Calculation -----------------
-        # SINGLE SOURCE OF TRUTH for efficiency calculation
-        self.calculate_fuel_efficiency()
+        # Provisional figures for a new request; record_fuel_fill() settles
+        # them when the fuel is actually issued.
+        if is_new:
+            self.calculate_fuel_efficiency()
         # -----------------------------------------------------------------------
 
         super().save(*args, **kwargs)
@@ -148,18 +206,97 @@ class IssueItem(models.Model):
                 self.issue_record.approval_status = 'Approved'
                 self.issue_record.status = 'Issued'
                 self.issue_record.save()
-                self.item.quantity_in_stock -= self.quantity_issued
-                self.item.save()
+                issue_stock(self.item, self.quantity_issued, reference=self.issue_record.issue_id)
             elif self.item.category == 'fuel':
                 self.issue_record.fuel_litres = self.quantity_issued
                 self.issue_record.save()
         else:
-            if self.issue_record.status == 'Issued' and self._previous_status != 'Issued':
-                self.item.quantity_in_stock -= self.quantity_issued
-                self.item.save()
+            if self.issue_record.status == 'Issued' and previous_status != 'Issued':
+                issue_stock(self.item, self.quantity_issued, reference=self.issue_record.issue_id)
 
         # ----------------- Handle returned items -----------------
-        if self.returned_quantity > self._previous_returned_quantity:
-            quantity_to_restore = self.returned_quantity - self._previous_returned_quantity
-            self.item.quantity_in_stock += quantity_to_restore
-            self.item.save()
\ No newline at end of file
+        if self.returned_quantity > previous_returned_quantity:
+            quantity_to_restore = self.returned_quantity - previous_returned_quantity
+            return_stock(self.item, quantity_to_restore, reference=self.issue_record.issue_id)
+
+
+class VehicleFuelState(models.Model):
+    """
+    Latest issued fuel fill of each vehicle.
+
+    Kept current by ``IssueItem.record_fuel_fill`` in the issue-out
+    transaction, so computing efficiency reads one row instead of scanning
+    the vehicle's fuel history.
+    """
+    ISSUED_STATUSES = ('Issued', 'Returned', 'Partially_Returned')
+
+    vehicle = models.OneToOneField('inventory.Vehicle', on_delete=models.CASCADE, primary_key=True, related_name='fuel_state')
+    last_issue_item = models.ForeignKey(IssueItem, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    last_odometer = models.FloatField(null=True, blank=True)
+    last_litres = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    last_fill_date = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Vehicle {self.vehicle_id}: {self.last_odometer} km, {self.last_litres} L"
+
+    def advance(self, issue_item):
+        """Make ``issue_item`` the vehicle's latest fill."""
+        self.last_issue_item = issue_item
+        self.last_odometer = issue_item.current_odometer
+        self.last_litres = issue_item.quantity_issued
+        self.last_fill_date = issue_item.issue_record.issue_date
+
+    @classmethod
+    def for_vehicles(cls, vehicle_ids, lock=False):
+        """States of several vehicles by vehicle id, read (and locked) in one query."""
+        rows = cls.objects.select_for_update() if lock else cls.objects
+        states = {s.vehicle_id: s for s in rows.filter(vehicle_id__in=vehicle_ids).order_by('vehicle_id')}
+        for vehicle_id in sorted(set(vehicle_ids) - set(states)):
+            states[vehicle_id] = cls.for_vehicle(vehicle_id, lock=lock)
+        return states
+
+    @classmethod
+    def for_vehicle(cls, vehicle_id, lock=False):
+        """The vehicle's state row, created from its fuel history the first time."""
+        rows = cls.objects.select_for_update() if lock else cls.objects
+        state = rows.filter(vehicle_id=vehicle_id).first()
+        if state is not None:
+            return state
+
+        last = IssueItem.objects.filter(
+            issue_record__vehicle_id=vehicle_id,
+            issue_record__status__in=cls.ISSUED_STATUSES,
+            item__category='fuel',
+            current_odometer__isnull=False,
+        ).select_related('issue_record').order_by('-issue_record__issue_date', '-id').first()
+
+        cls.objects.get_or_create(vehicle_id=vehicle_id, defaults={
+            'last_issue_item': last,
+            'last_odometer': last.current_odometer if last else None,
+            'last_litres': last.quantity_issued if last else None,
+            'last_fill_date': last.issue_record.issue_date if last else None,
+        })
+        return rows.get(vehicle_id=vehicle_id)
+
+
+class ToolCustody(models.Model):
+    """
+    Tools an employee still holds: one row per issued tool line with an
+    outstanding quantity.
+
+    Kept in step with issues and returns by ``item_issuance.custody`` inside
+    the same transaction, so "what does this employee hold" is an indexed
+    lookup instead of a scan of ``IssueItem``.
+    """
+    STATUSES = ('Issued', 'Partially_Returned')
+
+    issue_item = models.OneToOneField(IssueItem, on_delete=models.CASCADE, primary_key=True, related_name='custody')
+    employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE, related_name='tool_custody')
+    outstanding_quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'tool custody'
+
+    def __str__(self):
+        return f"{self.employee_id} holds {self.outstanding_quantity} of issue item {self.issue_item_id}"
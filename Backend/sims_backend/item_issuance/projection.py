@@ -0,0 +1,161 @@
+# item_issuance/projection.py
+"""
+Flat read projection of issue records.
+
+People, vehicle and item details are pulled in through joins on ``.values()``
+queries instead of serializer lookups per row. A page of records costs one
+query, plus one more for all of their items with ``?expand=items``, however
+long the page is.
+"""
+from django.db.models import F
+from rest_framework import serializers
+
+from .models import IssueItem
+
+RECORD_COLUMNS = (
+    "id", "issue_id", "issue_date", "actual_return_date", "reason", "issue_type",
+    "status", "fuel_type", "approval_status", "approval_date",
+    "issued_to", "issued_by", "approved_by", "vehicle",
+)
+
+# Output fields that need a join, and the columns they read
+JOINED_FIELDS = {
+    "issued_to_name": {
+        "issued_to_first_name": F("issued_to__first_name"),
+        "issued_to_last_name": F("issued_to__last_name"),
+        "issued_to_job_number": F("issued_to__job_number"),
+    },
+    "issued_by_name": {
+        "issued_by_first_name": F("issued_by__first_name"),
+        "issued_by_last_name": F("issued_by__last_name"),
+    },
+    "approved_by_name": {
+        "approved_by_first_name": F("approved_by__first_name"),
+        "approved_by_last_name": F("approved_by__last_name"),
+    },
+    "vehicle_plate": {"vehicle_plate_number": F("vehicle__plate_number")},
+    "vehicle_fuel_type": {"vehicle_fuel_name": F("vehicle__fuel_type__item__name")},
+}
+
+ITEM_COLUMNS = (
+    "id", "issue_record_id", "item_id", "quantity_issued", "returned_quantity", "return_condition",
+    "previous_odometer", "current_odometer", "distance_travelled", "efficiency",
+)
+
+ITEM_ANNOTATIONS = {
+    "item_name": F("item__name"),
+    "item_category": F("item__category"),
+    "item_unit": F("item__unit"),
+    "current_stock": F("item__quantity_in_stock"),
+}
+
+_decimal = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def _decimal_value(value):
+    return _decimal.to_representation(value) if value is not None else None
+
+
+def _datetime_value(value):
+    return _datetime.to_representation(value) if value is not None else None
+
+
+def _name(first, last):
+    return f"{first or ''} {last or ''}".strip()
+
+
+# ----------------------------- RECORDS -----------------------------
+
+def issue_queryset(queryset, fields=None):
+    """Project ``queryset`` to plain rows, joining only what ``fields`` needs."""
+    annotations = {}
+    for field, columns in JOINED_FIELDS.items():
+        if fields is None or field in fields:
+            annotations.update(columns)
+    return queryset.select_related(None).prefetch_related(None).values(*RECORD_COLUMNS, **annotations)
+
+
+def issue_row(row, fields=None):
+    """Shape one projected row like ``IssueRecordSerializer`` (without items)."""
+    data = {
+        "id": row["id"],
+        "issue_id": row["issue_id"],
+        "issue_date": _datetime_value(row["issue_date"]),
+        "actual_return_date": _datetime_value(row["actual_return_date"]),
+        "reason": row["reason"],
+        "issue_type": row["issue_type"],
+        "status": row["status"],
+        "fuel_type": row["fuel_type"],
+        "approval_status": row["approval_status"],
+        "approval_date": _datetime_value(row["approval_date"]),
+        "issued_to": row["issued_to"],
+        "issued_by": row["issued_by"],
+        "approved_by": row["approved_by"],
+        "vehicle": row["vehicle"],
+    }
+
+    if "issued_to_first_name" in row:
+        data["issued_to_name"] = (
+            f"{row['issued_to_first_name']} {row['issued_to_last_name']} ({row['issued_to_job_number']})"
+            if row["issued_to"] is not None else "Unknown"
+        )
+    if "issued_by_first_name" in row:
+        data["issued_by_name"] = (
+            f"{row['issued_by_first_name']} {row['issued_by_last_name']}"
+            if row["issued_by"] is not None else "Unknown"
+        )
+    if "approved_by_first_name" in row:
+        data["approved_by_name"] = (
+            _name(row["approved_by_first_name"], row["approved_by_last_name"])
+            if row["approved_by"] is not None else None
+        )
+    if "vehicle_plate_number" in row:
+        data["vehicle_plate"] = row["vehicle_plate_number"]
+    if "vehicle_fuel_name" in row:
+        data["vehicle_fuel_type"] = row["vehicle_fuel_name"]
+
+    if fields is not None:
+        data = {key: value for key, value in data.items() if key in fields}
+    return data
+
+
+# ----------------------------- ITEMS -----------------------------
+
+def item_row(row):
+    """Shape one projected issue item like ``IssueItemSerializer``."""
+    return {
+        "id": row["id"],
+        "item_id": row["item_id"],
+        "item_name": row["item_name"],
+        "item_category": row["item_category"],
+        "current_stock": _decimal_value(row["current_stock"]),
+        "unit": row["item_unit"],
+        "quantity_issued": _decimal_value(row["quantity_issued"]),
+        "returned_quantity": _decimal_value(row["returned_quantity"]),
+        "return_condition": row["return_condition"],
+        "outstanding_quantity": row["quantity_issued"] - row["returned_quantity"],
+        "is_fully_returned": row["returned_quantity"] >= row["quantity_issued"],
+        "previous_odometer": row["previous_odometer"],
+        "current_odometer": row["current_odometer"],
+        "distance_travelled": row["distance_travelled"],
+        "efficiency": round(row["efficiency"], 2) if row["efficiency"] is not None else None,
+    }
+
+
+def attach_items(records, record_ids):
+    """
+    Add an ``items`` list to each shaped record with one query for the whole
+    page. ``record_ids`` lines up with ``records``, which may omit ``id``.
+    """
+    by_record = dict(zip(record_ids, records))
+    for record in records:
+        record["items"] = []
+
+    rows = (
+        IssueItem.objects.filter(issue_record_id__in=list(by_record))
+        .values(*ITEM_COLUMNS, **ITEM_ANNOTATIONS)
+    )
+    for row in rows:
+        by_record[row["issue_record_id"]]["items"].append(item_row(row))
+    return records
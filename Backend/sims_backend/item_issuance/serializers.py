@@ -5,6 +5,7 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 
 from inventory.models import Item, Vehicle
+from inventory.services import InsufficientStockError, issue_stock
 from employees.models import Employee
 from item_issuance.models import IssueItem, IssueRecord
 
@@ -228,28 +229,13 @@ class IssueOutSerializer(serializers.Serializer):
         with transaction.atomic():
             for issue_item in issue_record.items.all():
                 # Update stock
-                issue_item.item.quantity_in_stock -= issue_item.quantity_issued
-                issue_item.item.save()
-
-                # ----------- Set previous odometer for fuel tracking ----------
-                # Efficiency calculation is now handled by the model's save() method
-                if issue_item.item.category == 'fuel' and issue_record.vehicle and issue_item.current_odometer is not None:
-                    # Find the previous fuel issuance for this vehicle
-                    last_fuel = IssueItem.objects.filter(
-                        issue_record__vehicle=issue_record.vehicle,
-                        item__category='fuel',
-                        current_odometer__isnull=False
-                    ).exclude(pk=issue_item.pk).order_by('-issue_record__issue_date').first()
-
-                    if last_fuel and last_fuel.current_odometer is not None:
-                        issue_item.previous_odometer = last_fuel.current_odometer
-                        issue_item.distance_travelled = issue_item.current_odometer - last_fuel.current_odometer
-                    else:
-                        issue_item.previous_odometer = None
-                        issue_item.distance_travelled = 0
-                    
-                    # Save will trigger the model's calculate_fuel_efficiency() method
-                    issue_item.save()
+                try:
+                    issue_stock(issue_item.item, issue_item.quantity_issued, reference=issue_record.issue_id, user=user)
+                except InsufficientStockError as e:
+                    raise serializers.ValidationError({"errors": e.messages})
+
+                # ----------- Fuel tracking from the vehicle's last fill ----------
+                issue_item.record_fuel_fill()
 
             issue_record.status = 'Issued'
             issue_record.save()
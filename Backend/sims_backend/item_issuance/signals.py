@@ -1,29 +1,20 @@
 # item_issuance/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from notifications_app.models import Notification
-from .models import IssueRecord, IssueItem
+from .custody import sync_custody
+from .fuel_analytics import invalidate_vehicles
+from .models import IssueRecord, IssueItem, VehicleFuelState
 
 User = get_user_model()
-_previous_status = {}
-
-@receiver(pre_save, sender=IssueRecord)
-def store_previous_status(sender, instance, **kwargs):
-    """Keep previous status before saving."""
-    if instance.pk:
-        try:
-            old = IssueRecord.objects.get(pk=instance.pk)
-            _previous_status[instance.pk] = old.status
-        except IssueRecord.DoesNotExist:
-            _previous_status[instance.pk] = None
 
 @receiver(post_save, sender=IssueRecord)
 def issue_out_notification(sender, instance, created, **kwargs):
     """Notify SM when IssueRecord is marked as 'Issued'."""
     if not created:
-        prev_status = _previous_status.pop(instance.pk, None)
-        if prev_status != "Issued" and instance.status == "Issued":
+        if instance.previous("status") != "Issued" and instance.status == "Issued":
             # Compose message for each item
             for item_entry in instance.items.all():
                 item = item_entry.item
@@ -42,3 +33,27 @@ def issue_out_notification(sender, instance, created, **kwargs):
                     user=instance.issued_by,
                     message=message
                 )
+
+
+@receiver(post_save, sender=VehicleFuelState)
+@receiver(post_delete, sender=VehicleFuelState)
+def fuel_state_changed(sender, instance, **kwargs):
+    """A new fill moves the vehicle's fuel state; drop its cached analytics once committed."""
+    vehicle_id = instance.vehicle_id
+    transaction.on_commit(lambda: invalidate_vehicles([vehicle_id]))
+
+
+@receiver(post_save, sender=IssueItem)
+def issue_item_custody(sender, instance, raw=False, **kwargs):
+    """Issues and returns change how much of a tool line the employee holds."""
+    if raw:
+        return
+    sync_custody([instance])
+
+
+@receiver(post_save, sender=IssueRecord)
+def issue_record_custody(sender, instance, created, raw=False, **kwargs):
+    """A status change moves all of the record's tool lines in or out of custody."""
+    if raw or created or not instance.has_changed("status"):
+        return
+    sync_custody(instance.items.select_related("item"))
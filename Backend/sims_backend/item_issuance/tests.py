@@ -1,3 +1,367 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from employees.models import Employee
+from inventory.models import Fuel, Item, StockMovement, Vehicle
+from notifications_app.models import Notification
+from reports.models import Report
+from users.models import CustomUser
+
+from . import fuel_analytics
+from .models import IssueItem, IssueRecord, VehicleFuelState
+
+
+class IssueProjectionTests(TestCase):
+    URL = "/api/item_issuance/issuerecords/projection/"
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_issues(self, count):
+        for _ in range(count):
+            record = IssueRecord.objects.create(issued_to=self.employee, issued_by=self.user, issue_type="material")
+            IssueItem.objects.create(issue_record=record, item=self.item, quantity_issued=2)
+            IssueItem.objects.create(issue_record=record, item=self.item, quantity_issued=3)
+
+    def _count_queries(self, path):
+        with self.assertNumQueries(2 if "expand=items" in path else 1):
+            return self.client.get(path)
+
+    def test_query_count_does_not_grow_with_records(self):
+        self._create_issues(2)
+        small = self._count_queries(self.URL + "?expand=items")
+        self._create_issues(20)
+        large = self._count_queries(self.URL + "?expand=items")
+
+        self.assertEqual(len(small.data), 2)
+        self.assertEqual(len(large.data), 22)
+        self.assertTrue(all(len(record["items"]) == 2 for record in large.data))
+
+    def test_list_without_items_is_one_query(self):
+        self._create_issues(5)
+        response = self._count_queries(self.URL)
+        self.assertEqual(len(response.data), 5)
+        self.assertNotIn("items", response.data[0])
+
+    def test_sparse_fields(self):
+        self._create_issues(1)
+        response = self.client.get(self.URL + "?fields=issue_id,issued_to_name")
+        self.assertEqual(set(response.data[0]), {"issue_id", "issued_to_name"})
+        self.assertEqual(response.data[0]["issued_to_name"], "Ann Ole (J1)")
+
+
+class FuelAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.diesel = Item.objects.create(name="Diesel", category="fuel", unit="litres", quantity_to_add=1000)
+        fuel = Fuel.objects.create(item=self.diesel)
+        self.vehicle = Vehicle.objects.create(
+            item=Item.objects.create(name="Lorry", category="vehicle", unit="unit"), plate_number="KAA 1", fuel_type=fuel
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/item_issuance/vehicles/{self.vehicle.pk}/fuel-analytics/"
+
+    def _fill(self, odometer, litres=40):
+        record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="fuel", fuel_type="vehicle",
+            vehicle=self.vehicle, approval_status="Approved",
+        )
+        IssueItem.objects.create(issue_record=record, item=self.diesel, quantity_issued=litres, current_odometer=odometer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/item_issuance/issuerecords/bulk_issue_out/", {"ids": [record.pk]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_k_must_be_a_finite_positive_number(self):
+        for k in ("nan", "inf", "-inf", "0", "-1", "abc"):
+            response = self.client.get(self.url, {"k": k})
+            self.assertEqual(response.status_code, 400, k)
+        self.assertEqual(self.client.get(self.url, {"k": "2"}).status_code, 200)
+
+    def test_new_fill_drops_the_cached_series(self):
+        self._fill(1000)
+        self._fill(1400)
+        self.assertEqual(len(self.client.get(self.url).data["fills"]), 2)
+        self.assertIsNotNone(cache.get(fuel_analytics.cache_key(self.vehicle.pk)))
+
+        self._fill(1800)
+
+        self.assertIsNone(cache.get(fuel_analytics.cache_key(self.vehicle.pk)))
+        fills = self.client.get(self.url).data["fills"]
+        self.assertEqual([fill["odometer"] for fill in fills], [1000, 1400, 1800])
+        self.assertEqual(fills[-1]["efficiency"], 10)
+
+
+class VehicleFuelStateTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.diesel = Item.objects.create(name="Diesel", category="fuel", unit="litres", quantity_to_add=1000)
+        fuel = Fuel.objects.create(item=self.diesel)
+        self.vehicle = Vehicle.objects.create(
+            item=Item.objects.create(name="Lorry", category="vehicle", unit="unit"), plate_number="KAA 1", fuel_type=fuel
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _request(self, odometer, litres=40):
+        record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="fuel", fuel_type="vehicle",
+            vehicle=self.vehicle, approval_status="Approved",
+        )
+        return IssueItem.objects.create(issue_record=record, item=self.diesel, quantity_issued=litres, current_odometer=odometer)
+
+    def _issue_out(self, *fills):
+        response = self.client.post(
+            "/api/item_issuance/issuerecords/bulk_issue_out/",
+            {"ids": [fill.issue_record_id for fill in fills]}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def _state(self):
+        return VehicleFuelState.objects.get(vehicle=self.vehicle)
+
+    def test_each_issued_fill_becomes_the_latest(self):
+        first = self._request(1000, litres=40)
+        response = self.client.post(f"/api/item_issuance/issuerecords/{first.issue_record_id}/issue_out/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((self._state().last_issue_item_id, self._state().last_odometer), (first.pk, 1000))
+
+        second = self._request(1400, litres=50)
+        # A pending request does not move the state
+        self.assertEqual(self._state().last_issue_item_id, first.pk)
+
+        self._issue_out(second)
+
+        state = self._state()
+        self.assertEqual((state.last_issue_item_id, state.last_odometer, state.last_litres), (second.pk, 1400, 50))
+        second.refresh_from_db()
+        # 400 km on the previous 40 litres
+        self.assertEqual((second.previous_odometer, second.distance_travelled, second.efficiency), (1000, 400, 10))
+
+    def test_fills_in_one_batch_chain_onto_each_other(self):
+        self._issue_out(self._request(1000, litres=40))
+        fills = [self._request(1400, litres=20), self._request(1600, litres=30)]
+
+        self._issue_out(*fills)
+
+        for fill in fills:
+            fill.refresh_from_db()
+        self.assertEqual([fill.efficiency for fill in fills], [10, 10])
+        self.assertEqual(self._state().last_issue_item_id, fills[1].pk)
+
+    def test_missing_state_is_seeded_from_history(self):
+        self._issue_out(self._request(1000, litres=40))
+        VehicleFuelState.objects.all().delete()
+        fill = self._request(1200)
+
+        self._issue_out(fill)
+
+        fill.refresh_from_db()
+        self.assertEqual((fill.previous_odometer, fill.efficiency), (1000, 5))
+        self.assertEqual(self._state().last_odometer, 1200)
+
+
+class BulkIssueOutTests(TestCase):
+    URL = "/api/item_issuance/issuerecords/bulk_issue_out/"
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.sand = Item.objects.create(name="Sand", category="material", unit="tonnes", quantity_to_add=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _request(self, *lines, approval_status="Approved"):
+        record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="material", approval_status=approval_status,
+        )
+        for item, quantity in lines:
+            IssueItem.objects.create(issue_record=record, item=item, quantity_issued=quantity)
+        return record
+
+    def _post(self, *records):
+        # Creating a record already logged one report each
+        self.reports = Report.objects.count()
+        return self.client.post(self.URL, {"ids": [record.pk for record in records]}, format="json")
+
+    def _assert_untouched(self, *records):
+        self.assertEqual({record.status for record in IssueRecord.objects.filter(pk__in=[r.pk for r in records])}, {"Pending"})
+        self.assertEqual(
+            list(Item.objects.filter(pk__in=[self.cement.pk, self.sand.pk]).values_list("quantity_in_stock", flat=True)),
+            [10, 10],
+        )
+        self.assertFalse(StockMovement.objects.filter(movement_type=StockMovement.ISSUE).exists())
+        self.assertEqual(Report.objects.count(), self.reports)
+
+    def test_whole_batch_is_issued_together(self):
+        records = [self._request((self.cement, 4), (self.sand, 1)), self._request((self.cement, 6))]
+
+        response = self._post(*records)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["issued"], [record.issue_id for record in records])
+        self.cement.refresh_from_db()
+        self.assertEqual(self.cement.quantity_in_stock, 0)
+        self.assertEqual(set(IssueRecord.objects.values_list("status", flat=True)), {"Issued"})
+        self.assertEqual(Report.objects.count(), self.reports + 2)
+
+    def test_stock_is_checked_across_the_batch(self):
+        # Each request fits on its own; together they need 12 bags
+        records = [self._request((self.sand, 2), (self.cement, 6)), self._request((self.cement, 6))]
+
+        response = self._post(*records)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Insufficient stock")
+        self._assert_untouched(*records)
+
+    def test_one_blocked_request_stops_the_batch(self):
+        ready = self._request((self.cement, 1))
+        unapproved = self._request((self.sand, 1), approval_status="Pending")
+
+        response = self._post(ready, unapproved)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([issue["id"] for issue in response.data["issues"]], [unapproved.pk])
+        self._assert_untouched(ready, unapproved)
+
+    def test_unknown_ids_are_rejected(self):
+        ready = self._request((self.cement, 1))
+        self.reports = Report.objects.count()
+        response = self.client.post(self.URL, {"ids": [ready.pk, 999]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self._assert_untouched(ready)
+
+
+class FieldTrackingTests(TestCase):
+    """``FieldTrackerMixin`` as used by ``IssueRecord`` (status, issue_date, issued_to)."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.record = IssueRecord.objects.create(issued_to=self.employee, issued_by=self.user, issue_type="material")
+
+    def test_unsaved_instance_has_no_previous_values(self):
+        record = IssueRecord(issued_to=self.employee, issued_by=self.user, issue_type="material")
+        self.assertIsNone(record.previous("status"))
+        self.assertTrue(record.has_changed("status"))
+        with self.assertRaises(ValueError):
+            record.previous("reason")
+
+    def test_snapshot_moves_with_each_save(self):
+        self.assertFalse(self.record.has_changed("status"))
+
+        self.record.status = "Issued"
+        self.assertTrue(self.record.has_changed("status"))
+        self.assertEqual(self.record.previous("status"), "Pending")
+
+        self.record.save()
+        self.assertFalse(self.record.has_changed("status"))
+        self.assertEqual(self.record.previous("status"), "Issued")
+
+    def test_post_save_receivers_see_the_values_before_the_save(self):
+        seen = []
+
+        def receiver(sender, instance, **kwargs):
+            seen.append((instance.previous("status"), instance.has_changed("status")))
+
+        post_save.connect(receiver, sender=IssueRecord)
+        try:
+            self.record.status = "Cancelled"
+            self.record.save()
+        finally:
+            post_save.disconnect(receiver, sender=IssueRecord)
+        self.assertEqual(seen, [("Pending", True)])
+
+    def test_loaded_and_refreshed_instances_answer_from_memory(self):
+        record = IssueRecord.objects.get(pk=self.record.pk)
+        IssueRecord.objects.filter(pk=record.pk).update(status="Issued")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(record.previous("status"), "Pending")
+            self.assertEqual(record.previous("issued_to"), self.employee.pk)
+
+        record.refresh_from_db(fields=["status"])
+        with self.assertNumQueries(0):
+            self.assertEqual(record.previous("status"), "Issued")
+            self.assertFalse(record.has_changed("status"))
+
+    def test_update_fields_only_refreshes_the_saved_fields(self):
+        other = Employee.objects.create(job_number="J2", first_name="Bo", last_name="Kim", department="Ops")
+        self.record.status = "Issued"
+        self.record.issued_to = other
+
+        self.record.save(update_fields=["status"])
+
+        self.assertFalse(self.record.has_changed("status"))
+        self.assertTrue(self.record.has_changed("issued_to"))
+        self.assertEqual(self.record.previous("issued_to"), self.employee.pk)
+
+    def test_deferred_fields_are_read_on_demand(self):
+        record = IssueRecord.objects.only("pk").get(pk=self.record.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(record.previous("status"), "Pending")
+            self.assertEqual(record.previous("status"), "Pending")
+
+
+class BatchDecisionTests(TestCase):
+    URL = "/api/item_issuance/issuerecords/batch_decision/"
+
+    def setUp(self):
+        self.md = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.requesters = [
+            CustomUser.objects.create(username=f"sm{i}", email=f"sm{i}@example.com", role="StoreManager", password="x")
+            for i in range(2)
+        ]
+        employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.records = [
+            IssueRecord.objects.create(issued_to=employee, issued_by=self.requesters[i % 2], issue_type="material")
+            for i in range(4)
+        ]
+        self.ids = [record.pk for record in self.records]
+        self.client = APIClient()
+        self.client.force_authenticate(self.md)
+
+    def _statuses(self):
+        return list(IssueRecord.objects.filter(pk__in=self.ids).order_by("pk").values_list("approval_status", flat=True))
+
+    def test_only_the_managing_director_can_decide(self):
+        self.client.force_authenticate(self.requesters[0])
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "Approved"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self._statuses(), ["Pending"] * 4)
+
+    def test_one_processed_issue_rejects_the_whole_batch(self):
+        IssueRecord.objects.filter(pk=self.ids[2]).update(approval_status="Approved")
+        Notification.objects.all().delete()
+
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "Rejected"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([issue["id"] for issue in response.data["issues"]], [self.ids[2]])
+        self.assertEqual(self._statuses(), ["Pending", "Pending", "Approved", "Pending"])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_batch_sends_one_notification_per_requester(self):
+        Notification.objects.all().delete()
+
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "Rejected"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._statuses(), ["Rejected"] * 4)
+        self.assertEqual(set(IssueRecord.objects.values_list("status", flat=True)), {"Cancelled"})
+        notes = {note.user.username: note.message for note in Notification.objects.all()}
+        self.assertEqual(set(notes), {"sm0", "sm1"})
+        self.assertTrue(notes["sm0"].startswith("2 issue requests rejected"))
@@ -3,12 +3,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.db import transaction, models
-from django.db.models import F
 from decimal import Decimal
+import math
 
-from item_issuance.models import IssueItem, IssueRecord
+from item_issuance import fuel_analytics
+from item_issuance.custody import sync_custody
+from item_issuance.models import IssueItem, IssueRecord, ToolCustody
+from item_issuance.permissions import IsManagingDirector
+from item_issuance.projection import attach_items, issue_queryset, issue_row
 from item_issuance.serializers import (
     IssueRecordSerializer,
     ReturnRecordSerializer,
@@ -17,7 +22,11 @@ from item_issuance.serializers import (
     CancelIssueSerializer,  
 )
 
+from inventory.catalog import parse_fields
 from inventory.models import Vehicle, Item
+from inventory.services import InsufficientStockError, issue_stock, issue_stock_bulk
+from notifications_app.models import Notification
+from porequest.forecasting import invalidate_forecast
 from reports.models import Report
 
 
@@ -91,6 +100,70 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
             "status": issue.status
         }, status=status.HTTP_200_OK)
 
+    # --------------------------
+    # BATCH APPROVE / REJECT
+    # --------------------------
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated, IsManagingDirector])
+    def batch_decision(self, request):
+        """
+        Approve or reject many pending issues at once.
+
+        Body: {"ids": [...], "approval_status": "Approved" | "Rejected"}. The
+        records are checked with one locking SELECT and changed with one UPDATE;
+        if any of them is no longer pending nothing is changed.
+        """
+        ids = request.data.get("ids")
+        decision = request.data.get("approval_status")
+        if decision not in ["Approved", "Rejected"]:
+            return Response({"detail": "approval_status must be Approved or Rejected"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not ids:
+            return Response({"detail": "ids must be a non-empty list of issue record ids"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = sorted({int(pk) for pk in ids})
+        except (TypeError, ValueError):
+            return Response({"detail": "ids must be a non-empty list of issue record ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            rows = list(
+                IssueRecord.objects.select_for_update().filter(pk__in=ids).order_by("pk")
+                .values_list("pk", "issue_id", "approval_status", "issued_by_id")
+            )
+            missing = sorted(set(ids) - {row[0] for row in rows})
+            if missing:
+                return Response({"detail": f"Issue records not found: {', '.join(map(str, missing))}"}, status=status.HTTP_400_BAD_REQUEST)
+
+            processed = [
+                {"id": pk, "issue_id": issue_id, "error": f"Issue already {current.lower()}"}
+                for pk, issue_id, current, _ in rows if current != "Pending"
+            ]
+            if processed:
+                return Response({"detail": "Some issues have already been processed", "issues": processed}, status=status.HTTP_400_BAD_REQUEST)
+
+            changes = {"approval_status": decision, "approved_by": request.user, "approval_date": timezone.now()}
+            if decision == "Rejected":
+                changes["status"] = "Cancelled"
+            IssueRecord.objects.filter(pk__in=ids).update(**changes)
+
+            # One summary per requester instead of a save (and its signals) per record
+            by_requester = {}
+            for _, issue_id, _, issued_by_id in rows:
+                by_requester.setdefault(issued_by_id, []).append(issue_id)
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id,
+                    message=f"{len(issue_ids)} issue request{'s' if len(issue_ids) != 1 else ''} "
+                            f"{decision.lower()} by the Managing Director: {', '.join(issue_ids)}.",
+                )
+                for user_id, issue_ids in by_requester.items()
+            ])
+            transaction.on_commit(invalidate_forecast)
+
+        return Response({
+            "detail": f"{len(rows)} issue{'s' if len(rows) != 1 else ''} {decision.lower()}",
+            "approval_status": decision,
+            "issue_ids": [row[1] for row in rows],
+        }, status=status.HTTP_200_OK)
+
     # --------------------------
     # GET QUERYSET WITH FILTERS
     # --------------------------
@@ -117,6 +190,31 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
 
         return queryset.select_related("issued_to", "issued_by", "approved_by", "vehicle").prefetch_related("items")
 
+    # --------------------------
+    # FLAT LISTING
+    # --------------------------
+    @action(detail=False, methods=["get"])
+    def projection(self, request):
+        """
+        Read-only listing built from ``.values()`` rows.
+
+        Takes the same filters as the list, plus ``?fields=a,b`` to pick
+        record fields and ``?expand=items`` to include each record's items.
+        """
+        fields = parse_fields(request.query_params.get("fields"))
+        expand = parse_fields(request.query_params.get("expand")) or set()
+        rows = issue_queryset(self.filter_queryset(self.get_queryset()), fields)
+
+        page = self.paginate_queryset(rows)
+        rows = page if page is not None else list(rows)
+        records = [issue_row(row, fields) for row in rows]
+        if "items" in expand:
+            attach_items(records, [row["id"] for row in rows])
+
+        if page is not None:
+            return self.get_paginated_response(records)
+        return Response(records)
+
     # --------------------------
     # CREATE ISSUE RECORD
     # --------------------------
@@ -124,31 +222,38 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        with transaction.atomic():
-            issue = serializer.save(issued_by=request.user)
-
-            # Auto-approve non-fuel tools
-            tool_uses_fuel = False
-            if issue.issue_type == "tool" and issue.items.exists():
-                item = issue.items.first().item
-                if item.category == "tool" and hasattr(item, "tool"):
-                    tool_uses_fuel = item.tool.uses_fuel
-
-            if issue.issue_type == "tool" and not tool_uses_fuel:
-                issue.approval_status = "Approved"
-                issue.status = "Issued"
-                issue.save()
+        try:
+            with transaction.atomic():
+                self._create_issue(serializer, request)
+        except InsufficientStockError as e:
+            return Response({"error": "Insufficient stock", "detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            # Create report
-            report_type = "issue_request"
-            if issue.issue_type == "fuel":
-                report_type = "fuel_request"
-            elif issue.issue_type == "tool":
-                report_type = "fuel_request" if tool_uses_fuel else "tool_auto_issued"
+    def _create_issue(self, serializer, request):
+        issue = serializer.save(issued_by=request.user)
 
-            Report.objects.create(report_type=report_type, issue_record=issue, created_by=request.user)
+        # Auto-approve non-fuel tools
+        tool_uses_fuel = False
+        if issue.issue_type == "tool" and issue.items.exists():
+            item = issue.items.first().item
+            if item.category == "tool" and hasattr(item, "tool"):
+                tool_uses_fuel = item.tool.uses_fuel
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        if issue.issue_type == "tool" and not tool_uses_fuel:
+            issue.approval_status = "Approved"
+            issue.status = "Issued"
+            issue.save()
+
+        # Create report
+        report_type = "issue_request"
+        if issue.issue_type == "fuel":
+            report_type = "fuel_request"
+        elif issue.issue_type == "tool":
+            report_type = "fuel_request" if tool_uses_fuel else "tool_auto_issued"
+
+        Report.objects.create(report_type=report_type, issue_record=issue, created_by=request.user)
+        return issue
 
     # --------------------------
     # ISSUED ITEMS BY EMPLOYEE
@@ -159,15 +264,13 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
         if not employee_id:
             return Response({"error": "employee_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        issued_items = IssueItem.objects.filter(
-            issue_record__issued_to_id=employee_id,
-            issue_record__status="Issued",
-            issue_record__issue_type="tool",
-            returned_quantity__lt=F("quantity_issued")
-        ).select_related("item", "issue_record")
+        custody = ToolCustody.objects.filter(employee_id=employee_id).select_related(
+            "issue_item__item", "issue_item__issue_record"
+        ).order_by("-issue_item_id")
 
         data = []
-        for item in issued_items:
+        for row in custody:
+            item = row.issue_item
             data.append({
                 "issue_item_id": item.id,
                 "item_id": item.item.id,
@@ -175,7 +278,7 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
                 "unit": item.item.unit,
                 "quantity_issued": float(item.quantity_issued),
                 "returned_quantity": float(item.returned_quantity),
-                "outstanding_quantity": float(item.quantity_issued - item.returned_quantity),
+                "outstanding_quantity": float(row.outstanding_quantity),
                 "issue_id": item.issue_record.issue_id,
                 "issue_record_id": item.issue_record.id,
                 "issue_date": item.issue_record.issue_date,
@@ -217,33 +320,11 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
         serializer = IssueOutSerializer(data=request.data, context={"issue_record": issue, "request": request})
         serializer.is_valid(raise_exception=True)
 
-        with transaction.atomic():
-            issue.status = "Issued"
-            issue.save()
-            for issue_item in issue.items.all():
-                item = issue_item.item
-                item.quantity_in_stock -= issue_item.quantity_issued
-                item.save()
-
-                # Fuel tracking - set distance travelled, efficiency calculated by model
-                if issue.issue_type == "fuel" and issue_item.current_odometer is not None:
-                    last_fuel = IssueItem.objects.filter(
-                        issue_record__vehicle=issue.vehicle,
-                        item__category='fuel',
-                        current_odometer__isnull=False
-                    ).exclude(pk=issue_item.pk).order_by('-issue_record__issue_date').first()
-
-                    if last_fuel and last_fuel.current_odometer is not None:
-                        issue_item.previous_odometer = last_fuel.current_odometer
-                        issue_item.distance_travelled = issue_item.current_odometer - last_fuel.current_odometer
-                    else:
-                        issue_item.previous_odometer = None
-                        issue_item.distance_travelled = 0
-                    
-                    # Save will trigger the model's calculate_fuel_efficiency() method
-                    issue_item.save()
-
-            Report.objects.create(report_type="issue_out", issue_record=issue, created_by=request.user)
+        try:
+            with transaction.atomic():
+                self._perform_issue_out(issue, request)
+        except InsufficientStockError as e:
+            return Response({"error": "Insufficient stock", "detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
             "status": "Issued successfully",
@@ -252,6 +333,115 @@ class IssueRecordViewSet(viewsets.ModelViewSet):
             "issue_date": timezone.now(),
         })
 
+    def _perform_issue_out(self, issue, request):
+        issue.status = "Issued"
+        issue.save()
+        for issue_item in issue.items.all():
+            issue_stock(issue_item.item, issue_item.quantity_issued, reference=issue.issue_id, user=request.user)
+
+            # Fuel tracking - distance and efficiency from the vehicle's last fill
+            issue_item.record_fuel_fill()
+
+        Report.objects.create(report_type="issue_out", issue_record=issue, created_by=request.user)
+
+    # --------------------------
+    # BULK ISSUE OUT
+    # --------------------------
+    @action(detail=False, methods=["post"])
+    def bulk_issue_out(self, request):
+        """
+        Issue out many approved requests in one transaction.
+
+        Body: {"ids": [issue_record_id, ...]}. The records and every item they
+        draw on are locked up front, in id order, and stock is checked per item
+        across the whole batch. Either all requests are issued or none is.
+        """
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            return Response({"error": "ids must be a non-empty list of issue record ids"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = sorted({int(pk) for pk in ids})
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be a non-empty list of issue record ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                issues = list(IssueRecord.objects.select_for_update().filter(pk__in=ids).order_by("pk"))
+                missing = sorted(set(ids) - {issue.pk for issue in issues})
+                if missing:
+                    return Response({"error": f"Issue records not found: {', '.join(map(str, missing))}"}, status=status.HTTP_400_BAD_REQUEST)
+
+                blocked = [
+                    {"id": issue.pk, "issue_id": issue.issue_id, "error": error}
+                    for issue, error in ((issue, self._issue_out_error(issue)) for issue in issues)
+                    if error
+                ]
+                if blocked:
+                    return Response({"error": "Some requests cannot be issued out", "issues": blocked}, status=status.HTTP_400_BAD_REQUEST)
+
+                items = self._perform_bulk_issue_out(issues, request)
+        except InsufficientStockError as e:
+            return Response({"error": "Insufficient stock", "detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "status": "Issued successfully",
+            "issued": [issue.issue_id for issue in issues],
+            "items": [
+                {"item_id": item.pk, "name": item.name, "remaining": item.quantity_in_stock}
+                for item in items.values()
+            ],
+            "issued_by": request.user.get_full_name(),
+            "issue_date": timezone.now(),
+        })
+
+    def _issue_out_error(self, issue):
+        if issue.status not in ["Pending", "Approved"]:
+            return f"Cannot issue out. Current status: {issue.status}"
+        if issue.issue_type in ["material", "fuel"] and issue.approval_status != "Approved":
+            return "MD approval required"
+        return None
+
+    def _perform_bulk_issue_out(self, issues, request):
+        issue_items = list(
+            IssueItem.objects.filter(issue_record__in=issues)
+            .select_related("item", "issue_record__issued_to", "issue_record__issued_by")
+            .order_by("issue_record_id", "id")
+        )
+        items = issue_stock_bulk(
+            [(i.item_id, i.quantity_issued, i.issue_record.issue_id) for i in issue_items],
+            user=request.user,
+        )
+
+        # Fuel tracking before the status flip, so seeding a vehicle's state
+        # from history only sees fills issued before this batch
+        IssueItem.record_fuel_fills(issue_items)
+
+        IssueRecord.objects.filter(pk__in=[issue.pk for issue in issues]).update(status="Issued")
+        for issue_item in issue_items:
+            issue_item.issue_record.status = "Issued"
+        sync_custody(issue_items)
+        Report.objects.bulk_create([
+            Report(report_type="issue_out", issue_record=issue, created_by=request.user)
+            for issue in issues
+        ])
+
+        # The queryset update skips post_save, so do what its receivers would
+        Notification.objects.bulk_create([
+            Notification(
+                user=i.issue_record.issued_by,
+                message=(
+                    f"Issue out update: {i.quantity_issued} {i.unit or i.item.unit} of {i.item.name} "
+                    f"issued to {i.issue_record.issued_to}, we have {items[i.item_id].quantity_in_stock} "
+                    f"{i.unit or i.item.unit} remaining."
+                ),
+            )
+            for i in issue_items
+        ])
+        transaction.on_commit(invalidate_forecast)
+        return items
+
     # --------------------------
     # RETURN ITEMS
     # --------------------------
@@ -301,6 +491,67 @@ class VehicleViewSet(viewsets.ModelViewSet):
         vehicles = Vehicle.objects.all()
         return Response(self.get_serializer(vehicles, many=True).data)
 
+    def _sigma(self, request):
+        raw = request.query_params.get("k")
+        if raw in (None, ""):
+            return fuel_analytics.DEFAULT_SIGMA
+        try:
+            sigma = float(raw)
+        except ValueError:
+            sigma = 0
+        # float() accepts "nan" and "inf", which would flag nothing or break the threshold
+        if not (math.isfinite(sigma) and sigma > 0):
+            raise ValueError("k must be a positive number.")
+        return sigma
+
+    @action(detail=False, methods=['get'], url_path='fuel-analytics')
+    def fleet_fuel_analytics(self, request):
+        """Per-vehicle km/L summary and every refuel more than k sigma off its baseline."""
+        try:
+            sigma = self._sigma(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        vehicles = list(self.get_queryset().select_related('item'))
+        series = fuel_analytics.vehicle_series([v.pk for v in vehicles])
+
+        fleet, flagged = [], []
+        for vehicle in vehicles:
+            fills = fuel_analytics.flag_anomalies(series.get(vehicle.pk, []), sigma)
+            fleet.append({
+                'vehicle_id': vehicle.pk,
+                'vehicle': vehicle.item.name,
+                'plate_number': vehicle.plate_number,
+                **fuel_analytics.summarize(fills),
+            })
+            flagged.extend(
+                {'vehicle_id': vehicle.pk, 'plate_number': vehicle.plate_number, **fill}
+                for fill in fills if fill['anomaly']
+            )
+
+        flagged.sort(key=lambda fill: fill['issue_date'], reverse=True)
+        return Response({'k': sigma, 'vehicles': fleet, 'anomalies': flagged})
+
+    @action(detail=True, methods=['get'], url_path='fuel-analytics')
+    def vehicle_fuel_analytics(self, request, pk=None):
+        """Full km/L series of one vehicle with its rolling baseline and anomaly flags."""
+        try:
+            sigma = self._sigma(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        vehicle = self.get_object()
+        fills = fuel_analytics.flag_anomalies(
+            fuel_analytics.vehicle_series([vehicle.pk])[vehicle.pk], sigma
+        )
+        return Response({
+            'vehicle': vehicle.item.name,
+            'plate_number': vehicle.plate_number,
+            'k': sigma,
+            'summary': fuel_analytics.summarize(fills),
+            'fills': fills,
+        })
+
     @action(detail=True, methods=['get'])
     def fuel_history(self, request, pk=None):
         vehicle = self.get_object()
@@ -308,11 +559,13 @@ class VehicleViewSet(viewsets.ModelViewSet):
             vehicle=vehicle, 
             issue_type='fuel',
             fuel_type='vehicle'
-        ).select_related('issued_to', 'issued_by', 'approved_by').prefetch_related('items').order_by('-issue_date')[:20]
+        ).select_related('issued_to', 'issued_by').prefetch_related('items').order_by('-issue_date')[:20]
 
         history = []
         for issue in fuel_issues:
-            issue_item = issue.items.first() if issue.items.exists() else None
+            # Read from the prefetch; .exists()/.first() would query per issue
+            items = list(issue.items.all())
+            issue_item = items[0] if items else None
             
             # Use the efficiency already calculated by the model
             fuel_efficiency = issue_item.efficiency if issue_item else None
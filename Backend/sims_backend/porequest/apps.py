@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PorequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'porequest'
+
+    def ready(self):
+        import porequest.signals
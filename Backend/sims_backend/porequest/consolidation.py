@@ -0,0 +1,114 @@
+# porequest/consolidation.py
+"""
+Consolidation of approved PO requests into purchase orders.
+
+Approved requests that are not yet on a purchase order are grouped by order
+type (one purchase order each) and by item (one line each, the requests'
+quantities summed). Orders, lines and the requests' links to their lines are
+written with bulk statements in one transaction, so a run costs the same
+handful of queries for five requests or five hundred.
+"""
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem
+from reports.models import Report
+from search.index import index_instances
+from .models import PORequest
+
+
+def consolidate_requests(request_ids=None):
+    """
+    Put approved, unconsumed requests on new purchase orders, optionally only
+    those in ``request_ids``. Returns the created orders as dicts with their
+    lines and the requests on each line; empty when there was nothing to do.
+    """
+    with transaction.atomic():
+        requests = PORequest.objects.select_for_update().filter(
+            approval_status="APPROVED",
+            purchase_order_item__isnull=True,
+        )
+        if request_ids is not None:
+            requests = requests.filter(pk__in=request_ids)
+        rows = list(
+            requests.order_by("pk").values_list("pk", "order_type", "item_id", "item__name", "requested_quantity")
+        )
+        if not rows:
+            return []
+
+        # order type -> item -> requests
+        groups = defaultdict(lambda: defaultdict(list))
+        names = {}
+        for pk, order_type, item_id, item_name, quantity in rows:
+            groups[order_type][item_id].append((pk, quantity))
+            names[item_id] = item_name
+
+        order_types = sorted(groups)
+        numbers = dict(zip(order_types, PurchaseOrder.allocate_numbers(len(order_types))))
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                order_number=numbers[order_type],
+                order_type=order_type,
+                notes=f"Consolidated from {sum(len(r) for r in groups[order_type].values())} approved PO requests.",
+            )
+            for order_type in order_types
+        ])
+        # Backends such as MySQL do not return ids from bulk inserts
+        orders = {
+            order.order_type: order
+            for order in PurchaseOrder.objects.filter(order_number__in=numbers.values())
+        }
+        # bulk_create skips the post_save hooks that index and log new orders
+        index_instances(list(orders.values()))
+        Report.objects.bulk_create([
+            Report(report_type="purchase_order", purchase_order=order) for order in orders.values()
+        ])
+
+        PurchaseOrderItem.objects.bulk_create([
+            PurchaseOrderItem(
+                purchase_order=orders[order_type],
+                item_id=item_id,
+                # Lines are whole units; part units are rounded up
+                quantity=math.ceil(sum(quantity for _, quantity in item_requests)),
+                reason="PO requests " + ", ".join(f"#{pk}" for pk, _ in item_requests),
+            )
+            for order_type in order_types
+            for item_id, item_requests in groups[order_type].items()
+        ])
+        lines = {
+            (line.purchase_order_id, line.item_id): line
+            for line in PurchaseOrderItem.objects.filter(purchase_order__in=orders.values())
+        }
+
+        line_of_request = {
+            pk: lines[orders[order_type].pk, item_id].pk
+            for order_type in order_types
+            for item_id, item_requests in groups[order_type].items()
+            for pk, _ in item_requests
+        }
+        PORequest.objects.filter(pk__in=line_of_request).update(purchase_order_item_id=Case(
+            *[When(pk=pk, then=Value(line_id)) for pk, line_id in line_of_request.items()],
+            output_field=IntegerField(),
+        ))
+
+    return [
+        {
+            "id": orders[order_type].pk,
+            "order_number": orders[order_type].order_number,
+            "order_type": order_type,
+            "items": [
+                {
+                    "id": lines[orders[order_type].pk, item_id].pk,
+                    "item": item_id,
+                    "item_name": names[item_id],
+                    "quantity": lines[orders[order_type].pk, item_id].quantity,
+                    "po_requests": [pk for pk, _ in item_requests],
+                }
+                for item_id, item_requests in groups[order_type].items()
+            ],
+        }
+        for order_type in order_types
+    ]
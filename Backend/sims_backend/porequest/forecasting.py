@@ -0,0 +1,166 @@
+# porequest/forecasting.py
+"""
+Demand forecasting for reorder suggestions.
+
+Issue history is bucketed into a weekly demand matrix (one row per item) and
+both forecasts are computed for every item at once with NumPy: a moving
+average over the last few weeks, and simple exponential smoothing written as
+one matrix-vector product with the decay weights instead of a per-item loop.
+
+The forecast is cached in the shared cache until new issues are recorded, so
+an invalidation from one worker is seen by all of them. Stock levels are read
+fresh each time suggestions are requested.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from inventory.models import Item
+from item_issuance.models import IssueItem
+
+HISTORY_WEEKS = 156
+MOVING_AVERAGE_WEEKS = 8
+SMOOTHING_ALPHA = 0.3
+SAFETY_FACTOR = 1.65  # roughly a 95% service level
+DEFAULT_COVER_WEEKS = 4
+
+# Issues whose goods actually left the store
+ISSUED_STATUSES = ("Issued", "Returned", "Partially_Returned")
+
+CACHE_KEY = "porequest:demand-forecast"
+CACHE_TIMEOUT = 60 * 60
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+
+
+# ----------------------------- MATHS -----------------------------
+
+def demand_matrix(item_ids, timestamps, quantities, start, weeks=HISTORY_WEEKS):
+    """
+    Sum issued quantities into an (items x weeks) matrix.
+
+    ``timestamps`` are POSIX seconds; column 0 is the week starting at
+    ``start``. Returns the sorted item ids and the matrix.
+    """
+    ids, rows = np.unique(item_ids, return_inverse=True)
+    cols = ((timestamps - start) // SECONDS_PER_WEEK).astype(np.int64)
+    keep = (cols >= 0) & (cols < weeks)
+    flat = rows[keep] * weeks + cols[keep]
+    totals = np.bincount(flat, weights=quantities[keep], minlength=len(ids) * weeks)
+    return ids, totals.reshape(len(ids), weeks)
+
+
+def forecast(matrix, alpha=SMOOTHING_ALPHA, window=MOVING_AVERAGE_WEEKS):
+    """
+    Weekly demand per row of ``matrix``.
+
+    Returns ``(moving_average, smoothed, spread)``. Exponential smoothing
+    starts from the first week, so its final level is
+    ``(1-a)^(T-1) x0 + sum a (1-a)^(T-1-t) xt`` for ``t >= 1``.
+    """
+    weeks = matrix.shape[1]
+    moving_average = matrix[:, -window:].mean(axis=1)
+
+    weights = alpha * (1 - alpha) ** np.arange(weeks - 1, -1, -1, dtype=float)
+    weights[0] = (1 - alpha) ** (weeks - 1)
+    smoothed = matrix @ weights
+
+    spread = matrix.std(axis=1)
+    return moving_average, smoothed, spread
+
+
+# ----------------------------- CACHE -----------------------------
+
+def build_forecast(now=None):
+    """Load issue history and forecast every item that has any."""
+    end = (now or timezone.now()).timestamp()
+    start = end - HISTORY_WEEKS * SECONDS_PER_WEEK
+
+    rows = IssueItem.objects.filter(
+        issue_record__status__in=ISSUED_STATUSES,
+        issue_record__issue_date__gte=datetime.fromtimestamp(start, tz=dt_timezone.utc),
+    ).values_list("item_id", "issue_record__issue_date", "quantity_issued", "returned_quantity")
+
+    item_ids, timestamps, quantities = [], [], []
+    for item_id, issue_date, issued, returned in rows.iterator(chunk_size=10000):
+        item_ids.append(item_id)
+        timestamps.append(issue_date.timestamp())
+        quantities.append(float(issued - returned))
+
+    if not item_ids:
+        empty = np.zeros(0)
+        return {"item_ids": np.zeros(0, dtype=np.int64), "moving_average": empty, "smoothed": empty, "spread": empty}
+
+    ids, matrix = demand_matrix(np.array(item_ids), np.array(timestamps), np.array(quantities), start)
+    moving_average, smoothed, spread = forecast(matrix)
+    return {
+        "item_ids": ids,
+        "moving_average": moving_average,
+        "smoothed": smoothed,
+        "spread": spread,
+    }
+
+
+def load_forecast():
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = build_forecast()
+        cache.set(CACHE_KEY, data, CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_forecast():
+    """Drop the cached forecast; call after issues are created or change status."""
+    cache.delete(CACHE_KEY)
+
+
+# ----------------------------- SUGGESTIONS -----------------------------
+
+def suggestions(cover_weeks=DEFAULT_COVER_WEEKS):
+    """
+    Recommended purchase quantities, largest first.
+
+    Target stock covers ``cover_weeks`` of smoothed demand plus safety stock,
+    and never less than the item's reorder level.
+    """
+    data = load_forecast()
+    ids = data["item_ids"]
+    if not len(ids):
+        return []
+
+    items = {
+        row["id"]: row
+        for row in Item.objects.filter(pk__in=ids.tolist()).exclude(category="vehicle")
+        .values("id", "name", "unit", "quantity_in_stock", "reorder_level")
+    }
+    present = np.array([pk in items for pk in ids.tolist()], dtype=bool)
+    ids = ids[present]
+    moving_average = data["moving_average"][present]
+    smoothed = data["smoothed"][present]
+    spread = data["spread"][present]
+
+    rows = [items[pk] for pk in ids.tolist()]
+    stock = np.array([float(row["quantity_in_stock"]) for row in rows])
+    reorder_level = np.array([float(row["reorder_level"] or 0) for row in rows])
+
+    demand = smoothed * cover_weeks
+    target = np.maximum(demand + SAFETY_FACTOR * spread * np.sqrt(cover_weeks), reorder_level)
+    recommended = np.ceil(np.maximum(target - stock, 0))
+
+    order = np.argsort(-recommended, kind="stable")
+    return [
+        {
+            "item_id": rows[i]["id"],
+            "item_name": rows[i]["name"].capitalize(),
+            "unit": rows[i]["unit"],
+            "quantity_in_stock": rows[i]["quantity_in_stock"],
+            "reorder_level": rows[i]["reorder_level"],
+            "weekly_moving_average": round(float(moving_average[i]), 2),
+            "weekly_smoothed_demand": round(float(smoothed[i]), 2),
+            "forecast_demand": round(float(demand[i]), 2),
+            "recommended_quantity": int(recommended[i]),
+        }
+        for i in order.tolist()
+        if recommended[i] > 0
+    ]
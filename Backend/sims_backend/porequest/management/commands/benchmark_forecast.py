@@ -0,0 +1,37 @@
+# porequest/management/commands/benchmark_forecast.py
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from porequest.forecasting import HISTORY_WEEKS, SECONDS_PER_WEEK, demand_matrix, forecast
+
+
+class Command(BaseCommand):
+    help = "Time the vectorized demand forecast on synthetic issue history (no database access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=5000)
+        parser.add_argument("--weeks", type=int, default=HISTORY_WEEKS)
+        parser.add_argument("--issues-per-week", type=float, default=2.0,
+                            help="Average issue lines per item per week.")
+
+    def handle(self, *args, **options):
+        items, weeks = options["items"], options["weeks"]
+        lines = int(items * weeks * options["issues_per_week"])
+        rng = np.random.default_rng(0)
+        start = 0.0
+        item_ids = rng.integers(1, items + 1, size=lines)
+        timestamps = rng.uniform(start, start + weeks * SECONDS_PER_WEEK, size=lines)
+        quantities = rng.gamma(2.0, 5.0, size=lines)
+
+        started = time.perf_counter()
+        ids, matrix = demand_matrix(item_ids, timestamps, quantities, start, weeks)
+        bucketed = time.perf_counter()
+        forecast(matrix)
+        finished = time.perf_counter()
+
+        self.stdout.write(f"{lines} issue lines, {len(ids)} items x {weeks} weeks")
+        self.stdout.write(f"bucket:   {(bucketed - started) * 1000:8.1f} ms")
+        self.stdout.write(f"forecast: {(finished - bucketed) * 1000:8.1f} ms")
+        self.stdout.write(f"total:    {(finished - started) * 1000:8.1f} ms")
@@ -0,0 +1,22 @@
+# porequest/management/commands/consolidate_po_requests.py
+from django.core.management.base import BaseCommand
+
+from porequest.consolidation import consolidate_requests
+
+
+class Command(BaseCommand):
+    help = "Put approved PO requests that are not on a purchase order yet onto new purchase orders."
+
+    def handle(self, *args, **options):
+        orders = consolidate_requests()
+        if not orders:
+            self.stdout.write("No approved requests are waiting for a purchase order.")
+            return
+
+        for order in orders:
+            requests = sum(len(line["po_requests"]) for line in order["items"])
+            self.stdout.write(
+                f"{order['order_number']} ({order['order_type']}): "
+                f"{len(order['items'])} line{'s' if len(order['items']) != 1 else ''} from {requests} request{'s' if requests != 1 else ''}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(orders)} purchase order{'s' if len(orders) != 1 else ''} created."))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('porequest', '0001_initial'),
+        ('purchase_order', '0009_purchaseorderitemsupplier_invoice_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='porequest',
+            name='order_type',
+            field=models.CharField(choices=[('reorder', 'Reorder'), ('accumulate', 'Accumulate')], default='reorder', help_text='Kind of purchase order the request is consolidated into', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='porequest',
+            name='purchase_order_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='po_requests', to='purchase_order.purchaseorderitem'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from inventory.models import Item
 from employees.models import Employee
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem
 
 
 class PORequest(models.Model):
@@ -42,6 +43,13 @@ class PORequest(models.Model):
 
     remarks = models.TextField(blank=True, null=True)
 
+    order_type = models.CharField(
+        max_length=20,
+        choices=PurchaseOrder.ORDER_TYPES,
+        default="reorder",
+        help_text="Kind of purchase order the request is consolidated into"
+    )
+
     # -------------------------
     # Approval
     # -------------------------
@@ -54,6 +62,18 @@ class PORequest(models.Model):
     approval_comment = models.TextField(blank=True, null=True)
     approved_at = models.DateTimeField(blank=True, null=True)
 
+    # -------------------------
+    # Consolidation
+    # -------------------------
+    # Set once the request is on a purchase order; see consolidation.py
+    purchase_order_item = models.ForeignKey(
+        PurchaseOrderItem,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="po_requests"
+    )
+
     # -------------------------
     # Audit
     # -------------------------
@@ -0,0 +1,12 @@
+from rest_framework import permissions
+
+class IsStoreManager(permissions.BasePermission):
+    """
+    Custom permission to allow only Store Managers to turn approved requests into purchase orders
+    """
+    def has_permission(self, request, view):
+        return (
+            request.user
+            and request.user.is_authenticated
+            and request.user.role == "StoreManager"
+        )
@@ -19,14 +19,17 @@ class PORequestSerializer(serializers.ModelSerializer):
             "employee",
             "employee_name",
             "remarks",
+            "order_type",
             "approval_status",
             "approval_comment",
             "approved_at",
+            "purchase_order_item",
         ]
         read_only_fields = [
             "quantity_in_stock",
             "approval_status",
             "approved_at",
+            "purchase_order_item",
         ]
 
     def get_employee_name(self, obj):
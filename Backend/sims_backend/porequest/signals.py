@@ -0,0 +1,15 @@
+# porequest/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from item_issuance.models import IssueRecord, IssueItem
+from .forecasting import invalidate_forecast
+
+
+@receiver(post_save, sender=IssueItem)
+@receiver(post_delete, sender=IssueItem)
+@receiver(post_save, sender=IssueRecord)
+@receiver(post_delete, sender=IssueRecord)
+def issue_history_changed(sender, **kwargs):
+    """New or changed issues make the cached demand forecast stale."""
+    invalidate_forecast()
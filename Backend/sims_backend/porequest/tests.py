@@ -1,3 +1,214 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from inventory.models import Item
+from item_issuance.models import IssueItem, IssueRecord
+from notifications_app.models import Notification
+from purchase_order.models import PurchaseOrder
+from reports.models import Report
+from search.models import SearchEntry
+
+from users.models import CustomUser
+
+from .consolidation import consolidate_requests
+from .forecasting import CACHE_KEY
+from .models import PORequest
+
+
+class ConsolidationTests(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.nails = Item.objects.create(name="Nails", category="material", unit="kg", quantity_to_add=10)
+        # Start the order number sequence so its one-off setup is not counted
+        PurchaseOrder.allocate_numbers(1)
+
+    def _request(self, item, quantity, order_type="reorder", approval_status="APPROVED"):
+        return PORequest.objects.create(
+            item=item, requested_quantity=Decimal(quantity), quantity_in_stock=0,
+            employee=self.employee, order_type=order_type, approval_status=approval_status,
+        )
+
+    def test_requests_are_grouped_by_order_type_and_item(self):
+        first = self._request(self.cement, "2.5")
+        second = self._request(self.cement, "1.2")
+        nails = self._request(self.nails, "4")
+        accumulate = self._request(self.cement, "3", order_type="accumulate")
+        pending = self._request(self.cement, "9", approval_status="PENDING")
+
+        orders = {order["order_type"]: order for order in consolidate_requests()}
+
+        self.assertEqual(set(orders), {"reorder", "accumulate"})
+        lines = {line["item"]: line for line in orders["reorder"]["items"]}
+        # 2.5 + 1.2 rounds up to whole units
+        self.assertEqual(lines[self.cement.pk]["quantity"], 4)
+        self.assertEqual(lines[self.cement.pk]["po_requests"], [first.pk, second.pk])
+        self.assertEqual(lines[self.nails.pk]["quantity"], 4)
+        self.assertEqual(orders["accumulate"]["items"][0]["po_requests"], [accumulate.pk])
+
+        for request in (first, second, nails, accumulate, pending):
+            request.refresh_from_db()
+        self.assertEqual(first.purchase_order_item_id, lines[self.cement.pk]["id"])
+        self.assertEqual(second.purchase_order_item_id, lines[self.cement.pk]["id"])
+        self.assertEqual(nails.purchase_order_item_id, lines[self.nails.pk]["id"])
+        self.assertIsNone(pending.purchase_order_item_id)
+
+        # The hooks skipped by the bulk inserts: report log and search index
+        order_ids = [order["id"] for order in orders.values()]
+        self.assertEqual(Report.objects.filter(purchase_order__in=order_ids).count(), 2)
+        self.assertEqual(
+            SearchEntry.objects.filter(entity_type="purchase_order", object_id__in=order_ids).count(), 2
+        )
+
+        # Linked requests are not consolidated twice
+        self.assertEqual(consolidate_requests(), [])
+
+    def test_query_count_does_not_grow_with_requests(self):
+        for count in (3, 300):
+            for i in range(count):
+                self._request(self.cement if i % 2 else self.nails, "1.5")
+            # Requests, order numbers, orders, index entries, report rows, lines,
+            # request links, and their savepoints
+            with self.assertNumQueries(19):
+                orders = consolidate_requests()
+            self.assertEqual(sum(len(line["po_requests"]) for line in orders[0]["items"]), count)
+
+        self.assertEqual(PurchaseOrder.objects.count(), 2)
+
+    def test_only_store_managers_can_consolidate(self):
+        self._request(self.cement, "2")
+        url = "/api/porequests/consolidate/"
+        client = APIClient()
+        self.assertEqual(client.post(url, {}, format="json").status_code, 401)
+
+        client.force_authenticate(
+            CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        )
+        self.assertEqual(client.post(url, {}, format="json").status_code, 403)
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+        client.force_authenticate(
+            CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        )
+        response = client.post(url, {}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(PurchaseOrder.objects.count(), 1)
+
+
+class SuggestionTests(TestCase):
+    URL = "/api/porequests/suggestions/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        # Ten bags a week for the last eight weeks; bulk inserts skip the signals
+        now = timezone.now()
+        IssueRecord.objects.bulk_create([
+            IssueRecord(
+                issue_id=f"ISSUE-H{week}", issued_to=self.employee, issued_by=self.user, issue_type="material",
+                status="Issued", issue_date=now - timedelta(weeks=week, days=1),
+            )
+            for week in range(8)
+        ])
+        IssueItem.objects.bulk_create([
+            IssueItem(issue_record=record, item=self.cement, quantity_issued=10)
+            for record in IssueRecord.objects.all()
+        ])
+
+    def _suggestion(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return {row["item_name"]: row for row in response.data["suggestions"]}
+
+    def test_suggestions_cover_the_forecast_demand(self):
+        self.assertEqual(self._suggestion(), {})
+
+        row = self._suggestion(weeks=52)["Cement"]
+        self.assertEqual(row["weekly_moving_average"], 10)
+        self.assertGreater(row["recommended_quantity"], 0)
+
+        for weeks in ("0", "53", "abc"):
+            self.assertEqual(self.client.get(self.URL, {"weeks": weeks}).status_code, 400)
+
+    def test_issuing_drops_the_cached_forecast(self):
+        before = self._suggestion(weeks=52)["Cement"]
+        self.assertIsNotNone(cache.get(CACHE_KEY))
+
+        record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="material", approval_status="Approved",
+        )
+        IssueItem.objects.create(issue_record=record, item=self.cement, quantity_issued=40)
+        # The pending request is not demand yet; cache the forecast again past its creation signals
+        self.assertEqual(self._suggestion(weeks=52)["Cement"], before)
+        self.assertIsNotNone(cache.get(CACHE_KEY))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/item_issuance/issuerecords/bulk_issue_out/", {"ids": [record.pk]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertIsNone(cache.get(CACHE_KEY))
+        after = self._suggestion(weeks=52)["Cement"]
+        self.assertEqual(after["weekly_moving_average"], before["weekly_moving_average"] + 5)
+
+
+class BatchApprovalTests(TestCase):
+    URL = "/api/porequests/md/approve/batch/"
+
+    def setUp(self):
+        self.md = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.sm = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        CustomUser.objects.create(username="sm2", email="sm2@example.com", role="StoreManager", password="x")
+        employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        self.requests = [
+            PORequest.objects.create(
+                item=cement, requested_quantity=Decimal("2"), quantity_in_stock=0, employee=employee, order_type="reorder",
+            )
+            for _ in range(3)
+        ]
+        self.ids = [request.pk for request in self.requests]
+        self.client = APIClient()
+        self.client.force_authenticate(self.md)
+
+    def _statuses(self):
+        return list(PORequest.objects.filter(pk__in=self.ids).order_by("pk").values_list("approval_status", flat=True))
+
+    def test_only_the_managing_director_can_decide(self):
+        self.client.force_authenticate(self.sm)
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "APPROVED"}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        response = APIClient().post(self.URL, {"ids": self.ids, "approval_status": "APPROVED"}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self._statuses(), ["PENDING"] * 3)
+
+    def test_one_processed_request_rejects_the_whole_batch(self):
+        PORequest.objects.filter(pk=self.ids[1]).update(approval_status="REJECTED")
+
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "APPROVED"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["ids"], [self.ids[1]])
+        self.assertEqual(self._statuses(), ["PENDING", "REJECTED", "PENDING"])
+        self.assertFalse(Notification.objects.filter(message__contains="Managing Director").exists())
+
+    def test_batch_sends_one_notification_per_store_manager(self):
+        response = self.client.post(self.URL, {"ids": self.ids, "approval_status": "APPROVED"}, format="json")
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._statuses(), ["APPROVED"] * 3)
+        notes = Notification.objects.filter(message__contains="by the Managing Director")
+        self.assertEqual(sorted(note.user.username for note in notes), ["sm", "sm2"])
+        self.assertTrue(all(note.message.startswith("3 PO requests approved") for note in notes))
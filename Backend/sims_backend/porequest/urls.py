@@ -2,14 +2,19 @@ from django.urls import path
 from .views import (
     PORequestCreateView,
     PORequestListView,
+    PORequestSuggestionView,
+    PORequestConsolidateView,
     MDPORequestListView,
     MDPORequestApprovalView,
+    MDPORequestBatchApprovalView,
 )
 
 urlpatterns = [
     # Store Manager
     path("create/", PORequestCreateView.as_view(), name="po-request-create"),
     path("list/", PORequestListView.as_view(), name="po-request-list"),
+    path("suggestions/", PORequestSuggestionView.as_view(), name="po-request-suggestions"),
+    path("consolidate/", PORequestConsolidateView.as_view(), name="po-request-consolidate"),
 
     # Managing Director
     path("md/list/", MDPORequestListView.as_view(), name="md-po-request-list"),
@@ -18,4 +23,9 @@ urlpatterns = [
         MDPORequestApprovalView.as_view(),
         name="md-po-request-approve",
     ),
+    path(
+        "md/approve/batch/",
+        MDPORequestBatchApprovalView.as_view(),
+        name="md-po-request-batch-approve",
+    ),
 ]
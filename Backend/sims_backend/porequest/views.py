@@ -1,10 +1,21 @@
 from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 
+from .consolidation import consolidate_requests
+from .forecasting import DEFAULT_COVER_WEEKS, suggestions
 from .models import PORequest
+from .permissions import IsStoreManager
 from .serializers import PORequestSerializer
 from inventory.models import Item
+from item_issuance.permissions import IsManagingDirector
+from notifications_app.models import Notification
+
+User = get_user_model()
 
 
 # ================================
@@ -22,6 +33,28 @@ class PORequestCreateView(generics.CreateAPIView):
         )
 
 
+# ================================
+# Store Manager – Reorder Suggestions
+# ================================
+class PORequestSuggestionView(APIView):
+
+    def get(self, request):
+        try:
+            cover_weeks = int(request.query_params.get("weeks", DEFAULT_COVER_WEEKS))
+        except ValueError:
+            cover_weeks = 0
+        if not 1 <= cover_weeks <= 52:
+            return Response(
+                {"detail": "weeks must be a whole number between 1 and 52."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "cover_weeks": cover_weeks,
+            "suggestions": suggestions(cover_weeks),
+        })
+
+
 # ================================
 # Store Manager – View Own Requests
 # ================================
@@ -69,3 +102,116 @@ class MDPORequestApprovalView(generics.UpdateAPIView):
 
         serializer = self.get_serializer(po_request)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# ================================
+# Managing Director – Batch Approve / Reject
+# ================================
+class MDPORequestBatchApprovalView(APIView):
+    """
+    Approve or reject many pending requests at once.
+
+    Body: {"ids": [...], "approval_status": "APPROVED" | "REJECTED",
+    "approval_comment": ""}. The requests are checked with one locking SELECT
+    and changed with one UPDATE; if any of them has already been processed
+    nothing is changed.
+    """
+    permission_classes = [IsAuthenticated, IsManagingDirector]
+
+    def post(self, request):
+        ids = request.data.get("ids")
+        status_value = request.data.get("approval_status")
+        comment = request.data.get("approval_comment", "")
+
+        if status_value not in ["APPROVED", "REJECTED"]:
+            return Response(
+                {"detail": "Invalid approval status."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = sorted({int(pk) for pk in ids}) if isinstance(ids, list) else []
+        except (TypeError, ValueError):
+            ids = []
+        if not ids:
+            return Response(
+                {"detail": "ids must be a non-empty list of request ids."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            rows = list(
+                PORequest.objects.select_for_update().filter(pk__in=ids).order_by("pk")
+                .values_list("pk", "approval_status", "item__name")
+            )
+            missing = sorted(set(ids) - {row[0] for row in rows})
+            if missing:
+                return Response(
+                    {"detail": f"Requests not found: {', '.join(map(str, missing))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            processed = [pk for pk, current, _ in rows if current != "PENDING"]
+            if processed:
+                return Response(
+                    {"detail": "Some requests have already been processed.", "ids": processed},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            PORequest.objects.filter(pk__in=ids).update(
+                approval_status=status_value,
+                approval_comment=comment,
+                approved_at=timezone.now(),
+            )
+
+            decision = status_value.lower()
+            names = ", ".join(sorted({name for _, _, name in rows}))
+            message = f"{len(rows)} PO request{'s' if len(rows) != 1 else ''} {decision} by the Managing Director: {names}."
+            Notification.objects.bulk_create([
+                Notification(user=user, message=message)
+                for user in User.objects.filter(role="StoreManager")
+            ])
+
+        return Response({
+            "detail": f"{len(rows)} request{'s' if len(rows) != 1 else ''} {decision}.",
+            "approval_status": status_value,
+            "ids": ids,
+        }, status=status.HTTP_200_OK)
+
+
+# ================================
+# Consolidate Approved Requests into Purchase Orders
+# ================================
+class PORequestConsolidateView(APIView):
+    """
+    Put approved requests that are not on a purchase order yet onto new
+    purchase orders: one per order type, one line per item.
+
+    Body (optional): {"ids": [...]} to consolidate only those requests.
+    """
+    permission_classes = [IsAuthenticated, IsStoreManager]
+
+    def post(self, request):
+        ids = request.data.get("ids")
+        if ids is not None:
+            try:
+                ids = sorted({int(pk) for pk in ids}) if isinstance(ids, list) else []
+            except (TypeError, ValueError):
+                ids = []
+            if not ids:
+                return Response(
+                    {"detail": "ids must be a non-empty list of request ids."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        orders = consolidate_requests(ids)
+        if not orders:
+            return Response(
+                {"detail": "No approved requests are waiting for a purchase order.", "purchase_orders": []},
+                status=status.HTTP_200_OK
+            )
+
+        consolidated = sum(len(line["po_requests"]) for order in orders for line in order["items"])
+        return Response({
+            "detail": f"{consolidated} request{'s' if consolidated != 1 else ''} consolidated into "
+                      f"{len(orders)} purchase order{'s' if len(orders) != 1 else ''}.",
+            "purchase_orders": orders,
+        }, status=status.HTTP_201_CREATED)
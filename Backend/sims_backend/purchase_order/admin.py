@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import PurchaseOrder, PurchaseOrderItem
+from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderTransition, SupplierPrice, SupplierPriceSummary
 
 admin.site.register(PurchaseOrder)
 admin.site.register(PurchaseOrderItem)
+admin.site.register(PurchaseOrderTransition)
+admin.site.register(SupplierPrice)
+admin.site.register(SupplierPriceSummary)
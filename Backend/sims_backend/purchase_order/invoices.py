@@ -0,0 +1,127 @@
+# purchase_order/invoices.py
+"""
+Invoice files.
+
+Uploads are stored under their SHA-256 digest, so an invoice uploaded for
+several suppliers or orders is kept once and every quote points at the same
+file. Both hashing and saving read the upload chunk by chunk.
+
+``zip_stream`` yields a ZIP archive of invoices piece by piece as files are
+read, so a bundle of any size is never held in memory.
+"""
+import csv
+import hashlib
+import io
+import os
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+INVOICE_DIR = "invoices/sha256"
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+# ----------------------------- STORAGE -----------------------------
+
+def content_address(digest, filename):
+    """Storage name of a file with SHA-256 ``digest``, keeping the upload's extension."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if not extension[1:].isalnum() or len(extension) > 10:
+        extension = ""
+    return f"{INVOICE_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+def store_invoice(upload):
+    """
+    Save ``upload`` under its content address unless an identical file is
+    already stored. Returns ``(storage_name, sha256_hex)``.
+    """
+    sha256 = hashlib.sha256()
+    for chunk in upload.chunks():
+        sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    name = content_address(digest, upload.name)
+    if not default_storage.exists(name):
+        upload.seek(0)
+        saved = default_storage.save(name, upload)
+        if saved != name:
+            # Another request stored the same content first; keep that copy
+            default_storage.delete(saved)
+    return name, digest
+
+
+# ----------------------------- ZIP BUNDLE -----------------------------
+
+class _Drain(io.RawIOBase):
+    """Write-only sink that hands back whatever ZipFile has written since the last drain."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _archive_name(order_number, entry):
+    stem = get_valid_filename(f"{entry['item_name']}-{entry['supplier_name']}") or "invoice"
+    extension = os.path.splitext(entry["invoice"])[1].lower()
+    return f"{order_number}/{stem}{extension}"
+
+
+def zip_stream(entries):
+    """
+    Yield a ZIP archive of invoice ``entries`` (dicts with ``order_number``,
+    ``item_name``, ``supplier_name``, ``invoice`` and ``invoice_sha256``).
+
+    Each stored file is added once per order; ``manifest.csv`` maps every
+    quote to its file in the archive, or notes a file missing from storage.
+    """
+    sink = _Drain()
+    manifest = [("order_number", "item", "supplier", "file")]
+    archived, used_names = {}, set()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            order_number = entry["order_number"]
+            key = (order_number, entry["invoice_sha256"] or entry["invoice"])
+
+            if key not in archived:
+                name = _archive_name(order_number, entry)
+                stem, extension = os.path.splitext(name)
+                suffix = 1
+                while name in used_names:
+                    suffix += 1
+                    name = f"{stem}-{suffix}{extension}"
+
+                try:
+                    source = default_storage.open(entry["invoice"], "rb")
+                except OSError:
+                    archived[key] = "missing"
+                else:
+                    with source, archive.open(name, "w", force_zip64=True) as target:
+                        for chunk in source.chunks(ZIP_CHUNK_SIZE):
+                            target.write(chunk)
+                            data = sink.drain()
+                            if data:
+                                yield data
+                    used_names.add(name)
+                    archived[key] = name
+
+            manifest.append((order_number, entry["item_name"], entry["supplier_name"], archived[key]))
+
+        text = io.StringIO()
+        csv.writer(text).writerows(manifest)
+        archive.writestr("manifest.csv", text.getvalue())
+
+    yield sink.drain()
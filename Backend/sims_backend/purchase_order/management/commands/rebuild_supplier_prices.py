@@ -0,0 +1,12 @@
+# purchase_order/management/commands/rebuild_supplier_prices.py
+from django.core.management.base import BaseCommand
+
+from purchase_order.pricing import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute the per item and supplier price summaries from the price history."
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"{count} item/supplier price summar{'ies' if count != 1 else 'y'} rebuilt."))
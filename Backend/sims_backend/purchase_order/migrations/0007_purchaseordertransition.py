@@ -0,0 +1,33 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_order', '0006_purchaseorder_amount_paid_purchaseorder_payment_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transition', models.CharField(max_length=20)),
+                ('field', models.CharField(max_length=30)),
+                ('from_state', models.CharField(max_length=20)),
+                ('to_state', models.CharField(max_length=20)),
+                ('details', models.JSONField(blank=True, null=True)),
+                ('performed_at', models.DateTimeField(auto_now_add=True)),
+                ('performed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='purchase_order.purchaseorder')),
+            ],
+            options={
+                'ordering': ['performed_at', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from statistics import median
+
+from django.db import migrations, models
+
+
+def backfill_prices(apps, schema_editor):
+    """Seed the history with every existing quote, dated by its order, and summarise it."""
+    Quote = apps.get_model("purchase_order", "PurchaseOrderItemSupplier")
+    SupplierPrice = apps.get_model("purchase_order", "SupplierPrice")
+    SupplierPriceSummary = apps.get_model("purchase_order", "SupplierPriceSummary")
+
+    quotes = Quote.objects.order_by("order_item__purchase_order__created_at", "pk").values_list(
+        "pk", "order_item__item_id", "supplier_name", "amount_per_unit", "order_item__purchase_order__created_at"
+    )
+    rows, history = [], {}
+    for pk, item_id, name, price, created_at in quotes:
+        key = " ".join((name or "").split()).casefold()
+        rows.append(SupplierPrice(
+            item_id=item_id, supplier_name=name, supplier_key=key,
+            unit_price=price, quoted_at=created_at, quote_id=pk,
+        ))
+        history.setdefault((item_id, key), []).append((created_at, price, name))
+    SupplierPrice.objects.bulk_create(rows, batch_size=1000)
+
+    summaries = []
+    for (item_id, key), quoted in history.items():
+        prices = sorted(price for _, price, _ in quoted)
+        summaries.append(SupplierPriceSummary(
+            item_id=item_id, supplier_key=key, supplier_name=quoted[-1][2],
+            latest_price=quoted[-1][1], median_price=Decimal(median(prices)).quantize(Decimal("0.01")),
+            min_price=prices[0], quote_count=len(prices), last_quoted_at=quoted[-1][0],
+        ))
+    SupplierPriceSummary.objects.bulk_create(summaries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_lowstockitem'),
+        ('purchase_order', '0007_purchaseordertransition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('supplier_name', models.CharField(max_length=100)),
+                ('supplier_key', models.CharField(help_text='Supplier name normalised for grouping.', max_length=100)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quoted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_prices', to='inventory.item')),
+                ('quote', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='price_history', to='purchase_order.purchaseorderitemsupplier')),
+            ],
+            options={
+                'ordering': ['quoted_at', 'id'],
+                'indexes': [models.Index(fields=['item', 'supplier_key', 'quoted_at'], name='purchase_or_item_id_4562c1_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SupplierPriceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('supplier_key', models.CharField(max_length=100)),
+                ('supplier_name', models.CharField(max_length=100)),
+                ('latest_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('median_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quote_count', models.PositiveIntegerField()),
+                ('last_quoted_at', models.DateTimeField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_price_summaries', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'latest_price'], name='purchase_or_item_id_34a518_idx'), models.Index(fields=['supplier_key'], name='purchase_or_supplie_2b516d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'supplier_key'), name='one_price_summary_per_item_supplier')],
+            },
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+    ]
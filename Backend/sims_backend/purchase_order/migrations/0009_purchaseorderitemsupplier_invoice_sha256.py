@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_order', '0008_supplierprice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorderitemsupplier',
+            name='invoice_sha256',
+            field=models.CharField(blank=True, default='', help_text='Content address of the invoice file; set by upload_invoice.', max_length=64),
+        ),
+    ]
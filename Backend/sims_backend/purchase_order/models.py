@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from inventory.models import Item
+from sequences.services import last_number, next_numbers
+from sims_backend.tracking import FieldTrackerMixin
 
 
-class PurchaseOrder(models.Model):
+class PurchaseOrder(FieldTrackerMixin, models.Model):
 
     # order types
     ORDER_TYPES = [
@@ -21,6 +24,11 @@ class PurchaseOrder(models.Model):
         ('donors_money', 'Donors Money'),
     ]
 
+    tracked_fields = (
+        'approval_status', 'payment_status', 'delivery_status',
+        'accounts_with_money', 'approved_account', 'amount_paid',
+    )
+
     # basic info
     order_number = models.CharField(max_length=20, unique=True, blank=True)
     order_type = models.CharField(max_length=20, choices=ORDER_TYPES)
@@ -89,19 +97,18 @@ class PurchaseOrder(models.Model):
     def clean(self):
 
         if self.pk:
-            old = PurchaseOrder.objects.get(pk=self.pk)
 
             # prevent account change after md approval
-            if old.approval_status == "approved":
-                if old.accounts_with_money != self.accounts_with_money:
+            if self.previous("approval_status") == "approved":
+                if self.has_changed("accounts_with_money"):
                     raise ValidationError("Cannot modify accounts after MD approval.")
 
             # prevent editing payment after paid
-            if old.payment_status == "paid":
-                if old.amount_paid != self.amount_paid:
+            if self.previous("payment_status") == "paid":
+                if self.has_changed("amount_paid"):
                     raise ValidationError("Cannot modify amount after payment is recorded.")
 
-                if old.approved_account != self.approved_account:
+                if self.has_changed("approved_account"):
                     raise ValidationError("Cannot change approved account after payment.")
 
         # md approval validation
@@ -133,12 +140,7 @@ class PurchaseOrder(models.Model):
 
         # generate order number
         if not self.order_number:
-            last_order = PurchaseOrder.objects.order_by('-id').first()
-            if last_order and last_order.order_number.startswith("PO"):
-                last_num = int(last_order.order_number.replace("PO", ""))
-                self.order_number = f"PO{last_num + 1}"
-            else:
-                self.order_number = "PO1"
+            self.order_number = PurchaseOrder.allocate_numbers()[0]
 
         # auto set delivery date
         if self.delivery_status == "delivered" and not self.delivery_date:
@@ -151,6 +153,12 @@ class PurchaseOrder(models.Model):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def allocate_numbers(cls, count=1):
+        """Reserve the next ``count`` order numbers (PO1, PO2, ...)."""
+        numbers = next_numbers("purchase_order", count, start=lambda: last_number(cls.objects, "order_number", "PO"))
+        return [f"PO{n}" for n in numbers]
+
     def __str__(self):
         return f"Order #{self.order_number} ({self.get_order_type_display()})"
 
@@ -177,8 +185,13 @@ class PurchaseOrderItem(models.Model):
     def __str__(self):
         return f"{self.item.name} - {self.quantity} {self.item.unit} (Order #{self.purchase_order.order_number})"
 
+    def approved_supplier(self):
+        """Supplier approved by the MD, or None. Uses prefetched ``suppliers`` when present."""
+        return next((supplier for supplier in self.suppliers.all() if supplier.approved_by_md), None)
+
 
-class PurchaseOrderItemSupplier(models.Model):
+class PurchaseOrderItemSupplier(FieldTrackerMixin, models.Model):
+    tracked_fields = ('supplier_name', 'amount_per_unit')
 
     # link to order item
     order_item = models.ForeignKey(
@@ -190,6 +203,12 @@ class PurchaseOrderItemSupplier(models.Model):
     supplier_name = models.CharField(max_length=100)
     amount_per_unit = models.DecimalField(max_digits=10, decimal_places=2)
     invoice = models.FileField(upload_to='invoices/', blank=True, null=True)
+    invoice_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="Content address of the invoice file; set by upload_invoice."
+    )
     approved_by_md = models.BooleanField(default=False)
 
     def __str__(self):
@@ -213,3 +232,97 @@ class PurchaseOrderItemSupplier(models.Model):
                 name='only_one_approved_supplier_per_item'
             )
         ]
+
+
+
+class PurchaseOrderTransition(models.Model):
+    """Audit trail of approval, payment and delivery changes; see ``transitions.py``."""
+
+    purchase_order = models.ForeignKey(
+        PurchaseOrder,
+        on_delete=models.CASCADE,
+        related_name='transitions'
+    )
+
+    transition = models.CharField(max_length=20)
+    field = models.CharField(max_length=30)
+    from_state = models.CharField(max_length=20)
+    to_state = models.CharField(max_length=20)
+    details = models.JSONField(blank=True, null=True)
+
+    performed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    performed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['performed_at', 'id']
+
+    def __str__(self):
+        return f"{self.purchase_order_id}: {self.field} {self.from_state} -> {self.to_state}"
+
+
+class SupplierPrice(models.Model):
+    """One quoted unit price, appended whenever a supplier quote is saved; see ``pricing.py``."""
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name='supplier_prices'
+    )
+
+    supplier_name = models.CharField(max_length=100)
+    supplier_key = models.CharField(max_length=100, help_text="Supplier name normalised for grouping.")
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quoted_at = models.DateTimeField(default=timezone.now)
+
+    quote = models.ForeignKey(
+        PurchaseOrderItemSupplier,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='price_history'
+    )
+
+    class Meta:
+        ordering = ['quoted_at', 'id']
+        indexes = [
+            models.Index(fields=['item', 'supplier_key', 'quoted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier_name} - {self.unit_price} ({self.item_id})"
+
+
+class SupplierPriceSummary(models.Model):
+    """Latest, median and lowest quoted price per item and supplier, rebuilt from ``SupplierPrice``."""
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name='supplier_price_summaries'
+    )
+
+    supplier_key = models.CharField(max_length=100)
+    supplier_name = models.CharField(max_length=100)
+    latest_price = models.DecimalField(max_digits=10, decimal_places=2)
+    median_price = models.DecimalField(max_digits=10, decimal_places=2)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quote_count = models.PositiveIntegerField()
+    last_quoted_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'supplier_key'], name='one_price_summary_per_item_supplier'),
+        ]
+        indexes = [
+            models.Index(fields=['item', 'latest_price']),
+            models.Index(fields=['supplier_key']),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier_name} - {self.latest_price} ({self.item_id})"
@@ -0,0 +1,169 @@
+# purchase_order/pricing.py
+"""
+Supplier price history.
+
+Every saved quote (``PurchaseOrderItemSupplier``) appends a ``SupplierPrice``
+row, and the ``SupplierPriceSummary`` row for its item and supplier is
+rebuilt from that pair's history. Price lookups and supplier suggestions
+then read the summaries instead of scanning past purchase orders.
+"""
+import operator
+from decimal import Decimal
+from functools import reduce
+from statistics import median
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import SupplierPrice, SupplierPriceSummary
+
+CENT = Decimal("0.01")
+DEFAULT_SUGGESTIONS = 3
+MAX_SUGGESTIONS = 10
+
+
+def supplier_key(name):
+    """Grouping key for a supplier name: case and spacing are ignored."""
+    return " ".join((name or "").split()).casefold()
+
+
+def price_stats(history):
+    """Latest, median and lowest price of ``(quoted_at, unit_price)`` pairs in time order."""
+    prices = sorted(price for _, price in history)
+    return {
+        "latest_price": history[-1][1],
+        "median_price": Decimal(median(prices)).quantize(CENT),
+        "min_price": prices[0],
+        "quote_count": len(prices),
+        "last_quoted_at": history[-1][0],
+    }
+
+
+# ----------------------------- RECORDING -----------------------------
+
+def record_quotes(quotes):
+    """Append the current price of each saved quote and refresh the affected summaries."""
+    now = timezone.now()
+    rows = [
+        SupplierPrice(
+            item_id=quote.order_item.item_id,
+            supplier_name=quote.supplier_name,
+            supplier_key=supplier_key(quote.supplier_name),
+            unit_price=quote.amount_per_unit,
+            quoted_at=now,
+            quote=quote,
+        )
+        for quote in quotes
+    ]
+    if not rows:
+        return
+
+    with transaction.atomic():
+        SupplierPrice.objects.bulk_create(rows)
+        refresh_summaries({(row.item_id, row.supplier_key) for row in rows})
+
+
+def refresh_summaries(pairs):
+    """Rebuild the summaries of ``(item_id, supplier_key)`` pairs from their history."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+
+    item_ids = {item_id for item_id, _ in pairs}
+    keys = {key for _, key in pairs}
+
+    # One indexed read covering every pair; unrelated combinations are skipped
+    history, names = {}, {}
+    rows = (
+        SupplierPrice.objects.filter(item_id__in=item_ids, supplier_key__in=keys)
+        .order_by("quoted_at", "id")
+        .values_list("item_id", "supplier_key", "supplier_name", "quoted_at", "unit_price")
+    )
+    for item_id, key, name, quoted_at, price in rows:
+        if (item_id, key) in pairs:
+            history.setdefault((item_id, key), []).append((quoted_at, price))
+            names[item_id, key] = name
+
+    summaries = [
+        SupplierPriceSummary(item_id=item_id, supplier_key=key, supplier_name=names[item_id, key],
+                             **price_stats(prices))
+        for (item_id, key), prices in history.items()
+    ]
+
+    stale = reduce(operator.or_, (Q(item_id=item_id, supplier_key=key) for item_id, key in pairs))
+    with transaction.atomic():
+        SupplierPriceSummary.objects.filter(stale).delete()
+        SupplierPriceSummary.objects.bulk_create(summaries)
+
+
+def rebuild_summaries():
+    """Recompute the whole summary table from the history. Returns the number of rows."""
+    history, names = {}, {}
+    rows = (
+        SupplierPrice.objects.order_by("quoted_at", "id")
+        .values_list("item_id", "supplier_key", "supplier_name", "quoted_at", "unit_price")
+    )
+    for item_id, key, name, quoted_at, price in rows.iterator(chunk_size=2000):
+        history.setdefault((item_id, key), []).append((quoted_at, price))
+        names[item_id, key] = name
+
+    summaries = [
+        SupplierPriceSummary(item_id=item_id, supplier_key=key, supplier_name=names[item_id, key],
+                             **price_stats(prices))
+        for (item_id, key), prices in history.items()
+    ]
+    with transaction.atomic():
+        SupplierPriceSummary.objects.all().delete()
+        SupplierPriceSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
+
+
+# ----------------------------- LOOKUPS -----------------------------
+
+SUMMARY_FIELDS = (
+    "supplier_name", "latest_price", "median_price", "min_price", "quote_count", "last_quoted_at",
+)
+
+
+def item_prices(item_id):
+    """Price statistics of one item over all suppliers, plus each supplier's own, cheapest first."""
+    history = list(
+        SupplierPrice.objects.filter(item_id=item_id)
+        .order_by("quoted_at", "id")
+        .values_list("quoted_at", "unit_price")
+    )
+    suppliers = list(
+        SupplierPriceSummary.objects.filter(item_id=item_id)
+        .order_by("latest_price", "-last_quoted_at")
+        .values(*SUMMARY_FIELDS)
+    )
+    return {
+        "item_id": item_id,
+        **(price_stats(history) if history else {}),
+        "suppliers": suppliers,
+    }
+
+
+def supplier_prices(name):
+    """Price statistics of every item quoted by supplier ``name``."""
+    return list(
+        SupplierPriceSummary.objects.filter(supplier_key=supplier_key(name))
+        .order_by("item__name")
+        .values("item_id", *SUMMARY_FIELDS, item_name=F("item__name"))
+    )
+
+
+def suggest_suppliers(item_ids, limit=DEFAULT_SUGGESTIONS):
+    """Up to ``limit`` suppliers per item, cheapest latest quote first, from one query."""
+    suggestions = {item_id: [] for item_id in item_ids}
+    rows = (
+        SupplierPriceSummary.objects.filter(item_id__in=suggestions)
+        .order_by("item_id", "latest_price", "-last_quoted_at")
+        .values("item_id", *SUMMARY_FIELDS)
+    )
+    for row in rows:
+        suppliers = suggestions[row.pop("item_id")]
+        if len(suppliers) < limit:
+            suppliers.append(row)
+    return suggestions
@@ -1,6 +1,11 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from drf_writable_nested import WritableNestedModelSerializer
-from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier, PurchaseOrderTransition
+from .transitions import TransitionError, apply_transition
 from inventory.models import Item
 
 
@@ -71,7 +76,7 @@ class PurchaseOrderItemSerializer(WritableNestedModelSerializer):
 
     # Get the supplier approved by MD
     def get_approved_supplier(self, obj):
-        approved = obj.suppliers.filter(approved_by_md=True).first()
+        approved = obj.approved_supplier()
         if approved:
             return PurchaseOrderItemSupplierSerializer(
                 approved,
@@ -200,25 +205,65 @@ class PurchaseOrderSerializer(WritableNestedModelSerializer):
     # Check if all items have approved supplier
     def get_can_approve_order(self, obj):
         return all(
-            item.suppliers.filter(approved_by_md=True).exists()
+            item.approved_supplier() is not None
             for item in obj.items.all()
         )
 
     # Update purchase order: handle MD approval and payment
     def update(self, instance, validated_data):
-        approved_account = validated_data.get("approved_account", None)
-        amount_paid = validated_data.get("amount_paid", None)
+        user = self.context["request"].user
+        transitions = []
 
-        # If MD approves account and all suppliers are approved
-        if approved_account:
-            if not self.get_can_approve_order(instance):
-                raise serializers.ValidationError(
-                    "All items must have an approved supplier before approving order."
-                )
-            instance.approval_status = "approved"
+        # Entering an account or an amount moves the order on; once it has
+        # moved, later edits are plain field updates checked by the model
+        if validated_data.get("approved_account") and instance.approval_status != "approved":
+            transitions.append(("approve", {
+                "approved_account": validated_data.pop("approved_account"),
+            }))
 
-        # If payment is recorded, mark as paid
-        if amount_paid:
-            instance.payment_status = "paid"
+        if validated_data.get("amount_paid") and instance.payment_status != "paid":
+            transitions.append(("pay", {
+                "amount_paid": validated_data.pop("amount_paid"),
+                "payment_date": validated_data.pop("payment_date", None) or timezone.now().date(),
+            }))
+
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            try:
+                for name, values in transitions:
+                    apply_transition(instance.pk, name, user, **values)
+            except TransitionError as e:
+                raise serializers.ValidationError(str(e))
+
+        if transitions:
+            instance.refresh_from_db()
+        return instance
+
+
+# Payment details recorded by mark_paid
+class PaymentSerializer(serializers.Serializer):
+    amount_paid = serializers.DecimalField(max_digits=14, decimal_places=2, min_value=Decimal("0.01"))
+    payment_date = serializers.DateField(required=False, allow_null=True)
+
+
+# Audit entry for one approval, payment or delivery change
+class PurchaseOrderTransitionSerializer(serializers.ModelSerializer):
+    performed_by_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PurchaseOrderTransition
+        fields = [
+            "id",
+            "transition",
+            "field",
+            "from_state",
+            "to_state",
+            "details",
+            "performed_by",
+            "performed_by_name",
+            "performed_at",
+        ]
 
-        return super().update(instance, validated_data)
+    def get_performed_by_name(self, obj):
+        user = obj.performed_by
+        return f"{user.first_name} {user.last_name}".strip() or user.username if user else None
@@ -1,34 +1,37 @@
 # purchase_orders/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from notifications_app.models import Notification
-from .models import PurchaseOrder
+from .models import PurchaseOrder, PurchaseOrderItemSupplier
+from .pricing import record_quotes
 
 User = get_user_model()
 
-# Store previous delivery status
-_previous_delivery_status = {}
 
-@receiver(pre_save, sender=PurchaseOrder)
-def store_previous_delivery_status(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old = PurchaseOrder.objects.get(pk=instance.pk)
-            _previous_delivery_status[instance.pk] = old.delivery_status
-        except PurchaseOrder.DoesNotExist:
-            _previous_delivery_status[instance.pk] = None
+def notify_delivered(order_number, received=""):
+    message = f"Purchase Order {order_number} has been delivered to the store."
+    if received:
+        message += f" Added to stock: {received}."
+
+    recipients = User.objects.filter(role__in=["ManagingDirector", "StoreManager", "AccountsManager"])
+    Notification.objects.bulk_create([
+        Notification(user=user, message=message)
+        for user in recipients
+    ])
+
 
 @receiver(post_save, sender=PurchaseOrder)
 def purchase_order_delivery_notification(sender, instance, created, **kwargs):
     if not created:
-        prev_status = _previous_delivery_status.pop(instance.pk, None)
-
-        # Only notify when delivery_status changes to 'delivered'
-        if prev_status != "delivered" and instance.delivery_status == "delivered":
-            recipients = User.objects.filter(role__in=["ManagingDirector", "StoreManager", "AccountsManager"])
-            for user in recipients:
-                Notification.objects.create(
-                    user=user,
-                    message=f"Purchase Order {instance.order_number} has been delivered to the store."
-                )
+        # Only notify when delivery_status changes to 'delivered'; the
+        # mark_delivered transition bypasses save() and notifies itself
+        if instance.previous("delivery_status") != "delivered" and instance.delivery_status == "delivered":
+            notify_delivered(instance.order_number)
+
+
+@receiver(post_save, sender=PurchaseOrderItemSupplier)
+def supplier_quote_price_history(sender, instance, created, **kwargs):
+    # Approving a supplier leaves the quote as it was; only new prices are appended
+    if created or instance.has_changed("amount_per_unit") or instance.has_changed("supplier_name"):
+        record_quotes([instance])
@@ -1,3 +1,300 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from inventory.models import Item
+from users.models import CustomUser
+
+from . import pricing
+from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier, SupplierPrice, SupplierPriceSummary
+
+
+class PurchaseOrderApprovalQueryTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_order(self, lines):
+        order = PurchaseOrder.objects.create(order_type="reorder", accounts_with_money=["petty_cash"])
+        for _ in range(lines):
+            order_item = PurchaseOrderItem.objects.create(purchase_order=order, item=self.item, quantity=5)
+            PurchaseOrderItemSupplier.objects.create(order_item=order_item, supplier_name="A", amount_per_unit=10)
+            PurchaseOrderItemSupplier.objects.create(
+                order_item=order_item, supplier_name="B", amount_per_unit=12, approved_by_md=True
+            )
+        return order
+
+    def test_approval_status_query_count_does_not_grow_with_lines(self):
+        for lines in (2, 40):
+            order = self._create_order(lines)
+            # Order, its items with their stock items, and their suppliers
+            with self.assertNumQueries(3):
+                response = self.client.get(f"/api/purchase-orders/{order.pk}/approval_status/")
+
+            self.assertEqual(len(response.data["items_status"]), lines)
+            self.assertTrue(response.data["can_final_approve"])
+            self.assertEqual(response.data["items_status"][0]["approved_supplier"]["supplier_name"], "B")
+
+    def test_final_approve_query_count_does_not_grow_with_lines(self):
+        for lines in (2, 40):
+            order = self._create_order(lines)
+            # Savepoint, guarded update, history row, release
+            with self.assertNumQueries(4):
+                response = self.client.post(
+                    f"/api/purchase-orders/{order.pk}/final_approve_order/",
+                    {"approved_account": "petty_cash"},
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 200)
+
+        order.refresh_from_db()
+        self.assertEqual(order.approval_status, "approved")
+
+    def test_final_approve_refused_while_a_line_has_no_approved_supplier(self):
+        order = self._create_order(3)
+        PurchaseOrderItem.objects.create(purchase_order=order, item=self.item, quantity=1)
+
+        response = self.client.post(
+            f"/api/purchase-orders/{order.pk}/final_approve_order/",
+            {"approved_account": "petty_cash"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "All items must have approved suppliers.")
+        order.refresh_from_db()
+        self.assertEqual(order.approval_status, "pending")
+
+
+class PurchaseOrderTransitionTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.order = PurchaseOrder.objects.create(order_type="reorder", accounts_with_money=["petty_cash"])
+        line = PurchaseOrderItem.objects.create(purchase_order=self.order, item=self.item, quantity=5)
+        PurchaseOrderItemSupplier.objects.create(order_item=line, supplier_name="A", amount_per_unit=10, approved_by_md=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _post(self, action, data=None):
+        return self.client.post(f"/api/purchase-orders/{self.order.pk}/{action}/", data or {}, format="json")
+
+    def _approve(self, account="petty_cash"):
+        return self._post("final_approve_order", {"approved_account": account})
+
+    def _pay(self, amount="50"):
+        return self._post("mark_paid", {"amount_paid": amount})
+
+    def _transitions(self):
+        return list(self.order.transitions.order_by("id").values_list("transition", flat=True))
+
+    def test_guards_hold_the_order_back(self):
+        self.assertEqual(self._pay().data["error"], "Order cannot be paid before MD approval.")
+        self.assertEqual(self._post("mark_delivered").data["error"], "Order cannot be delivered before payment is done.")
+        self.assertEqual(
+            self._approve("afes").data["error"], "Approved account must be among accounts marked with money."
+        )
+        self.assertEqual(self._transitions(), [])
+
+        self.assertEqual(self._approve().status_code, 200)
+        self.assertEqual(self._post("mark_delivered").status_code, 400)
+        self.order.refresh_from_db()
+        self.assertEqual(
+            (self.order.approval_status, self.order.payment_status, self.order.delivery_status),
+            ("approved", "pending", "pending"),
+        )
+
+    def test_pay_and_deliver_apply_once(self):
+        self._approve()
+        self.assertEqual(self._pay("50").status_code, 200)
+
+        response = self._pay("70")
+        self.assertEqual((response.status_code, response.data["error"]), (400, "Order is already paid."))
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.amount_paid, 50)
+
+        self.assertEqual(self._post("mark_delivered").status_code, 200)
+        response = self._post("mark_delivered")
+        self.assertEqual((response.status_code, response.data["error"]), (400, "Order is already delivered."))
+        # The goods were received once
+        self.assertEqual(self.item.stock_ins.count(), 1)
+
+        self.assertEqual(self._transitions(), ["approve", "pay", "deliver"])
+        history = self.client.get(f"/api/purchase-orders/{self.order.pk}/history/").data
+        self.assertEqual(history[1]["details"], {"amount_paid": "50.00", "payment_date": str(self.order.payment_date)})
+
+    def test_reject_applies_once_and_only_while_pending(self):
+        self.assertEqual(self._post("reject_order").status_code, 200)
+
+        self.assertEqual(self._post("reject_order").data["error"], "Order is already rejected.")
+        self.assertEqual(self._approve().data["error"], "Order is already rejected.")
+        self.assertEqual(self._transitions(), ["reject"])
+
+    def test_approved_order_cannot_be_rejected(self):
+        self._approve()
+        self.assertEqual(self._post("reject_order").data["error"], "Order is already approved.")
+
+    def test_unknown_order(self):
+        response = self.client.post("/api/purchase-orders/999999/reject_order/", {}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+
+class SupplierPriceTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        self.sand = Item.objects.create(name="Sand", category="material", unit="tonnes")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _quote(self, item, supplier, price):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        line = PurchaseOrderItem.objects.create(purchase_order=order, item=item, quantity=1)
+        return PurchaseOrderItemSupplier.objects.create(order_item=line, supplier_name=supplier, amount_per_unit=price)
+
+    def _summaries(self):
+        return sorted(
+            SupplierPriceSummary.objects.values_list(
+                "item__name", "supplier_key", "latest_price", "median_price", "min_price", "quote_count"
+            )
+        )
+
+    def test_quotes_build_the_history_and_summary(self):
+        self._quote(self.cement, "Acme", 10)
+        quote = self._quote(self.cement, " ACME  ", 14)
+        self._quote(self.cement, "Bolt", 11)
+
+        quote.amount_per_unit = 12
+        quote.save()
+        # Approving changes neither price nor supplier, so nothing is appended
+        quote.approved_by_md = True
+        quote.save()
+
+        self.assertEqual(SupplierPrice.objects.count(), 4)
+        self.assertEqual(self._summaries(), [
+            ("cement", "acme", 12, 12, 10, 3),
+            ("cement", "bolt", 11, 11, 11, 1),
+        ])
+
+    def test_rebuild_recomputes_the_summaries(self):
+        self._quote(self.cement, "Acme", 10)
+        self._quote(self.cement, "Acme", 13)
+        self._quote(self.sand, "Acme", 7)
+        expected = self._summaries()
+
+        SupplierPriceSummary.objects.filter(item=self.sand).delete()
+        SupplierPriceSummary.objects.filter(item=self.cement).update(latest_price=99, quote_count=9)
+
+        self.assertEqual(pricing.rebuild_summaries(), 2)
+        self.assertEqual(self._summaries(), expected)
+        self.assertEqual(expected[0][3], Decimal("11.50"))
+
+    def test_price_endpoints(self):
+        self._quote(self.cement, "Acme", 10)
+        self._quote(self.cement, "Bolt", 8)
+        self._quote(self.cement, "Crane", 12)
+        self._quote(self.sand, "acme", 7)
+
+        prices = self.client.get(f"/api/purchase-orders/prices/items/{self.cement.pk}/").data
+        self.assertEqual((prices["latest_price"], prices["min_price"], prices["quote_count"]), (12, 8, 3))
+        self.assertEqual([row["supplier_name"] for row in prices["suppliers"]], ["Bolt", "Acme", "Crane"])
+
+        acme = self.client.get("/api/purchase-orders/prices/suppliers/", {"name": " Acme "}).data["items"]
+        self.assertEqual([row["item_name"] for row in acme], ["cement", "sand"])
+
+        response = self.client.get(
+            "/api/purchase-orders/suggested-suppliers/", {"items": f"{self.cement.pk},{self.sand.pk}", "limit": 2}
+        )
+        suggested = {row["item_id"]: [s["supplier_name"] for s in row["suppliers"]] for row in response.data}
+        self.assertEqual(suggested, {self.cement.pk: ["Bolt", "Acme"], self.sand.pk: ["acme"]})
+
+        self.assertEqual(self.client.get("/api/purchase-orders/prices/suppliers/").status_code, 400)
+        self.assertEqual(self.client.get("/api/purchase-orders/suggested-suppliers/", {"items": "x"}).status_code, 400)
+
+
+class InvoiceTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.media = media
+
+        self.user = CustomUser.objects.create(username="am", email="am@example.com", role="AccountsManager", password="x")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _quote(self, order, supplier):
+        line = PurchaseOrderItem.objects.create(purchase_order=order, item=self.cement, quantity=1)
+        return PurchaseOrderItemSupplier.objects.create(order_item=line, supplier_name=supplier, amount_per_unit=10)
+
+    def _upload(self, quote, content, name="invoice.PDF"):
+        response = self.client.patch(
+            f"/api/purchase-orders/{quote.order_item.purchase_order_id}/suppliers/{quote.pk}/upload-invoice/",
+            {"invoice": SimpleUploadedFile(name, content)}, format="multipart",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        quote.refresh_from_db()
+        return quote
+
+    def _stored_files(self):
+        return sorted(name for _, _, names in os.walk(self.media) for name in names)
+
+    def test_identical_uploads_share_one_file(self):
+        first, second = PurchaseOrder.objects.create(order_type="reorder"), PurchaseOrder.objects.create(order_type="reorder")
+        a = self._upload(self._quote(first, "Acme"), b"same invoice")
+        b = self._upload(self._quote(second, "Bolt"), b"same invoice", name="copy.pdf")
+        c = self._upload(self._quote(first, "Crane"), b"other invoice")
+
+        self.assertEqual(a.invoice.name, b.invoice.name)
+        self.assertTrue(a.invoice.name.startswith(f"invoices/sha256/{a.invoice_sha256[:2]}/"))
+        self.assertTrue(a.invoice.name.endswith(".pdf"))
+        self.assertNotEqual(a.invoice_sha256, c.invoice_sha256)
+        self.assertEqual(len(self._stored_files()), 2)
+
+    def test_zip_bundle_and_manifest(self):
+        first, second = PurchaseOrder.objects.create(order_type="reorder"), PurchaseOrder.objects.create(order_type="reorder")
+        self._upload(self._quote(first, "Acme"), b"shared")
+        self._upload(self._quote(first, "Bolt"), b"shared")
+        self._upload(self._quote(second, "Acme"), b"shared")
+        lost = self._upload(self._quote(second, "Crane"), b"lost")
+        os.remove(os.path.join(self.media, lost.invoice.name))
+
+        response = self.client.get("/api/purchase-orders/download_invoices_zip/", {"ids": f"{first.pk},{second.pk}"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="invoices.zip"')
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        # Shared content is archived once per order
+        files = [name for name in archive.namelist() if name != "manifest.csv"]
+        self.assertEqual(files, [f"{first.order_number}/cement-Acme.pdf", f"{second.order_number}/cement-Acme.pdf"])
+        self.assertEqual(archive.read(files[0]), b"shared")
+
+        manifest = list(csv.reader(io.StringIO(archive.read("manifest.csv").decode())))
+        self.assertEqual(manifest, [
+            ["order_number", "item", "supplier", "file"],
+            [first.order_number, "cement", "Acme", files[0]],
+            [first.order_number, "cement", "Bolt", files[0]],
+            [second.order_number, "cement", "Acme", files[1]],
+            [second.order_number, "cement", "Crane", "missing"],
+        ])
+
+    def test_zip_bundle_errors(self):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        self._quote(order, "Acme")
+        url = "/api/purchase-orders/download_invoices_zip/"
+        self.assertEqual(self.client.get(url, {"ids": "a,b"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"ids": order.pk}).status_code, 404)
@@ -0,0 +1,161 @@
+# purchase_order/transitions.py
+"""
+Purchase order state machine.
+
+Approval, payment and delivery each move through the states declared in
+``TRANSITIONS``. A transition is one conditional ``UPDATE`` that only matches
+while the order is still in the expected state and every guard holds, so the
+order is never read first and a repeated or concurrent request changes
+nothing instead of applying twice. Each applied transition is recorded in
+``PurchaseOrderTransition``.
+"""
+from django.db import connection, transaction
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.http import Http404
+from django.utils import timezone
+
+from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier, PurchaseOrderTransition
+
+
+class TransitionError(ValueError):
+    """Raised when a purchase order is not in a state that allows the transition."""
+
+
+# ----------------------------- GUARDS -----------------------------
+# Each guard builds a condition from the transition's values; the UPDATE
+# only matches when all of them hold.
+
+def _all_items_supplied(values):
+    unsupplied = PurchaseOrderItem.objects.filter(purchase_order=OuterRef("pk")).exclude(
+        Exists(PurchaseOrderItemSupplier.objects.filter(order_item=OuterRef("pk"), approved_by_md=True))
+    )
+    return ~Exists(unsupplied)
+
+
+def _accounts_marked(values):
+    return Q(accounts_with_money__isnull=False)
+
+
+def _account_has_money(values):
+    account = values["approved_account"]
+    if connection.features.supports_json_field_contains:
+        return Q(accounts_with_money__contains=[account])
+
+    # SQLite has no JSON containment lookup
+    column = f'"{PurchaseOrder._meta.db_table}"."accounts_with_money"'
+    return Q(RawSQL(
+        f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value = %s)",
+        [account],
+        output_field=BooleanField(),
+    ))
+
+
+def _field_is(field, value):
+    return lambda values: Q(**{field: value})
+
+
+def _today(values):
+    return timezone.now().date()
+
+
+# ----------------------------- TABLE -----------------------------
+# ``set`` lists the columns a transition writes besides its state field:
+# request values by name, or callables for derived ones.
+
+TRANSITIONS = {
+    "approve": {
+        "field": "approval_status",
+        "source": "pending",
+        "target": "approved",
+        "set": ("approved_account",),
+        "guards": (
+            (_all_items_supplied, "All items must have approved suppliers."),
+            (_accounts_marked, "Accounts Manager must first mark accounts with money."),
+            (_account_has_money, "Approved account must be among accounts marked with money."),
+        ),
+    },
+    "reject": {
+        "field": "approval_status",
+        "source": "pending",
+        "target": "rejected",
+        "set": (),
+        "guards": (),
+    },
+    "pay": {
+        "field": "payment_status",
+        "source": "pending",
+        "target": "paid",
+        "set": ("amount_paid", "payment_date"),
+        "guards": (
+            (_field_is("approval_status", "approved"), "Order cannot be paid before MD approval."),
+            (_field_is("approved_account__isnull", False), "Cannot record payment without approved account."),
+        ),
+    },
+    "deliver": {
+        "field": "delivery_status",
+        "source": "pending",
+        "target": "delivered",
+        "set": (),
+        "derived": {"delivery_date": _today},
+        "guards": (
+            (_field_is("payment_status", "paid"), "Order cannot be delivered before payment is done."),
+        ),
+    },
+}
+
+
+# ----------------------------- APPLY -----------------------------
+
+def apply_transition(order_id, name, user=None, **values):
+    """
+    Move purchase order ``order_id`` through transition ``name``.
+
+    ``values`` supplies the columns the transition writes (see ``set`` in
+    ``TRANSITIONS``). Raises ``Http404`` for an unknown order and
+    ``TransitionError`` naming the first unmet condition when the order is
+    not in the source state or a guard fails. Returns the history row.
+    """
+    spec = TRANSITIONS[name]
+    field, source, target = spec["field"], spec["source"], spec["target"]
+
+    changes = {key: values.get(key) for key in spec["set"]}
+    for key, derive in spec.get("derived", {}).items():
+        changes[key] = derive(values)
+    guards = [(build(values), message) for build, message in spec["guards"]]
+
+    condition = Q(pk=order_id, **{field: source})
+    for guard, _ in guards:
+        condition &= guard
+
+    with transaction.atomic():
+        updated = PurchaseOrder.objects.filter(condition).update(**{field: target}, **changes)
+        if not updated:
+            raise TransitionError(_failure(order_id, field, source, guards))
+
+        return PurchaseOrderTransition.objects.create(
+            purchase_order_id=order_id,
+            transition=name,
+            field=field,
+            from_state=source,
+            to_state=target,
+            performed_by=user if user is not None and user.is_authenticated else None,
+            details={key: str(value) for key, value in changes.items() if value is not None} or None,
+        )
+
+
+def _failure(order_id, field, source, guards):
+    """Why the conditional update matched nothing, worked out in one query."""
+    checks = {f"guard_{index}": ExpressionWrapper(guard, output_field=BooleanField())
+              for index, (guard, _) in enumerate(guards)}
+    row = PurchaseOrder.objects.filter(pk=order_id).values(field, **checks).first()
+    if row is None:
+        raise Http404("No PurchaseOrder matches the given query.")
+
+    if row[field] != source:
+        return f"Order is already {row[field]}."
+    for index, (_, message) in enumerate(guards):
+        if not row[f"guard_{index}"]:
+            return message
+    # The order moved on between the update and this check
+    return "Order was changed by another request. Please retry."
@@ -1,17 +1,30 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .models import PurchaseOrder, PurchaseOrderItemSupplier
-from .serializers import PurchaseOrderSerializer, PurchaseOrderItemSupplierSerializer
+from .models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from .serializers import (
+    PaymentSerializer,
+    PurchaseOrderItemSupplierSerializer,
+    PurchaseOrderSerializer,
+    PurchaseOrderTransitionSerializer,
+)
+from . import pricing
+from .invoices import store_invoice, zip_stream
+from .signals import notify_delivered
+from .transitions import TransitionError, apply_transition
 from inventory.models import Item
+from stockin.services import receipt_summary, receive_purchase_order
 
 
 class PurchaseOrderViewSet(viewsets.ModelViewSet):
     queryset = PurchaseOrder.objects.all().prefetch_related(
-        'items',
+        Prefetch('items', queryset=PurchaseOrderItem.objects.select_related('item')),
         'items__suppliers'
     )
     serializer_class = PurchaseOrderSerializer
@@ -29,6 +42,58 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
 
         return serializer
 
+    # ----------------------------- SUPPLIER PRICES -----------------------------
+
+    # Latest, median and lowest price of an item, overall and per supplier
+    @action(detail=False, methods=['get'], url_path=r'prices/items/(?P<item_id>\d+)')
+    def item_prices(self, request, item_id=None):
+        item = get_object_or_404(Item.objects.only("id", "name", "unit"), pk=item_id)
+        return Response({
+            **pricing.item_prices(item.pk),
+            "item_name": item.name,
+            "unit": item.unit,
+        })
+
+    # Price statistics of every item a supplier has quoted
+    @action(detail=False, methods=['get'], url_path='prices/suppliers')
+    def supplier_prices(self, request):
+        name = request.query_params.get("name", "").strip()
+        if not name:
+            return Response(
+                {"error": "name is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "supplier_name": name,
+            "items": pricing.supplier_prices(name),
+        })
+
+    # Suggested suppliers for the items on a new order (?items=1,2,3&limit=3)
+    @action(detail=False, methods=['get'], url_path='suggested-suppliers')
+    def suggested_suppliers(self, request):
+        try:
+            item_ids = [int(i) for i in request.query_params.get("items", "").split(",") if i.strip()]
+            limit = int(request.query_params.get("limit", pricing.DEFAULT_SUGGESTIONS))
+        except ValueError:
+            return Response(
+                {"error": "items must be a comma-separated list of ids and limit a number"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not item_ids:
+            return Response(
+                {"error": "items is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        limit = min(max(limit, 1), pricing.MAX_SUGGESTIONS)
+        suggestions = pricing.suggest_suppliers(item_ids, limit)
+        return Response([
+            {"item_id": item_id, "suppliers": suppliers}
+            for item_id, suppliers in suggestions.items()
+        ])
+
     # Approve a supplier for a purchase order item (MD)
     @action(detail=True, methods=['post'])
     def approve_supplier(self, request, pk=None):
@@ -63,30 +128,24 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
             ).data
         })
 
+    def _transition(self, request, name, **values):
+        """Apply transition ``name`` to this order; returns an error response, or None."""
+        try:
+            order_id = int(self.kwargs["pk"])
+        except ValueError:
+            raise Http404
+
+        try:
+            apply_transition(order_id, name, request.user, **values)
+        except TransitionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
     # Final approval of purchase order by MD
     @action(detail=True, methods=['post'])
     def final_approve_order(self, request, pk=None):
-        purchase_order = self.get_object()
         approved_account = request.data.get("approved_account")
 
-        # All items must have approved suppliers
-        all_items_approved = all(
-            item.suppliers.filter(approved_by_md=True).exists()
-            for item in purchase_order.items.all()
-        )
-        if not all_items_approved:
-            return Response(
-                {"error": "All items must have approved suppliers."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Accounts Manager must mark accounts with money
-        if not purchase_order.accounts_with_money:
-            return Response(
-                {"error": "Accounts Manager must first mark accounts with money."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         # MD must select approved account
         if not approved_account:
             return Response(
@@ -94,16 +153,10 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if approved_account not in purchase_order.accounts_with_money:
-            return Response(
-                {"error": "Approved account must be among accounts marked with money."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Approve the order
-        purchase_order.approved_account = approved_account
-        purchase_order.approval_status = 'approved'
-        purchase_order.save()
+        # Suppliers and accounts are checked by the transition itself
+        error = self._transition(request, "approve", approved_account=approved_account)
+        if error:
+            return error
 
         return Response({
             "message": "Purchase order approved successfully.",
@@ -113,50 +166,42 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
     # Record payment for the purchase order (Accountant)
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
-        purchase_order = self.get_object()
-
-        if purchase_order.approval_status != 'approved':
-            return Response(
-                {"error": "Order cannot be paid before MD approval."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Get amount and optional payment date
-        amount_paid = request.data.get("amount_paid")
-        payment_date = request.data.get("payment_date")
-
-        if not amount_paid:
+        if not request.data.get("amount_paid"):
             return Response(
                 {"error": "amount_paid is required to record payment."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Save payment details
-        purchase_order.payment_status = 'paid'
-        purchase_order.amount_paid = amount_paid
-        purchase_order.payment_date = payment_date or timezone.now().date()
-        purchase_order.save()
+        payment = PaymentSerializer(data=request.data)
+        payment.is_valid(raise_exception=True)
+        amount_paid = payment.validated_data["amount_paid"]
+        payment_date = payment.validated_data.get("payment_date") or timezone.now().date()
+
+        error = self._transition(request, "pay", amount_paid=amount_paid, payment_date=payment_date)
+        if error:
+            return error
 
         return Response({
             "message": "Order marked as paid.",
-            "amount_paid": purchase_order.amount_paid,
-            "payment_date": purchase_order.payment_date,
-            "approved_account": purchase_order.approved_account
+            "amount_paid": amount_paid,
+            "payment_date": payment_date,
+            "approved_account": PurchaseOrder.objects.values_list(
+                "approved_account", flat=True
+            ).get(pk=pk)
         }, status=status.HTTP_200_OK)
 
     # Mark purchase order as delivered
     @action(detail=True, methods=['post'])
     def mark_delivered(self, request, pk=None):
-        purchase_order = self.get_object()
-
-        if purchase_order.payment_status != 'paid':
-            return Response(
-                {"error": "Order cannot be delivered before payment is done."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # Delivery and its goods receipt stand or fall together
+        with transaction.atomic():
+            error = self._transition(request, "deliver")
+            if error:
+                return error
 
-        purchase_order.delivery_status = 'delivered'
-        purchase_order.save()
+            purchase_order = self.get_object()
+            receipts = receive_purchase_order(purchase_order, request.user)
+            notify_delivered(purchase_order.order_number, receipt_summary(receipts))
 
         serializer = self.get_serializer(purchase_order)
         return Response(serializer.data)
@@ -164,25 +209,31 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
     # Reject the purchase order (MD)
     @action(detail=True, methods=['post'])
     def reject_order(self, request, pk=None):
-        purchase_order = self.get_object()
-        purchase_order.approval_status = 'rejected'
-        purchase_order.save()
+        error = self._transition(request, "reject")
+        if error:
+            return error
 
         return Response(
             {"message": "Order rejected by MD."},
             status=status.HTTP_200_OK
         )
 
+    # Approval, payment and delivery history
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        purchase_order = get_object_or_404(PurchaseOrder.objects.only("id"), pk=pk)
+        transitions = purchase_order.transitions.select_related("performed_by")
+        return Response(PurchaseOrderTransitionSerializer(transitions, many=True).data)
+
     # Get current approval and supplier status
     @action(detail=True, methods=['get'])
     def approval_status(self, request, pk=None):
         purchase_order = self.get_object()
         items_status = []
 
+        # Items, their stock items and suppliers all come from the prefetch
         for item in purchase_order.items.all():
-            approved_supplier = item.suppliers.filter(
-                approved_by_md=True
-            ).first()
+            approved_supplier = item.approved_supplier()
 
             items_status.append({
                 "item_id": item.id,
@@ -227,6 +278,46 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
 
         return Response({"invoices": invoices})
 
+    # Download the invoices of one or many orders as a single ZIP (?ids=1,2,3)
+    @action(detail=False, methods=['get'])
+    def download_invoices_zip(self, request):
+        try:
+            order_ids = [int(i) for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        except ValueError:
+            return Response(
+                {"error": "ids must be a comma-separated list of purchase order ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not order_ids:
+            return Response(
+                {"error": "ids is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = list(
+            PurchaseOrderItemSupplier.objects.filter(order_item__purchase_order_id__in=order_ids)
+            .exclude(invoice__isnull=True).exclude(invoice="")
+            .order_by("order_item__purchase_order_id", "order_item_id", "id")
+            .values(
+                "supplier_name", "invoice", "invoice_sha256",
+                order_number=F("order_item__purchase_order__order_number"),
+                item_name=F("order_item__item__name"),
+            )
+        )
+        if not entries:
+            return Response(
+                {"error": "No invoices found for the selected orders."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        order_numbers = sorted({entry["order_number"] for entry in entries})
+        filename = f"invoices-{order_numbers[0]}.zip" if len(order_numbers) == 1 else "invoices.zip"
+
+        response = StreamingHttpResponse(zip_stream(entries), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     # Upload invoice file for a specific supplier
     @action(
         detail=True,
@@ -250,8 +341,9 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        supplier.invoice = file
-        supplier.save()
+        # Identical files share one stored copy
+        supplier.invoice.name, supplier.invoice_sha256 = store_invoice(file)
+        supplier.save(update_fields=["invoice", "invoice_sha256"])
 
         return Response({
             "message": f"Invoice uploaded for {supplier.supplier_name}",
@@ -1,3 +1,6 @@
 from django.contrib import admin
+from .models import DailyRollup, DailyRollupDirtyDay, DailyRollupState
 
-# Register your models here.
+admin.site.register(DailyRollup)
+admin.site.register(DailyRollupState)
+admin.site.register(DailyRollupDirtyDay)
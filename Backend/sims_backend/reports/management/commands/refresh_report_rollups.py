@@ -0,0 +1,15 @@
+# reports/management/commands/refresh_report_rollups.py
+from django.core.management.base import BaseCommand
+
+from reports.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Roll up report totals through yesterday and recompute changed days. Run daily from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recompute every day from scratch.")
+
+    def handle(self, *args, **options):
+        days = refresh_rollups(rebuild=options["rebuild"])
+        self.stdout.write(self.style.SUCCESS(f"{days} day{'s' if days != 1 else ''} of report rollups written."))
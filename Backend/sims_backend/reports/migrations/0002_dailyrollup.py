@@ -0,0 +1,49 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0010_remove_employee_approval_status_and_more'),
+        ('inventory', '0012_lowstockitem'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('marked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('complete_through', models.DateField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('source', models.CharField(choices=[('purchase_order', 'Purchase Order'), ('issue_out', 'Issue Out'), ('stock_in', 'Stock In'), ('return_tool', 'Return Tool')], max_length=20)),
+                ('category', models.CharField(max_length=20)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.employee')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source', 'day'], name='reports_dai_source_0b7f7a_idx'), models.Index(fields=['day'], name='reports_dai_day_c66f8d_idx')],
+            },
+        ),
+    ]
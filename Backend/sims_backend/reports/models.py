@@ -50,3 +50,61 @@ class Report(models.Model):
         if self.report_type == "user_written":
             return f"[User Report] {self.title}"
         return f"[{self.get_report_type_display()}] {self.created_at.strftime('%Y-%m-%d')}"
+
+
+# ==============================
+# Daily rollups (see rollups.py)
+# ==============================
+class DailyRollup(models.Model):
+    """Totals of one report source for one day, item and employee."""
+
+    SOURCES = [
+        ("purchase_order", "Purchase Order"),
+        ("issue_out", "Issue Out"),
+        ("stock_in", "Stock In"),
+        ("return_tool", "Return Tool"),
+    ]
+
+    day = models.DateField()
+    source = models.CharField(max_length=20, choices=SOURCES)
+    item = models.ForeignKey("inventory.Item", on_delete=models.CASCADE, related_name="+")
+    category = models.CharField(max_length=20)
+    employee = models.ForeignKey(
+        "employees.Employee",
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name="+"
+    )
+
+    line_count = models.PositiveIntegerField(default=0)
+    quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["source", "day"]),
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.source} item {self.item_id}: {self.quantity}"
+
+
+class DailyRollupState(models.Model):
+    """Single row recording the last day the rollups are complete for."""
+
+    complete_through = models.DateField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Rollups complete through {self.complete_through}"
+
+
+class DailyRollupDirtyDay(models.Model):
+    """A rolled-up day whose source rows changed since; recomputed by the next refresh."""
+
+    day = models.DateField(unique=True)
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.day)
@@ -0,0 +1,183 @@
+# reports/queries.py
+"""
+Row listings behind the report endpoints.
+
+Each report is built from a fixed number of queries whatever the size of the
+range: related names and the figures of an order's approved quote or a
+record's first line are joined or annotated in, never looked up per row.
+Rows are plain dicts with dates already formatted in local time, ready for
+``Response``.
+"""
+from django.db.models import Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from item_issuance.models import IssueItem, IssueRecord
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from stockin.models import StockIn
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+CHUNK_SIZE = 2000
+
+
+def _local(moment):
+    return timezone.localtime(moment).strftime(DATE_FORMAT) if moment else None
+
+
+def _employee_name(prefix):
+    return Concat(
+        F(f"{prefix}__first_name"), Value(" "), F(f"{prefix}__last_name"),
+        Value(" ("), F(f"{prefix}__job_number"), Value(")"),
+    )
+
+
+def _first_line(lines, field):
+    """The record's first line as ``IssueRecord.items.first()`` sees it: the newest."""
+    return Subquery(lines.filter(issue_record=OuterRef("pk")).order_by("-id").values(field)[:1])
+
+
+# ----------------------------- PURCHASE ORDERS -----------------------------
+
+def purchase_order_rows(start, end):
+    """Orders created in [start, end], each with its lines that have an MD-approved quote."""
+    orders = list(
+        PurchaseOrder.objects.filter(created_at__gte=start, created_at__lte=end)
+        .order_by("-created_at", "-id")
+        .values("id", "order_number", "order_type", "created_at", "payment_status", "delivery_status", "delivery_date")
+    )
+
+    approved = PurchaseOrderItemSupplier.objects.filter(order_item=OuterRef("pk"), approved_by_md=True)
+    lines = (
+        PurchaseOrderItem.objects.filter(purchase_order__created_at__gte=start, purchase_order__created_at__lte=end)
+        .filter(Exists(approved))
+        .annotate(
+            approved_supplier=Subquery(approved.values("supplier_name")[:1]),
+            unit_price=Subquery(approved.values("amount_per_unit")[:1]),
+        )
+        .order_by("pk")
+        .values_list("purchase_order_id", "id", "item__name", "item__unit", "quantity", "approved_supplier", "unit_price")
+    )
+    lines_of = {}
+    for order_id, pk, item_name, item_unit, quantity, supplier, unit_price in lines.iterator(chunk_size=CHUNK_SIZE):
+        lines_of.setdefault(order_id, []).append({
+            "id": pk,
+            "item_name": item_name,
+            "item_unit": item_unit,
+            "quantity": quantity,
+            "approved_supplier": supplier,
+            "amount": quantity * unit_price if unit_price else 0,
+        })
+
+    rows = []
+    for order in orders:
+        items = lines_of.get(order["id"], [])
+        delivered = order["delivery_status"].lower() == "delivered" and order["delivery_date"]
+        rows.append({
+            "report_type": "purchase_order",
+            "id": order["id"],
+            "po_number": order["order_number"],
+            "order_type": order["order_type"],
+            "created_at_formatted": _local(order["created_at"]),
+            "payment_status": order["payment_status"],
+            "delivery_status": order["delivery_status"],
+            "delivery_date": order["delivery_date"].strftime("%Y-%m-%d") if delivered else order["delivery_status"],
+            "items": items,
+            "total_order_amount": sum((line["amount"] for line in items), 0),
+        })
+    return rows
+
+
+# ----------------------------- ISSUE OUT -----------------------------
+
+def issue_out_rows(start, end):
+    """Issue records dated in [start, end] with the figures of their first line."""
+    lines = IssueItem.objects.all()
+    records = (
+        IssueRecord.objects.filter(issue_date__gte=start, issue_date__lte=end)
+        .annotate(
+            issued_to_name=_employee_name("issued_to"),
+            item_name=_first_line(lines, "item__name"),
+            first_quantity=_first_line(lines, "quantity_issued"),
+            quantity_in_stock=_first_line(lines, "item__quantity_in_stock"),
+        )
+        .order_by("-issue_date", "-id")
+        .values_list(
+            "issue_date", "item_name", "first_quantity", "quantity_in_stock", "status", "reason", "issued_to_name"
+        )
+    )
+    return [
+        {
+            "report_type": "issue_out",
+            "issue_date": _local(issue_date),
+            "item_name": item_name,
+            "quantity_issued": quantity if quantity is not None else 0,
+            "quantity_remaining": in_stock if in_stock is not None else 0,
+            "status": status,
+            "reason": reason,
+            "issued_to_name": issued_to_name,
+        }
+        for issue_date, item_name, quantity, in_stock, status, reason, issued_to_name
+        in records.iterator(chunk_size=CHUNK_SIZE)
+    ]
+
+
+# ----------------------------- STOCK IN -----------------------------
+
+def stock_in_rows(start, end):
+    """Stock-ins dated in [start, end]."""
+    receipts = (
+        StockIn.objects.filter(date_added__gte=start, date_added__lte=end)
+        .order_by("-date_added", "-id")
+        .values_list("id", "stock_in_no", "item__name", "quantity", "remarks", "date_added")
+    )
+    return [
+        {
+            "report_type": "stock_in",
+            "id": pk,
+            "stock_in_no": stock_in_no,
+            "item_name": item_name,
+            "quantity": quantity,
+            "remarks": remarks,
+            "date_added": _local(date_added),
+        }
+        for pk, stock_in_no, item_name, quantity, remarks, date_added in receipts.iterator(chunk_size=CHUNK_SIZE)
+    ]
+
+
+# ----------------------------- RETURN TOOLS -----------------------------
+
+def return_tool_rows(start, end):
+    """Issue records dated in [start, end] that include tools, with their first tool line."""
+    tools = IssueItem.objects.filter(item__category="tool")
+    records = (
+        IssueRecord.objects.filter(issue_date__gte=start, issue_date__lte=end)
+        .filter(Exists(tools.filter(issue_record=OuterRef("pk"))))
+        .annotate(
+            issued_to_name=_employee_name("issued_to"),
+            tool=_first_line(tools, "item__name"),
+            tool_issued=_first_line(tools, "quantity_issued"),
+            tool_returned=_first_line(tools, "returned_quantity"),
+        )
+        .order_by("-issue_date", "-id")
+        .values_list("issue_date", "tool", "tool_issued", "tool_returned", "issued_to_name")
+    )
+    return [
+        {
+            "report_type": "return_tool",
+            "date": _local(issue_date),
+            "tool": tool,
+            "quantity_issued": issued,
+            "quantity_returned": returned,
+            "outstanding_quantity": issued - returned,
+            "issued_to": issued_to_name,
+        }
+        for issue_date, tool, issued, returned, issued_to_name in records.iterator(chunk_size=CHUNK_SIZE)
+    ]
+
+
+REPORTS = {
+    "purchase_order": purchase_order_rows,
+    "issue_out": issue_out_rows,
+    "stock_in": stock_in_rows,
+    "return_tool": return_tool_rows,
+}
@@ -0,0 +1,271 @@
+# reports/rollups.py
+"""
+Daily rollups of the report sources.
+
+``DailyRollup`` holds the line count, quantity and amount of each source per
+day, item and employee. ``refresh_rollups`` (the ``refresh_report_rollups``
+command, run from cron) adds the days completed since its last run and
+recomputes the days the hooks in ``signals.py`` marked dirty.
+
+``summarize`` reads rollups for whole days that are complete and clean, and
+aggregates raw rows only for the rest of the range, normally just today.
+Rows are bucketed into local days in Python, so the database needs no time
+zone support.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from employees.models import Employee
+from inventory.models import Item
+from item_issuance.models import IssueItem
+from purchase_order.models import PurchaseOrderItem, PurchaseOrderItemSupplier
+from returns.models import ReturnedItem
+from stockin.models import StockIn
+from .models import DailyRollup, DailyRollupDirtyDay, DailyRollupState
+
+SOURCES = tuple(source for source, _ in DailyRollup.SOURCES)
+GROUPS = {
+    "day": "day",
+    "item": "item_id",
+    "category": "category",
+    "employee": "employee_id",
+}
+ZERO = Decimal("0")
+CHUNK_SIZE = 2000
+
+
+# ----------------------------- SOURCE ROWS -----------------------------
+# Each yields (moment, item_id, category, employee_id, quantity, amount)
+# for the source rows dated in [start, end).
+
+def _issue_out(start, end):
+    rows = IssueItem.objects.filter(
+        issue_record__issue_date__gte=start, issue_record__issue_date__lt=end
+    ).values_list(
+        "issue_record__issue_date", "item_id", "item__category", "issue_record__issued_to_id", "quantity_issued"
+    )
+    for moment, item_id, category, employee_id, quantity in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield moment, item_id, category, employee_id, quantity, ZERO
+
+
+def _purchase_order(start, end):
+    approved_price = PurchaseOrderItemSupplier.objects.filter(
+        order_item=OuterRef("pk"), approved_by_md=True
+    ).values("amount_per_unit")[:1]
+    rows = PurchaseOrderItem.objects.filter(
+        purchase_order__created_at__gte=start, purchase_order__created_at__lt=end
+    ).annotate(unit_price=Subquery(approved_price)).values_list(
+        "purchase_order__created_at", "item_id", "item__category", "quantity", "unit_price"
+    )
+    for moment, item_id, category, quantity, unit_price in rows.iterator(chunk_size=CHUNK_SIZE):
+        # Priced at the approved supplier, as on the purchase order report
+        yield moment, item_id, category, None, quantity, quantity * unit_price if unit_price else ZERO
+
+
+def _stock_in(start, end):
+    rows = StockIn.objects.filter(date_added__gte=start, date_added__lt=end).values_list(
+        "date_added", "item_id", "item__category", "quantity"
+    )
+    for moment, item_id, category, quantity in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield moment, item_id, category, None, quantity, ZERO
+
+
+def _return_tool(start, end):
+    rows = ReturnedItem.objects.filter(return_date__gte=start, return_date__lt=end).values_list(
+        "return_date", "issue_item__item_id", "issue_item__item__category", "employee_id", "returned_quantity"
+    )
+    for moment, item_id, category, employee_id, quantity in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield moment, item_id, category, employee_id, quantity, ZERO
+
+
+SOURCE_ROWS = {
+    "purchase_order": _purchase_order,
+    "issue_out": _issue_out,
+    "stock_in": _stock_in,
+    "return_tool": _return_tool,
+}
+
+SOURCE_DATES = {
+    "purchase_order": (PurchaseOrderItem, "purchase_order__created_at"),
+    "issue_out": (IssueItem, "issue_record__issue_date"),
+    "stock_in": (StockIn, "date_added"),
+    "return_tool": (ReturnedItem, "return_date"),
+}
+
+
+def _day_bounds(first, last):
+    """Aware datetimes covering local days ``first`` to ``last`` inclusive, end exclusive."""
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    return start, end
+
+
+def bucket(source, first, last):
+    """Totals of ``source`` rows on days ``first`` to ``last``, keyed by (day, item, category, employee)."""
+    totals = defaultdict(lambda: [0, ZERO, ZERO])
+    for moment, item_id, category, employee_id, quantity, amount in SOURCE_ROWS[source](*_day_bounds(first, last)):
+        total = totals[timezone.localdate(moment), item_id, category or "", employee_id]
+        total[0] += 1
+        total[1] += quantity or ZERO
+        total[2] += amount
+    return totals
+
+
+def _ranges(days):
+    """Collapse a set of days into sorted (first, last) runs of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(run) for run in ranges]
+
+
+# ----------------------------- REFRESH -----------------------------
+
+def mark_dirty(moment):
+    """Flag the day of ``moment`` for recomputation when it may already be rolled up."""
+    if moment is None:
+        return
+    day = timezone.localdate(moment) if isinstance(moment, datetime) else moment
+    # Today is never rolled up; its changes are read raw until the next refresh
+    if day < timezone.localdate():
+        DailyRollupDirtyDay.objects.get_or_create(day=day)
+
+
+def _earliest_day():
+    moments = [
+        model.objects.aggregate(first=Min(field))["first"]
+        for model, field in SOURCE_DATES.values()
+    ]
+    moments = [moment for moment in moments if moment is not None]
+    return timezone.localdate(min(moments)) if moments else None
+
+
+def _rebuild_days(first, last):
+    DailyRollup.objects.filter(day__range=(first, last)).delete()
+    DailyRollup.objects.bulk_create([
+        DailyRollup(
+            day=day, source=source, item_id=item_id, category=category, employee_id=employee_id,
+            line_count=count, quantity=quantity, amount=amount,
+        )
+        for source in SOURCES
+        for (day, item_id, category, employee_id), (count, quantity, amount) in bucket(source, first, last).items()
+    ], batch_size=1000)
+
+
+def refresh_rollups(rebuild=False):
+    """
+    Bring the rollups up to yesterday: add the days since the last refresh and
+    recompute dirty days. ``rebuild`` recomputes everything. Returns the
+    number of days written.
+    """
+    through = timezone.localdate() - timedelta(days=1)
+
+    with transaction.atomic():
+        state, _ = DailyRollupState.objects.select_for_update().get_or_create(pk=1)
+
+        if rebuild or state.complete_through is None:
+            DailyRollup.objects.all().delete()
+            start = _earliest_day()
+        else:
+            start = state.complete_through + timedelta(days=1)
+
+        # Cleared first, so changes made while this runs mark their day again
+        dirty = set(DailyRollupDirtyDay.objects.values_list("day", flat=True))
+        DailyRollupDirtyDay.objects.filter(day__in=dirty).delete()
+
+        days = {day for day in dirty if day <= through and (start is None or day < start)}
+        ranges = _ranges(days)
+        if start is not None and start <= through:
+            ranges.append((start, through))
+
+        for first, last in ranges:
+            _rebuild_days(first, last)
+
+        state.complete_through = through
+        state.refreshed_at = timezone.now()
+        state.save()
+
+    return sum((last - first).days + 1 for first, last in ranges)
+
+
+# ----------------------------- SUMMARIES -----------------------------
+
+def summarize(sources, first, last, group_by):
+    """
+    Line count, quantity and amount per source and ``group_by`` (a key of
+    ``GROUPS``) over days ``first`` to ``last`` inclusive.
+    """
+    field = GROUPS[group_by]
+    key_index = {"day": 0, "item_id": 1, "category": 2, "employee_id": 3}[field]
+    totals = defaultdict(lambda: [0, ZERO, ZERO])
+
+    through = DailyRollupState.objects.values_list("complete_through", flat=True).first()
+    rolled_last = min(last, through) if through else None
+    dirty = set(
+        DailyRollupDirtyDay.objects.filter(day__range=(first, last)).values_list("day", flat=True)
+    )
+
+    # Whole days already rolled up
+    if rolled_last and first <= rolled_last:
+        rows = (
+            DailyRollup.objects.filter(source__in=sources, day__range=(first, rolled_last))
+            .exclude(day__in=dirty)
+            .values("source", field)
+            .annotate(lines=Sum("line_count"), total_quantity=Sum("quantity"), total_amount=Sum("amount"))
+        )
+        for row in rows:
+            total = totals[row["source"], row[field]]
+            total[0] += row["lines"]
+            total[1] += row["total_quantity"]
+            total[2] += row["total_amount"]
+
+    # Edges: days not rolled up yet, or changed since
+    raw_days = {day for day in dirty if rolled_last and day <= rolled_last}
+    raw_start = rolled_last + timedelta(days=1) if rolled_last and rolled_last >= first else first
+    raw_ranges = _ranges(raw_days)
+    if raw_start <= last:
+        raw_ranges.append((raw_start, last))
+
+    for range_first, range_last in raw_ranges:
+        for source in sources:
+            for key, (count, quantity, amount) in bucket(source, range_first, range_last).items():
+                total = totals[source, key[key_index]]
+                total[0] += count
+                total[1] += quantity
+                total[2] += amount
+
+    return _labelled(totals, group_by)
+
+
+def _labelled(totals, group_by):
+    names = {}
+    if group_by == "item":
+        names = {
+            pk: {"item_name": name, "unit": unit}
+            for pk, name, unit in Item.objects.filter(pk__in={key for _, key in totals}).values_list("id", "name", "unit")
+        }
+    elif group_by == "employee":
+        names = {
+            pk: {"employee_name": f"{first} {last} ({job})"}
+            for pk, first, last, job in Employee.objects.filter(
+                pk__in={key for _, key in totals if key is not None}
+            ).values_list("id", "first_name", "last_name", "job_number")
+        }
+
+    rows = []
+    for (source, key), (count, quantity, amount) in totals.items():
+        row = {"source": source, group_by: key.isoformat() if group_by == "day" else key}
+        if group_by in ("item", "employee"):
+            row.update(names.get(key, {f"{group_by}_name": None}))
+        row.update({"line_count": count, "quantity": quantity, "amount": amount})
+        rows.append(row)
+    rows.sort(key=lambda row: (row["source"], str(row[group_by])))
+    return rows
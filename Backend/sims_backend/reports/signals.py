@@ -1,9 +1,11 @@
 # reports/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Report
-from purchase_order.models import PurchaseOrder
-from item_issuance.models import IssueRecord
+from .rollups import mark_dirty
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from item_issuance.models import IssueRecord, IssueItem
+from returns.models import ReturnedItem
 from stockin.models import StockIn
 
 
@@ -35,3 +37,67 @@ def log_stock_in(sender, instance, created, **kwargs):
             stock_in=instance,
             created_by=getattr(instance, "created_by", None)
         )
+
+
+# -------------------------------
+# Daily rollups: changes to past days are recomputed by the next refresh
+# -------------------------------
+def _mark_parent_day(instance, relation, queryset, field):
+    """Mark the day of the row ``instance`` belongs to, read from the cached relation when loaded."""
+    if relation in instance._state.fields_cache:
+        parent = getattr(instance, relation)
+        mark_dirty(getattr(parent, field) if parent else None)
+    else:
+        mark_dirty(queryset.values_list(field, flat=True).first())
+
+
+@receiver(post_save, sender=IssueRecord)
+def issue_record_rollup(sender, instance, created, **kwargs):
+    if not created and (instance.has_changed("issue_date") or instance.has_changed("issued_to")):
+        mark_dirty(instance.issue_date)
+        mark_dirty(instance.previous("issue_date"))
+
+
+@receiver(post_delete, sender=IssueRecord)
+@receiver(post_delete, sender=PurchaseOrder)
+def rolled_up_parent_deleted(sender, instance, **kwargs):
+    mark_dirty(instance.issue_date if sender is IssueRecord else instance.created_at)
+
+
+@receiver(post_save, sender=IssueItem)
+@receiver(post_delete, sender=IssueItem)
+def issue_item_rollup(sender, instance, **kwargs):
+    _mark_parent_day(
+        instance, "issue_record", IssueRecord.objects.filter(pk=instance.issue_record_id), "issue_date"
+    )
+
+
+@receiver(post_save, sender=PurchaseOrderItem)
+@receiver(post_delete, sender=PurchaseOrderItem)
+def purchase_order_item_rollup(sender, instance, **kwargs):
+    _mark_parent_day(
+        instance, "purchase_order", PurchaseOrder.objects.filter(pk=instance.purchase_order_id), "created_at"
+    )
+
+
+@receiver(post_save, sender=PurchaseOrderItemSupplier)
+@receiver(post_delete, sender=PurchaseOrderItemSupplier)
+def supplier_quote_rollup(sender, instance, **kwargs):
+    # The approved quote prices the order's amount
+    mark_dirty(
+        PurchaseOrder.objects.filter(items=instance.order_item_id).values_list("created_at", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=StockIn)
+@receiver(post_delete, sender=StockIn)
+def stock_in_rollup(sender, instance, **kwargs):
+    mark_dirty(instance.date_added)
+    if instance.has_changed("date_added"):
+        mark_dirty(instance.previous("date_added"))
+
+
+@receiver(post_save, sender=ReturnedItem)
+@receiver(post_delete, sender=ReturnedItem)
+def returned_item_rollup(sender, instance, **kwargs):
+    mark_dirty(instance.return_date)
@@ -1,3 +1,203 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from inventory.models import Item
+from item_issuance.models import IssueItem, IssueRecord
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from stockin.models import StockIn
+from users.models import CustomUser
+
+from .models import DailyRollup, DailyRollupDirtyDay
+from .rollups import refresh_rollups, summarize
+
+ROWS = 10_000
+
+
+class ReportQueryCountTests(TestCase):
+    """Each report runs a fixed number of queries for a 10k-row range."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        hammer = Item.objects.create(name="Hammer", category="tool", unit="pcs", quantity_to_add=10)
+        now = timezone.now()
+
+        # Bulk inserts skip the save hooks; the reports only read these rows
+        IssueRecord.objects.bulk_create([
+            IssueRecord(
+                issue_id=f"ISSUE-T{i}", issued_to=employee, issued_by=cls.user, issue_type="material",
+                issue_date=now - timedelta(minutes=i),
+            )
+            for i in range(ROWS)
+        ], batch_size=1000)
+        IssueItem.objects.bulk_create([
+            IssueItem(issue_record=record, item=hammer if record.pk % 2 else cement, quantity_issued=2)
+            for record in IssueRecord.objects.all()
+        ], batch_size=1000)
+
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(order_number=f"PO-T{i}", order_type="reorder") for i in range(ROWS)
+        ], batch_size=1000)
+        PurchaseOrderItem.objects.bulk_create([
+            PurchaseOrderItem(purchase_order=order, item=cement, quantity=3) for order in PurchaseOrder.objects.all()
+        ], batch_size=1000)
+        PurchaseOrderItemSupplier.objects.bulk_create([
+            PurchaseOrderItemSupplier(order_item=line, supplier_name="Acme", amount_per_unit=Decimal("10.50"), approved_by_md=True)
+            for line in PurchaseOrderItem.objects.all()
+        ], batch_size=1000)
+
+        StockIn.objects.bulk_create([
+            StockIn(stock_in_no=f"ST-T{i}", item=cement, quantity=5, date_added=now - timedelta(minutes=i))
+            for i in range(ROWS)
+        ], batch_size=1000)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        self.range = {"from": str(today - timedelta(days=30)), "to": str(today)}
+
+    def test_purchase_orders_report(self):
+        # Orders, then their lines with the approved quote annotated
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/reports/purchase-orders/", self.range)
+        self.assertEqual(len(response.data), ROWS)
+        self.assertEqual(response.data[0]["items"][0]["approved_supplier"], "Acme")
+        self.assertEqual(response.data[0]["total_order_amount"], Decimal("31.50"))
+
+    def test_issue_out_report(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/reports/issue-out/", self.range)
+        self.assertEqual(len(response.data), ROWS)
+        self.assertEqual(response.data[0]["issued_to_name"], "Ann Ole (J1)")
+
+    def test_stock_in_report(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/reports/stock-in/", self.range)
+        self.assertEqual(len(response.data), ROWS)
+
+    def test_return_tool_report(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/reports/return-tools/", self.range)
+        self.assertEqual(len(response.data), ROWS // 2)
+        self.assertEqual(response.data[0]["tool"], "hammer")
+
+    def test_reports_by_date(self):
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/reports/by-date/", self.range)
+        self.assertEqual(len(response.data), 3 * ROWS + ROWS // 2)
+
+
+class ReportRowTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.hammer = Item.objects.create(name="Hammer", category="tool", unit="pcs", quantity_to_add=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        self.range = {"from": str(today), "to": str(today)}
+
+    def test_records_report_their_newest_line(self):
+        record = IssueRecord.objects.create(issued_to=self.employee, issued_by=self.user, issue_type="tool")
+        IssueItem.objects.bulk_create([
+            IssueItem(issue_record=record, item=self.hammer, quantity_issued=4, returned_quantity=1),
+            IssueItem(issue_record=record, item=self.cement, quantity_issued=2),
+        ])
+
+        issue = self.client.get("/api/reports/issue-out/", self.range).data[0]
+        self.assertEqual((issue["item_name"], issue["quantity_issued"]), ("cement", Decimal("2")))
+        self.assertEqual(issue["quantity_remaining"], self.cement.quantity_in_stock)
+
+        tool = self.client.get("/api/reports/return-tools/", self.range).data[0]
+        self.assertEqual((tool["tool"], tool["quantity_issued"], tool["outstanding_quantity"]), ("hammer", 4, 3))
+
+    def test_purchase_orders_list_only_lines_with_an_approved_quote(self):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        priced = PurchaseOrderItem.objects.create(purchase_order=order, item=self.cement, quantity=4)
+        PurchaseOrderItemSupplier.objects.create(order_item=priced, supplier_name="A", amount_per_unit=9)
+        PurchaseOrderItemSupplier.objects.create(order_item=priced, supplier_name="B", amount_per_unit=12, approved_by_md=True)
+        PurchaseOrderItem.objects.create(purchase_order=order, item=self.hammer, quantity=1)
+
+        row = self.client.get("/api/reports/purchase-orders/", self.range).data[0]
+        self.assertEqual([line["approved_supplier"] for line in row["items"]], ["B"])
+        self.assertEqual(row["total_order_amount"], 48)
+        self.assertEqual(row["delivery_date"], row["delivery_status"])
+
+    def test_missing_dates_are_rejected(self):
+        response = self.client.get("/api/reports/stock-in/", {"from": "2026-01-01"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        now = timezone.now()
+        self.today = timezone.localdate()
+        self.first = self.today - timedelta(days=3)
+        self.yesterday = self.today - timedelta(days=1)
+        StockIn.objects.create(item=self.cement, quantity=5, date_added=now - timedelta(days=3))
+        StockIn.objects.create(item=self.cement, quantity=2, date_added=now - timedelta(days=1))
+        StockIn.objects.create(item=self.cement, quantity=7, date_added=now)
+
+    def _by_day(self):
+        rows = summarize(["stock_in"], self.first, self.today, "day")
+        return {row["day"]: row["quantity"] for row in rows}
+
+    def test_refresh_rolls_up_the_completed_days(self):
+        # From the earliest row through yesterday
+        self.assertEqual(refresh_rollups(), 3)
+        self.assertFalse(DailyRollupDirtyDay.objects.exists())
+        rollups = DailyRollup.objects.filter(source="stock_in").order_by("day")
+        self.assertEqual([(r.day, r.line_count, r.quantity) for r in rollups], [(self.first, 1, 5), (self.yesterday, 1, 2)])
+
+        # Nothing new since, and a rebuild starts over from the earliest row
+        self.assertEqual(refresh_rollups(), 0)
+        self.assertEqual(refresh_rollups(rebuild=True), 3)
+        self.assertEqual(DailyRollup.objects.count(), 2)
+
+    def test_summaries_read_rolled_up_days_and_today_raw(self):
+        refresh_rollups()
+        # Altered behind the hooks' back, so only a rollup read would see it
+        DailyRollup.objects.filter(day=self.yesterday).update(quantity=50)
+
+        self.assertEqual(self._by_day(), {
+            str(self.first): 5, str(self.yesterday): 50, str(self.today): 7,
+        })
+
+    def test_dirty_days_are_read_raw_until_the_next_refresh(self):
+        refresh_rollups()
+        DailyRollup.objects.update(quantity=50)
+
+        StockIn.objects.create(item=self.cement, quantity=4, date_added=timezone.now() - timedelta(days=3))
+
+        self.assertEqual(list(DailyRollupDirtyDay.objects.values_list("day", flat=True)), [self.first])
+        self.assertEqual(self._by_day(), {
+            str(self.first): 9, str(self.yesterday): 50, str(self.today): 7,
+        })
+
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertEqual(DailyRollup.objects.get(day=self.first).quantity, 9)
+        self.assertEqual(DailyRollup.objects.get(day=self.yesterday).quantity, 50)
+
+    def test_summary_endpoint(self):
+        refresh_rollups()
+        params = {"from": str(self.first), "to": str(self.today)}
+
+        response = self.client.get("/api/reports/stock-in/", {**params, "group_by": "item"})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        row = response.data[0]
+        self.assertEqual((row["item_name"], row["line_count"], row["quantity"]), ("cement", 3, 14))
+        self.assertEqual(self.client.get("/api/reports/stock-in/", {**params, "group_by": "week"}).status_code, 400)
@@ -7,4 +7,5 @@ urlpatterns = [
     path('issue-out/', views.issue_out_report, name='issue_out_report'),
     path('stock-in/', views.stock_in_report, name='stock_in_report'),
     path('return-tools/', views.return_tool_report, name='return_tool_report'), 
+    path('by-date/', views.reports_by_date, name='reports_by_date'),
 ]
@@ -4,37 +4,99 @@ from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime, time
 from django.utils import timezone
-from purchase_order.models import PurchaseOrder
-from item_issuance.models import IssueRecord
-from stockin.models import StockIn
-from .serializers import (
-    PurchaseOrderReportSerializer,
-    IssueRecordReportSerializer,
-    StockInReportSerializer,
-    ReturnToolReportSerializer
-)
+from .queries import REPORTS
+from .rollups import GROUPS, SOURCES, summarize
+
+
+def _parse_days(request):
+    """The ``from``/``to`` days of the request; ValueError carries the message to return."""
+    from_date = request.GET.get('from')
+    to_date = request.GET.get('to')
+    if not from_date or not to_date:
+        raise ValueError("Both 'from' and 'to' dates are required.")
+
+    try:
+        first = datetime.strptime(from_date, "%Y-%m-%d").date()
+        last = datetime.strptime(to_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+    if first > last:
+        raise ValueError("'from' must not be after 'to'.")
+    return first, last
+
+
+# -------------------------------
+# Row listings
+# -------------------------------
+def rows_report(request, sources):
+    """Rows of ``sources`` in the ``from``/``to`` days, newest first."""
+    try:
+        first, last = _parse_days(request)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last, time.max))
+    rows = [row for source in sources for row in REPORTS[source](start, end)]
+    if len(sources) > 1:
+        # Every row's date is a local "YYYY-MM-DD HH:MM" string, so they sort as text
+        rows.sort(
+            key=lambda x: x.get('created_at_formatted') or x.get('issue_date') or x.get('date_added') or x.get('date') or '',
+            reverse=True
+        )
+    return Response(rows)
+
+
+# -------------------------------
+# Summaries from the daily rollups
+# -------------------------------
+def summary_report(request, sources):
+    """
+    Totals per ``?group_by=`` (day, item, category or employee) over the
+    ``from``/``to`` days. Whole rolled-up days come from ``DailyRollup``; only
+    the rest of the range is aggregated from raw rows.
+    """
+    group_by = request.GET.get('group_by')
+    if group_by not in GROUPS:
+        return Response(
+            {"error": f"group_by must be one of: {', '.join(GROUPS)}."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        first, last = _parse_days(request)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(summarize(sources, first, last, group_by))
+
+
+def _report(request, sources):
+    if 'group_by' in request.GET:
+        return summary_report(request, sources)
+    return rows_report(request, sources)
+
 
 # -------------------------------
 # Individual reports
 # -------------------------------
 @api_view(['GET'])
 def purchase_orders_report(request):
-    return generate_purchase_orders_report(request)
+    return _report(request, ["purchase_order"])
 
 
 @api_view(['GET'])
 def issue_out_report(request):
-    return generate_issue_out_report(request)
+    return _report(request, ["issue_out"])
 
 
 @api_view(['GET'])
 def stock_in_report(request):
-    return generate_stock_in_report(request)
+    return _report(request, ["stock_in"])
 
 
 @api_view(['GET'])
 def return_tool_report(request):
-    return generate_return_tool_report(request)
+    return _report(request, ["return_tool"])
 
 
 # -------------------------------
@@ -43,190 +105,10 @@ def return_tool_report(request):
 @api_view(['GET'])
 def reports_by_date(request):
     """Return combined POs, Issue Out, Stock In, and Return Tools in a date range (newest first)"""
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-
-    if not from_date or not to_date:
-        return Response({"error": "Both 'from' and 'to' dates are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-    try:
-        from_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(from_date, "%Y-%m-%d").date(), time.min))
-        to_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(to_date, "%Y-%m-%d").date(), time.max))
-
-        # ----------------------------
-        # Purchase Orders
-        # ----------------------------
-        purchase_orders = PurchaseOrder.objects.filter(
-            created_at__gte=from_date_obj,
-            created_at__lte=to_date_obj
-        ).prefetch_related('items__suppliers', 'items__item')
-        po_data = PurchaseOrderReportSerializer(purchase_orders, many=True).data
-        for entry in po_data:
-            entry['report_type'] = 'purchase_order'
-            if 'created_at' in entry and entry['created_at']:
-                dt = datetime.fromisoformat(entry['created_at'])
-                entry['created_at'] = dt.strftime('%Y-%m-%d %H:%M')
-
-        # ----------------------------
-        # Issue Records
-        # ----------------------------
-        issue_records = IssueRecord.objects.filter(
-            issue_date__gte=from_date_obj,
-            issue_date__lte=to_date_obj
-        ).select_related('issued_to', 'issued_by')
-        issue_data = IssueRecordReportSerializer(issue_records, many=True).data
-        for entry in issue_data:
-            entry['report_type'] = 'issue_out'
-            if 'issue_date' in entry and entry['issue_date']:
-                dt = datetime.fromisoformat(entry['issue_date'])
-                entry['issue_date'] = dt.strftime('%Y-%m-%d %H:%M')
-
-        # ----------------------------
-        # Stock In Records
-        # ----------------------------
-        stock_in_records = StockIn.objects.filter(
-            date_added__gte=from_date_obj,
-            date_added__lte=to_date_obj
-        ).select_related('item')
-        stock_data = StockInReportSerializer(stock_in_records, many=True).data
-        for entry in stock_data:
-            entry['report_type'] = 'stock_in'
-            if 'date_added' in entry and entry['date_added']:
-                dt = datetime.fromisoformat(entry['date_added'])
-                entry['date_added'] = dt.strftime('%Y-%m-%d %H:%M')
-
-        # ----------------------------
-        # Return Tool Records
-        # ----------------------------
-        return_tool_records = IssueRecord.objects.filter(
-            issue_date__gte=from_date_obj,
-            issue_date__lte=to_date_obj,
-            items__item__category='tool'
-        ).distinct().select_related('issued_to')
-        return_tool_data = ReturnToolReportSerializer(return_tool_records, many=True).data
-        for entry in return_tool_data:
-            entry['report_type'] = 'return_tool'
-
-        # ----------------------------
-        # Combine & sort newest first
-        # ----------------------------
-        combined = po_data + issue_data + stock_data + return_tool_data
-        combined_sorted = sorted(
-            combined,
-            key=lambda x: x.get('created_at') or x.get('issue_date') or x.get('date_added') or x.get('date'),
-            reverse=True
+    sources = [source for source in request.GET.get('sources', '').split(',') if source] or list(SOURCES)
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        return Response(
+            {"error": f"Unknown sources: {', '.join(sorted(unknown))}."}, status=status.HTTP_400_BAD_REQUEST
         )
-
-        return Response(combined_sorted, status=status.HTTP_200_OK)
-
-    except ValueError:
-        return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
-    except Exception as e:
-        return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-# -------------------------------
-# Helper functions for individual reports
-# -------------------------------
-def generate_purchase_orders_report(request):
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-    if not from_date or not to_date:
-        return Response({"error": "Both 'from' and 'to' dates are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-    try:
-        from_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(from_date, "%Y-%m-%d").date(), time.min))
-        to_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(to_date, "%Y-%m-%d").date(), time.max))
-        purchase_orders = PurchaseOrder.objects.filter(
-            created_at__gte=from_date_obj,
-            created_at__lte=to_date_obj
-        ).prefetch_related('items__suppliers', 'items__item')
-
-        serializer = PurchaseOrderReportSerializer(purchase_orders, many=True)
-        data = serializer.data
-        for entry in data:
-            if 'created_at' in entry and entry['created_at']:
-                dt = datetime.fromisoformat(entry['created_at'])
-                entry['created_at'] = dt.strftime('%Y-%m-%d %H:%M')
-        return Response(data)
-
-    except Exception as e:
-        return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-def generate_issue_out_report(request):
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-    if not from_date or not to_date:
-        return Response({"error": "Both 'from' and 'to' dates are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-    try:
-        from_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(from_date, "%Y-%m-%d").date(), time.min))
-        to_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(to_date, "%Y-%m-%d").date(), time.max))
-        issue_records = IssueRecord.objects.filter(
-            issue_date__gte=from_date_obj,
-            issue_date__lte=to_date_obj
-        ).select_related('issued_to', 'issued_by')
-
-        serializer = IssueRecordReportSerializer(issue_records, many=True)
-        data = serializer.data
-        for entry in data:
-            entry['report_type'] = 'issue_out'
-            if 'issue_date' in entry and entry['issue_date']:
-                dt = datetime.fromisoformat(entry['issue_date'])
-                entry['issue_date'] = dt.strftime('%Y-%m-%d %H:%M')
-        return Response(data)
-
-    except Exception as e:
-        return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-def generate_stock_in_report(request):
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-    if not from_date or not to_date:
-        return Response({"error": "Both 'from' and 'to' dates are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-    try:
-        from_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(from_date, "%Y-%m-%d").date(), time.min))
-        to_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(to_date, "%Y-%m-%d").date(), time.max))
-        stock_in_records = StockIn.objects.filter(
-            date_added__gte=from_date_obj,
-            date_added__lte=to_date_obj
-        ).select_related('item')
-
-        serializer = StockInReportSerializer(stock_in_records, many=True)
-        data = serializer.data
-        for entry in data:
-            if 'date_added' in entry and entry['date_added']:
-                dt = datetime.fromisoformat(entry['date_added'])
-                entry['date_added'] = dt.strftime('%Y-%m-%d %H:%M')
-        return Response(data)
-
-    except Exception as e:
-        return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-def generate_return_tool_report(request):
-    from_date = request.GET.get('from')
-    to_date = request.GET.get('to')
-    if not from_date or not to_date:
-        return Response({"error": "Both 'from' and 'to' dates are required."}, status=status.HTTP_400_BAD_REQUEST)
-
-    try:
-        from_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(from_date, "%Y-%m-%d").date(), time.min))
-        to_date_obj = timezone.make_aware(datetime.combine(datetime.strptime(to_date, "%Y-%m-%d").date(), time.max))
-        return_tool_records = IssueRecord.objects.filter(
-            issue_date__gte=from_date_obj,
-            issue_date__lte=to_date_obj,
-            items__item__category='tool'
-        ).distinct().select_related('issued_to')
-
-        serializer = ReturnToolReportSerializer(return_tool_records, many=True)
-        data = serializer.data
-        for entry in data:
-            entry['report_type'] = 'return_tool'
-        return Response(data)
-
-    except Exception as e:
-        return Response({"error": f"An error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return _report(request, sources)
@@ -4,6 +4,7 @@ from django.core.validators import MinValueValidator
 from django.conf import settings
 from item_issuance.models import IssueRecord, IssueItem
 from employees.models import Employee
+from sequences.services import last_number, next_numbers
 
 
 class ReturnedItem(models.Model):
@@ -66,23 +67,12 @@ class ReturnedItem(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.return_number:
-            last_item = (
-                ReturnedItem.objects
-                .exclude(return_number__isnull=True)
-                .exclude(return_number="")
-                .order_by('-id')
-                .first()
-            )
-
-            next_number = 1  # RT1 default
-
-            if last_item and last_item.return_number:
-                # Expected format: RT<number>
-                numeric_part = last_item.return_number.replace("RT", "")
-
-                if numeric_part.isdigit():
-                    next_number = int(numeric_part) + 1
-
-            self.return_number = f"RT{next_number}"
+            self.return_number = ReturnedItem.allocate_numbers()[0]
 
         super().save(*args, **kwargs)
+
+    @classmethod
+    def allocate_numbers(cls, count=1):
+        """Reserve the next ``count`` return numbers (RT1, RT2, ...)."""
+        numbers = next_numbers("return", count, start=lambda: last_number(cls.objects, "return_number", "RT"))
+        return [f"RT{n}" for n in numbers]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import ReturnedItem
 from item_issuance.models import IssueItem
@@ -209,3 +211,14 @@ class ReturnItemSerializer(serializers.ModelSerializer):
         validated_data["returned_by"] = self.context["request"].user
 
         return super().create(validated_data)
+
+
+class ReturnLineSerializer(serializers.Serializer):
+    """
+    Shape of one line in a bulk return. Checks against the issued item are
+    made by ``returns.services.record_returns`` for all lines together.
+    """
+
+    issue_item_id = serializers.IntegerField()
+    returned_quantity = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+    condition = serializers.ChoiceField(choices=ReturnedItem.CONDITION_CHOICES)
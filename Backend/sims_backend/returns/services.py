@@ -0,0 +1,122 @@
+# returns/services.py
+"""
+Bulk tool returns.
+
+A batch of returned lines is recorded in one transaction. Every referenced
+``IssueItem`` is loaded and locked with a single query, the lines are
+validated against those rows in memory, return numbers are reserved in one
+block, and stock goes back with one ledger entry per item.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+
+from inventory.services import return_stock_bulk
+from item_issuance.custody import sync_custody
+from item_issuance.models import IssueItem
+from porequest.forecasting import invalidate_forecast
+from search.index import index_instances
+from .models import ReturnedItem
+
+RETURNABLE_STATUSES = ("Issued", "Partially_Returned")
+
+
+class ReturnLineError(ValueError):
+    """Raised with one ``{"line", "issue_item_id", "error"}`` dict per rejected line."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} line{'s' if len(errors) != 1 else ''} rejected")
+
+
+def _line_error(issue_item, quantity, already_returned):
+    """Reason ``quantity`` of ``issue_item`` cannot be returned, or None."""
+    if issue_item is None:
+        return "Invalid issue_item_id. Item not found."
+
+    item = issue_item.item
+    if item.category != "tool":
+        return f"Item '{item.name}' is a {item.category}. Only tools can be returned."
+    tool = getattr(item, "tool", None)
+    if tool is None:
+        return f"Tool '{item.name}' is not properly configured."
+    if not tool.returnable:
+        return f"Tool '{item.name}' is marked as non-returnable."
+    if issue_item.issue_record.status not in RETURNABLE_STATUSES:
+        return f"Cannot return item from issue with status '{issue_item.issue_record.status}'."
+
+    outstanding = issue_item.quantity_issued - issue_item.returned_quantity - already_returned
+    if quantity > outstanding:
+        return (
+            f"Cannot return more than {max(outstanding, 0)}. "
+            f"Issued: {issue_item.quantity_issued}, "
+            f"Already returned: {issue_item.returned_quantity + already_returned}"
+        )
+    return None
+
+
+def record_returns(lines, user):
+    """
+    Record validated ``lines`` of ``{"issue_item_id", "returned_quantity",
+    "condition"}`` as ``ReturnedItem`` rows.
+
+    Either every line is recorded or, when any line fails, none is and
+    ``ReturnLineError`` lists the failures. Several lines may return the same
+    issue item. Returns the created rows with their relations loaded.
+    """
+    with transaction.atomic():
+        issue_items = IssueItem.objects.select_for_update(of=("self",)).filter(
+            pk__in={line["issue_item_id"] for line in lines}
+        ).select_related("item__tool", "issue_record").order_by("pk")
+        issue_items = {issue_item.pk: issue_item for issue_item in issue_items}
+
+        errors, returned = [], {}
+        for number, line in enumerate(lines, start=1):
+            issue_item = issue_items.get(line["issue_item_id"])
+            quantity = line["returned_quantity"]
+            error = _line_error(issue_item, quantity, returned.get(line["issue_item_id"], Decimal("0")))
+            if error:
+                errors.append({"line": number, "issue_item_id": line["issue_item_id"], "error": error})
+            else:
+                returned[issue_item.pk] = returned.get(issue_item.pk, Decimal("0")) + quantity
+        if errors:
+            raise ReturnLineError(errors)
+
+        numbers = ReturnedItem.allocate_numbers(len(lines))
+        returns = []
+        for number, line in zip(numbers, lines):
+            issue_item = issue_items[line["issue_item_id"]]
+            issue_item.returned_quantity += line["returned_quantity"]
+            issue_item.return_condition = line["condition"]
+            returns.append(ReturnedItem(
+                return_number=number,
+                issue_record=issue_item.issue_record,
+                issue_item=issue_item,
+                employee_id=issue_item.issue_record.issued_to_id,
+                returned_quantity=line["returned_quantity"],
+                condition=line["condition"],
+                returned_by=user,
+            ))
+
+        changed = [issue_items[pk] for pk in returned]
+        IssueItem.objects.bulk_update(changed, ["returned_quantity", "return_condition"])
+        ReturnedItem.objects.bulk_create(returns)
+
+        stock = {}
+        for issue_item in changed:
+            stock[issue_item.item_id] = stock.get(issue_item.item_id, Decimal("0")) + returned[issue_item.pk]
+        reference = numbers[0] if len(numbers) == 1 else f"{numbers[0]}-{numbers[-1]}"
+        return_stock_bulk(stock, reference=reference, user=user)
+
+        sync_custody(changed)
+        # bulk_update skips the IssueItem post_save that drops cached demand
+        transaction.on_commit(invalidate_forecast)
+
+        # Backends such as MySQL do not return ids from bulk inserts
+        returns = list(
+            ReturnedItem.objects.filter(return_number__in=numbers)
+            .select_related("employee", "issue_item__item__tool")
+            .order_by("pk")
+        )
+        index_instances(returns)
+    return returns
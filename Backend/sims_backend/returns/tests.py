@@ -1,3 +1,112 @@
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from inventory.models import Item, StockMovement, Tool
+from item_issuance.models import IssueItem, IssueRecord, ToolCustody
+from sequences import services as sequences
+from sequences.models import Sequence
+from users.models import CustomUser
+
+from .models import ReturnedItem
+from .services import record_returns
+
+
+class ReturnTests(TestCase):
+    URL = "/api/returns/returned-items/"
+
+    def setUp(self):
+        sequences._blocks.clear()
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.record = IssueRecord.objects.create(
+            issued_to=self.employee, issued_by=self.user, issue_type="tool", status="Issued",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _tool(self, name):
+        item = Item.objects.create(name=name, category="tool", unit="pcs", quantity_to_add=10)
+        Tool.objects.create(item=item, condition="Good")
+        return item
+
+    def _issued(self, item, quantity=4):
+        return IssueItem.objects.create(issue_record=self.record, item=item, quantity_issued=quantity)
+
+    def _post(self, *lines):
+        return self.client.post(self.URL, {"items_to_return": [
+            {"issue_item_id": line.pk, "returned_quantity": quantity, "condition": condition}
+            for line, quantity, condition in lines
+        ]}, format="json")
+
+    def test_unknown_condition_is_rejected(self):
+        hammer = self._issued(self._tool("Hammer"))
+
+        response = self._post((hammer, 1, "Broken"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("condition", response.data[0])
+        self.assertFalse(ReturnedItem.objects.exists())
+
+    def test_bad_line_rolls_back_the_whole_batch(self):
+        hammer_item = self._tool("Hammer")
+        hammer, drill = self._issued(hammer_item), self._issued(self._tool("Drill"), quantity=1)
+        hammer_item.refresh_from_db()
+        in_stock = hammer_item.quantity_in_stock
+
+        response = self._post((hammer, 2, "Good"), (drill, 3, "Good"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2])
+        self.assertFalse(ReturnedItem.objects.exists())
+        hammer.refresh_from_db()
+        hammer_item.refresh_from_db()
+        self.assertEqual(hammer.returned_quantity, 0)
+        self.assertEqual(hammer_item.quantity_in_stock, in_stock)
+        self.assertEqual(ToolCustody.objects.get(issue_item=hammer).outstanding_quantity, 4)
+
+    def test_return_numbers_come_from_one_block(self):
+        hammer, drill = self._issued(self._tool("Hammer")), self._issued(self._tool("Drill"))
+
+        response = self._post((hammer, 1, "Good"), (hammer, 1, "Fair"), (drill, 2, "Damaged"))
+
+        self.assertEqual(response.status_code, 201)
+        numbers = [row["return_number"] for row in response.data["returned_items"]]
+        self.assertEqual(numbers, ["RT1", "RT2", "RT3"])
+        self.assertEqual(Sequence.objects.get(name="return").next_value, 1 + sequences.BLOCK_SIZE)
+
+    def test_stock_is_restored_once_per_item(self):
+        hammer_item, drill_item = self._tool("Hammer"), self._tool("Drill")
+        hammer, drill = self._issued(hammer_item), self._issued(drill_item)
+
+        record_returns([
+            {"issue_item_id": hammer.pk, "returned_quantity": Decimal("1"), "condition": "Good"},
+            {"issue_item_id": hammer.pk, "returned_quantity": Decimal("2"), "condition": "Fair"},
+            {"issue_item_id": drill.pk, "returned_quantity": Decimal("4"), "condition": "Good"},
+        ], self.user)
+
+        returns = StockMovement.objects.filter(movement_type=StockMovement.RETURN)
+        self.assertEqual(sorted(returns.values_list("item__name", "quantity")), [("drill", 4), ("hammer", 3)])
+        hammer.refresh_from_db()
+        self.assertEqual((hammer.returned_quantity, hammer.return_condition), (3, "Fair"))
+        self.assertEqual(ToolCustody.objects.get(issue_item=hammer).outstanding_quantity, 1)
+        self.assertFalse(ToolCustody.objects.filter(issue_item=drill).exists())
 
-# Create your tests here.
+    def test_query_count_does_not_grow_with_lines(self):
+        # Create the sequence row so its one-off setup is not counted
+        ReturnedItem.allocate_numbers(1)
+        counts = []
+        for size in (2, 15):
+            lines = [
+                {"issue_item_id": self._issued(self._tool(f"Tool {size}-{i}")).pk,
+                 "returned_quantity": Decimal("1"), "condition": "Good"}
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                record_returns(lines, self.user)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
@@ -1,10 +1,11 @@
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import F, DecimalField, ExpressionWrapper
-from item_issuance.models import IssueRecord, IssueItem
+from django.db.models import Count
+from item_issuance.models import IssueItem, ToolCustody
 from .models import ReturnedItem
-from .serializers import ReturnItemSerializer
+from .serializers import ReturnItemSerializer, ReturnLineSerializer
+from .services import ReturnLineError, record_returns
 from employees.models import Employee
 
 
@@ -27,13 +28,16 @@ class ReturnedItemListCreateView(generics.ListCreateAPIView):
         if not items_to_return:
             return Response({"detail": "No items provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        returned_objects = []
+        lines = ReturnLineSerializer(data=items_to_return, many=True)
+        lines.is_valid(raise_exception=True)
 
-        for item_data in items_to_return:
-            serializer = ReturnItemSerializer(data=item_data, context={"request": request})
-            serializer.is_valid(raise_exception=True)
-            returned_obj = serializer.save()
-            returned_objects.append(returned_obj)
+        try:
+            returned_objects = record_returns(lines.validated_data, request.user)
+        except ReturnLineError as e:
+            return Response(
+                {"detail": "Some items cannot be returned", "errors": e.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         serializer = ReturnItemSerializer(returned_objects, many=True, context={"request": request})
         return Response({"returned_items": serializer.data}, status=status.HTTP_201_CREATED)
@@ -50,56 +54,34 @@ def get_issued_items_by_employee(request):
 
         employee = Employee.objects.get(id=employee_id)
 
-        issued_items = IssueItem.objects.filter(
-            issue_record__issued_to=employee,
-            issue_record__status__in=['Issued', 'Partially_Returned'],
-            item__category='tool'
-        ).annotate(
-            outstanding_quantity=ExpressionWrapper(
-                F('quantity_issued') - F('returned_quantity'),
-                output_field=DecimalField(max_digits=10, decimal_places=2)
-            )
-        ).filter(
-            outstanding_quantity__gt=0
-        ).select_related('issue_record', 'item', 'item__tool')
+        custody = ToolCustody.objects.filter(
+            employee=employee,
+            issue_item__item__tool__returnable=True,
+        ).select_related('issue_item__issue_record', 'issue_item__item__tool').order_by('-issue_item_id')
 
         items_data = []
-        for item in issued_items:
-            is_returnable = False
-            tool_model = ''
-            tool_serial = ''
-            tool_returnable = False
-            
-            try:
-                if hasattr(item.item, 'tool') and item.item.tool:
-                    tool_returnable = item.item.tool.returnable
-                    is_returnable = tool_returnable
-                    tool_model = item.item.tool.model or ''
-                    tool_serial = item.item.tool.serial_number or ''
-            except Exception:
-                tool_returnable = False
-                is_returnable = False
-
-            if tool_returnable:
-                items_data.append({
-                    'issue_item_id': item.id,
-                    'issue_record_id': item.issue_record.id,
-                    'issue_id': item.issue_record.issue_id,
-                    'item_id': item.item.id,
-                    'item_name': item.item.name,
-                    'item_code': getattr(item.item, 'item_code', ''),
-                    'category': item.item.category,
-                    'quantity_issued': float(item.quantity_issued),
-                    'returned_quantity': float(item.returned_quantity),
-                    'outstanding_quantity': float(item.outstanding_quantity),
-                    'unit': item.unit or getattr(item.item, 'unit', ''),
-                    'issue_date': item.issue_record.issue_date,
-                    'is_returnable': is_returnable,
-                    'current_condition': item.return_condition or 'Good',
-                    'tool_model': tool_model,
-                    'tool_serial': tool_serial,
-                    'tool_returnable': tool_returnable
-                })
+        for row in custody:
+            item = row.issue_item
+            tool = item.item.tool
+            items_data.append({
+                'issue_item_id': item.id,
+                'issue_record_id': item.issue_record.id,
+                'issue_id': item.issue_record.issue_id,
+                'item_id': item.item.id,
+                'item_name': item.item.name,
+                'item_code': getattr(item.item, 'item_code', ''),
+                'category': item.item.category,
+                'quantity_issued': float(item.quantity_issued),
+                'returned_quantity': float(item.returned_quantity),
+                'outstanding_quantity': float(row.outstanding_quantity),
+                'unit': item.unit or getattr(item.item, 'unit', ''),
+                'issue_date': item.issue_record.issue_date,
+                'is_returnable': True,
+                'current_condition': item.return_condition or 'Good',
+                'tool_model': getattr(tool, 'model', None) or '',
+                'tool_serial': getattr(tool, 'serial_number', None) or '',
+                'tool_returnable': True
+            })
 
         return Response({
             'employee_id': employee.id,
@@ -125,38 +107,33 @@ def get_issued_items_by_employee(request):
 def get_employee_issued_items_list(request):
     """Get list of employees who have outstanding issued TOOLS"""
     try:
-        employees_with_items = Employee.objects.filter(
-            issues_received__items__item__category='tool',
-            issues_received__items__returned_quantity__lt=F('issues_received__items__quantity_issued'),
-            issues_received__status__in=['Issued', 'Partially_Returned']
-        ).distinct()
+        # One grouped query over the custody table instead of one per employee
+        employees_with_items = (
+            ToolCustody.objects.filter(issue_item__item__tool__returnable=True)
+            .values('employee_id', 'employee__job_number', 'employee__first_name',
+                    'employee__middle_name', 'employee__last_name', 'employee__department')
+            .annotate(outstanding_items_count=Count('pk'))
+            .order_by('employee__first_name', 'employee__last_name')
+        )
 
         employees_data = []
-        for employee in employees_with_items:
-            outstanding_items = IssueItem.objects.filter(
-                issue_record__issued_to=employee,
-                issue_record__status__in=['Issued', 'Partially_Returned'],
-                item__category='tool',
-                returned_quantity__lt=F('quantity_issued')
-            ).select_related('item__tool')
-            
-            returnable_outstanding_count = 0
-            for item in outstanding_items:
-                try:
-                    if hasattr(item.item, 'tool') and item.item.tool and item.item.tool.returnable:
-                        returnable_outstanding_count += 1
-                except Exception:
-                    continue
-
-            if returnable_outstanding_count > 0:
-                employees_data.append({
-                    'employee_id': employee.id,
-                    'employee_name': str(employee),
-                    'employee_code': getattr(employee, 'employee_code', ''),
-                    'department': employee.department if employee.department else '',
-                    'outstanding_items_count': returnable_outstanding_count,
-                    'item_type': 'Tools only'
-                })
+        for row in employees_with_items:
+            employee = Employee(
+                id=row['employee_id'],
+                job_number=row['employee__job_number'],
+                first_name=row['employee__first_name'],
+                middle_name=row['employee__middle_name'],
+                last_name=row['employee__last_name'],
+                department=row['employee__department'],
+            )
+            employees_data.append({
+                'employee_id': employee.id,
+                'employee_name': str(employee),
+                'employee_code': getattr(employee, 'employee_code', ''),
+                'department': employee.department if employee.department else '',
+                'outstanding_items_count': row['outstanding_items_count'],
+                'item_type': 'Tools only'
+            })
 
         return Response({
             'employees': employees_data,
@@ -175,41 +152,32 @@ def get_employee_issued_items_list(request):
 def get_all_returnable_tools(request):
     """Get all returnable tools across all employees"""
     try:
-        outstanding_tools = IssueItem.objects.filter(
-            item__category='tool',
-            issue_record__status__in=['Issued', 'Partially_Returned'],
-            returned_quantity__lt=F('quantity_issued')
-        ).select_related('issue_record', 'issue_record__issued_to', 'item', 'item__tool')
-        
+        custody = ToolCustody.objects.filter(
+            issue_item__item__tool__returnable=True,
+        ).select_related('employee', 'issue_item__issue_record', 'issue_item__item').order_by('-issue_item_id')
+
         tools_data = []
-        for item in outstanding_tools:
-            is_returnable = False
-            try:
-                if hasattr(item.item, 'tool') and item.item.tool:
-                    is_returnable = item.item.tool.returnable
-            except Exception:
-                is_returnable = False
-            
-            if is_returnable:
-                outstanding = float(item.quantity_issued - item.returned_quantity)
-                tools_data.append({
-                    'issue_item_id': item.id,
-                    'issue_record_id': item.issue_record.id,
-                    'issue_id': item.issue_record.issue_id,
-                    'item_id': item.item.id,
-                    'item_name': item.item.name,
-                    'employee_id': item.issue_record.issued_to.id,
-                    'employee_name': str(item.issue_record.issued_to),
-                    'employee_code': getattr(item.issue_record.issued_to, 'employee_code', ''),
-                    'department': item.issue_record.issued_to.department if item.issue_record.issued_to.department else '',
-                    'quantity_issued': float(item.quantity_issued),
-                    'returned_quantity': float(item.returned_quantity),
-                    'outstanding_quantity': outstanding,
-                    'unit': item.unit or getattr(item.item, 'unit', ''),
-                    'issue_date': item.issue_record.issue_date,
-                    'is_returnable': is_returnable
-                })
-        
+        for row in custody:
+            item = row.issue_item
+            employee = row.employee
+            tools_data.append({
+                'issue_item_id': item.id,
+                'issue_record_id': item.issue_record.id,
+                'issue_id': item.issue_record.issue_id,
+                'item_id': item.item.id,
+                'item_name': item.item.name,
+                'employee_id': employee.id,
+                'employee_name': str(employee),
+                'employee_code': getattr(employee, 'employee_code', ''),
+                'department': employee.department if employee.department else '',
+                'quantity_issued': float(item.quantity_issued),
+                'returned_quantity': float(item.returned_quantity),
+                'outstanding_quantity': float(row.outstanding_quantity),
+                'unit': item.unit or getattr(item.item, 'unit', ''),
+                'issue_date': item.issue_record.issue_date,
+                'is_returnable': True
+            })
+
         return Response({
             'tools': tools_data,
             'total_tools': len(tools_data),
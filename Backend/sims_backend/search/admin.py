@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import SearchEntry
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ("label", "entity_type", "object_id", "updated_at")
+    list_filter = ("entity_type",)
+    search_fields = ("label",)
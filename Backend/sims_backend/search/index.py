@@ -0,0 +1,183 @@
+# search/index.py
+"""
+Typeahead search index.
+
+Every searchable entity gets one ``SearchEntry`` and one ``SearchToken`` row
+per normalised word. A query is answered by a prefix range scan on the
+``token`` index, so lookups stay fast regardless of how many entities exist.
+"""
+import re
+
+from django.db import transaction
+
+from .models import SearchEntry, SearchToken
+
+MAX_TOKEN_LENGTH = 100
+DEFAULT_LIMIT = 20
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words, plus the whole string run together.
+
+    The joined form lets ``st0001`` find ``ST-0001`` and ``kaa123a`` find
+    ``KAA 123A``.
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    tokens = list(dict.fromkeys(words))
+    if len(words) > 1:
+        tokens.append("".join(words))
+    return [t[:MAX_TOKEN_LENGTH] for t in tokens]
+
+
+# ----------------------------- DOCUMENTS -----------------------------
+
+# Each builder returns (entity type, label, searchable fields). Fields are
+# tokenized separately so a plate or job number gets its own joined token.
+
+def _item(obj):
+    return "item", obj.name.capitalize(), [obj.name]
+
+
+def _vehicle(obj):
+    return "vehicle", f"{obj.item.name.capitalize()} ({obj.plate_number})", [obj.item.name, obj.plate_number]
+
+
+def _employee(obj):
+    return "employee", str(obj), [obj.full_name, obj.job_number]
+
+
+def _issue(obj):
+    return "issue", obj.issue_id, [obj.issue_id]
+
+
+def _purchase_order(obj):
+    return "purchase_order", obj.order_number, [obj.order_number]
+
+
+def _stock_in(obj):
+    return "stock_in", obj.stock_in_no, [obj.stock_in_no]
+
+
+def _return(obj):
+    return "return", obj.return_number, [obj.return_number]
+
+
+DOCUMENT_BUILDERS = {
+    "inventory.item": _item,
+    "inventory.vehicle": _vehicle,
+    "employees.employee": _employee,
+    "item_issuance.issuerecord": _issue,
+    "purchase_order.purchaseorder": _purchase_order,
+    "stockin.stockin": _stock_in,
+    "returns.returneditem": _return,
+}
+
+
+def _document(instance):
+    builder = DOCUMENT_BUILDERS.get(instance._meta.label_lower)
+    if builder is None or instance.pk is None:
+        return None
+    entity_type, label, fields = builder(instance)
+    tokens = list(dict.fromkeys(token for field in fields for token in tokenize(field)))
+    return entity_type, instance.pk, (label or "")[:255], tokens
+
+
+# ----------------------------- WRITES -----------------------------
+
+def index_instances(instances):
+    """(Re)index saved model instances in bulk."""
+    docs = [doc for doc in map(_document, instances) if doc and doc[3]]
+    if not docs:
+        return
+
+    with transaction.atomic():
+        by_type = {}
+        for entity_type, object_id, _, _ in docs:
+            by_type.setdefault(entity_type, []).append(object_id)
+        for entity_type, object_ids in by_type.items():
+            SearchEntry.objects.filter(entity_type=entity_type, object_id__in=object_ids).delete()
+
+        SearchEntry.objects.bulk_create([
+            SearchEntry(entity_type=entity_type, object_id=object_id, label=label)
+            for entity_type, object_id, label, _ in docs
+        ])
+
+        entry_ids = {}
+        for entity_type, object_ids in by_type.items():
+            rows = SearchEntry.objects.filter(entity_type=entity_type, object_id__in=object_ids)
+            for pk, object_id in rows.values_list("id", "object_id"):
+                entry_ids[(entity_type, object_id)] = pk
+
+        SearchToken.objects.bulk_create([
+            SearchToken(entry_id=entry_ids[(entity_type, object_id)], token=token)
+            for entity_type, object_id, _, tokens in docs
+            for token in tokens
+        ])
+
+
+def index_instance(instance):
+    index_instances([instance])
+
+
+def remove_instance(instance):
+    doc = _document(instance)
+    if doc:
+        SearchEntry.objects.filter(entity_type=doc[0], object_id=doc[1]).delete()
+
+
+# ----------------------------- READS -----------------------------
+
+def _prefix_range(field, word):
+    """
+    ``startswith`` written as a range so every backend can use the index.
+
+    SQLite never uses an index for ``LIKE ... ESCAPE``. Tokens only contain
+    ``[a-z0-9]`` and ``{`` sorts right after ``z``.
+    """
+    prefix = word[:MAX_TOKEN_LENGTH]
+    return {f"{field}__gte": prefix, f"{field}__lt": prefix + "{"}
+
+
+def _matches(words, types, limit):
+    words = sorted(set(words), key=len, reverse=True)
+    rows = SearchToken.objects.filter(**_prefix_range("token", words[0]))
+    for word in words[1:]:
+        rows = rows.filter(**_prefix_range("entry__tokens__token", word))
+    if types:
+        rows = rows.filter(entry__entity_type__in=types)
+
+    # An entry can match on several tokens; over-fetch and let the caller de-duplicate.
+    return rows.order_by("token", "entry_id").values_list(
+        "entry_id", "entry__entity_type", "entry__object_id", "entry__label"
+    )[:limit * 4]
+
+
+def search(query, types=None, limit=DEFAULT_LIMIT):
+    """
+    Entries whose words start with every word of ``query``.
+
+    The scan walks the ``token`` index in order from the longest query word,
+    so results come back alphabetically by matching word and the query stops
+    as soon as ``limit`` entries are found. A multi-word query that comes up
+    short is retried as one joined word, so ``KAA 1`` still finds ``KAA1``.
+    """
+    words = _WORD_RE.findall((query or "").lower())
+    if not words:
+        return []
+
+    attempts = [words]
+    if len(words) > 1:
+        attempts.append(["".join(words)])
+
+    results, seen = [], set()
+    for attempt in attempts:
+        for entry_id, entity_type, object_id, label in _matches(attempt, types, limit):
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            results.append({"type": entity_type, "id": object_id, "label": label})
+            if len(results) == limit:
+                return results
+    return results
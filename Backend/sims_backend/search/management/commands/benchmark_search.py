@@ -0,0 +1,76 @@
+# search/management/commands/benchmark_search.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from inventory.models import Item, Vehicle
+from employees.models import Employee
+from item_issuance.models import IssueRecord
+from purchase_order.models import PurchaseOrder
+from stockin.models import StockIn
+from returns.models import ReturnedItem
+from search.index import index_instances, search
+
+DEFAULT_QUERIES = ["ham", "die", "kaa", "john", "issue", "po1", "st-00", "rt1", "x"]
+
+
+def naive_search(query, limit=20):
+    """What the frontend does today, done server side: icontains over every table."""
+    results = []
+    results += Item.objects.filter(name__icontains=query).values_list("id", flat=True)[:limit]
+    results += Vehicle.objects.filter(plate_number__icontains=query).values_list("id", flat=True)[:limit]
+    results += Employee.objects.filter(
+        Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(job_number__icontains=query)
+    ).values_list("id", flat=True)[:limit]
+    results += IssueRecord.objects.filter(issue_id__icontains=query).values_list("id", flat=True)[:limit]
+    results += PurchaseOrder.objects.filter(order_number__icontains=query).values_list("id", flat=True)[:limit]
+    results += StockIn.objects.filter(stock_in_no__icontains=query).values_list("id", flat=True)[:limit]
+    results += ReturnedItem.objects.filter(return_number__icontains=query).values_list("id", flat=True)[:limit]
+    return results[:limit]
+
+
+class Command(BaseCommand):
+    help = "Compare /api/search/ index lookups with a naive icontains scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Insert this many synthetic items first; rolled back afterwards.")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                self._seed(options["seed"])
+            self._run(options["queries"], options["repeat"])
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        started = time.perf_counter()
+        words = ["hammer", "diesel", "cement", "spanner", "wheelbarrow", "nail", "paint", "rope"]
+        items = [Item(name=f"{words[i % len(words)]} {i}", category="material") for i in range(count)]
+        for start in range(0, count, 5000):
+            batch = items[start:start + 5000]
+            Item.objects.bulk_create(batch)
+            if batch[0].pk is None:
+                batch = list(Item.objects.filter(name__in=[i.name for i in batch]))
+            index_instances(batch)
+        self.stdout.write(f"Seeded {count} items in {time.perf_counter() - started:.1f}s")
+
+    def _time(self, func, query, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def _run(self, queries, repeat):
+        self.stdout.write(f"{'query':<12}{'index ms':>10}{'icontains ms':>14}{'speedup':>10}")
+        for query in queries:
+            indexed = self._time(search, query, repeat)
+            naive = self._time(naive_search, query, repeat)
+            self.stdout.write(f"{query:<12}{indexed:>10.2f}{naive:>14.2f}{naive / indexed:>9.1f}x")
@@ -0,0 +1,46 @@
+# search/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from inventory.models import Item, Vehicle
+from employees.models import Employee
+from item_issuance.models import IssueRecord
+from purchase_order.models import PurchaseOrder
+from stockin.models import StockIn
+from returns.models import ReturnedItem
+from search.index import index_instances
+from search.models import SearchEntry
+
+SOURCES = [
+    Item.objects.all(),
+    Vehicle.objects.select_related("item"),
+    Employee.objects.all(),
+    IssueRecord.objects.all(),
+    PurchaseOrder.objects.all(),
+    StockIn.objects.all(),
+    ReturnedItem.objects.all(),
+]
+
+
+class Command(BaseCommand):
+    help = "Rebuild the global typeahead search index from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        SearchEntry.objects.all().delete()
+
+        for queryset in SOURCES:
+            batch, total = [], 0
+            for instance in queryset.iterator(chunk_size=batch_size):
+                batch.append(instance)
+                if len(batch) == batch_size:
+                    index_instances(batch)
+                    total += len(batch)
+                    batch = []
+            index_instances(batch)
+            total += len(batch)
+            self.stdout.write(f"{queryset.model._meta.verbose_name_plural}: {total}")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('item', 'Item'), ('vehicle', 'Vehicle'), ('employee', 'Employee'), ('issue', 'Issue Record'), ('purchase_order', 'Purchase Order'), ('stock_in', 'Stock In'), ('return', 'Returned Item')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['label'],
+                'constraints': [models.UniqueConstraint(fields=('entity_type', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='search.searchentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'entry'], name='search_sear_token_55c349_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """One searchable entity (item, vehicle, employee or document number)."""
+    ENTITY_TYPES = [
+        ("item", "Item"),
+        ("vehicle", "Vehicle"),
+        ("employee", "Employee"),
+        ("issue", "Issue Record"),
+        ("purchase_order", "Purchase Order"),
+        ("stock_in", "Stock In"),
+        ("return", "Returned Item"),
+    ]
+
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES)
+    object_id = models.BigIntegerField()
+    label = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["label"]
+        constraints = [
+            models.UniqueConstraint(fields=["entity_type", "object_id"], name="unique_search_entry"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_type_display()}: {self.label}"
+
+
+class SearchToken(models.Model):
+    """Normalised word of an entry; prefix lookups hit the ``token`` index."""
+    entry = models.ForeignKey(SearchEntry, on_delete=models.CASCADE, related_name="tokens")
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["token", "entry"]),
+        ]
+
+    def __str__(self):
+        return self.token
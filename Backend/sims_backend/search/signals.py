@@ -0,0 +1,40 @@
+# search/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from inventory.models import Item, Vehicle
+from employees.models import Employee
+from item_issuance.models import IssueRecord
+from purchase_order.models import PurchaseOrder
+from stockin.models import StockIn
+from returns.models import ReturnedItem
+from .index import index_instances, remove_instance
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=IssueRecord)
+@receiver(post_save, sender=PurchaseOrder)
+@receiver(post_save, sender=StockIn)
+@receiver(post_save, sender=ReturnedItem)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Keep the typeahead index current whenever an indexed model is saved."""
+    if raw:
+        return
+    related = [instance]
+    # A vehicle's label includes its item name
+    if sender is Item and instance.category == "vehicle":
+        related += list(Vehicle.objects.filter(item=instance).select_related("item"))
+    index_instances(related)
+
+
+@receiver(post_delete, sender=Item)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=IssueRecord)
+@receiver(post_delete, sender=PurchaseOrder)
+@receiver(post_delete, sender=StockIn)
+@receiver(post_delete, sender=ReturnedItem)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_instance(instance)
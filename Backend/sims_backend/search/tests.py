@@ -0,0 +1,130 @@
+import io
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from inventory.importer import import_items
+from inventory.models import Item
+from porequest.consolidation import consolidate_requests
+from porequest.models import PORequest
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem
+from stockin.services import receive_purchase_order
+from users.models import CustomUser
+
+from .index import search, tokenize
+from .models import SearchEntry
+
+
+class SearchEndpointTests(TestCase):
+    """Saves and deletes keep ``/api/search/`` current through the signals."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _labels(self, query, **params):
+        response = self.client.get("/api/search/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(hit["type"], hit["label"]) for hit in response.data["results"]]
+
+    def test_items_are_found_by_prefix_until_renamed_or_deleted(self):
+        # No stock, so no ledger rows protect it from deletion
+        item = Item.objects.create(name="Cement", category="material", unit="bags")
+        self.assertEqual(self._labels("cem"), [("item", "Cement")])
+
+        item.name = "Gravel"
+        item.save()
+        self.assertEqual(self._labels("cem"), [])
+        self.assertEqual(self._labels("GRA"), [("item", "Gravel")])
+
+        item.delete()
+        self.assertEqual(self._labels("gra"), [])
+        self.assertFalse(SearchEntry.objects.exists())
+
+    def test_employees_are_found_by_any_name_or_job_number(self):
+        employee = Employee.objects.create(job_number="J-42", first_name="Ann", last_name="Ole", department="Ops")
+        self.assertEqual(self._labels("ole an"), [("employee", "Ann Ole (J-42)")])
+        self.assertEqual(self._labels("j42"), [("employee", "Ann Ole (J-42)")])
+
+        employee.last_name = "Wanjiru"
+        employee.save()
+        self.assertEqual(self._labels("ole"), [])
+        self.assertEqual(self._labels("wanj"), [("employee", "Ann Wanjiru (J-42)")])
+
+        employee.delete()
+        self.assertEqual(self._labels("ann"), [])
+
+    def test_purchase_orders_are_found_by_number(self):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        self.assertEqual(self._labels(order.order_number.lower()), [("purchase_order", order.order_number)])
+
+        order.order_number = "PO900"
+        order.save()
+        self.assertEqual(self._labels("po9"), [("purchase_order", "PO900")])
+        self.assertEqual(SearchEntry.objects.filter(entity_type="purchase_order").count(), 1)
+
+        order.delete()
+        self.assertEqual(self._labels("po9"), [])
+
+    def test_types_filter_the_results(self):
+        Item.objects.create(name="Ann paint", category="material", unit="tins", quantity_to_add=1)
+        Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.assertEqual(self._labels("ann", types="employee"), [("employee", "Ann Ole (J1)")])
+        self.assertEqual(len(self._labels("ann")), 2)
+
+    def test_prefix_scan_uses_the_token_range(self):
+        self.assertEqual(tokenize("KAA 123A"), ["kaa", "123a", "kaa123a"])
+        Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=1)
+        Item.objects.create(name="Cemented sand", category="material", unit="bags", quantity_to_add=1)
+        Item.objects.create(name="Cell", category="material", unit="pcs", quantity_to_add=1)
+
+        self.assertEqual([hit["label"] for hit in search("ceme")], ["Cement", "Cemented sand"])
+        self.assertEqual(len(search("ce", limit=2)), 2)
+
+    def test_anonymous_requests_are_rejected(self):
+        self.assertEqual(APIClient().get("/api/search/", {"q": "a"}).status_code, 401)
+
+
+class BulkIndexingTests(TestCase):
+    """Bulk writes skip ``post_save``, so each path indexes its own rows."""
+
+    def setUp(self):
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+
+    def _labels(self, entity_type):
+        return sorted(SearchEntry.objects.filter(entity_type=entity_type).values_list("label", flat=True))
+
+    def test_imported_items_and_vehicles(self):
+        body = (
+            "name,category,unit,quantity,reorder_level,unit_cost,plate_number,fuel_type,condition,returnable,uses_fuel\n"
+            "Diesel,fuel,litres,100,,,,,,,\n"
+            "Lorry,vehicle,,,,,KAA 123A,diesel,,,\n"
+        )
+        import_items(io.BytesIO(body.encode()), "items.csv")
+
+        self.assertEqual(self._labels("item"), ["Cement", "Diesel", "Lorry"])
+        self.assertEqual([hit["label"] for hit in search("kaa123")], ["Lorry (KAA 123A)"])
+
+    def test_goods_receipt(self):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        PurchaseOrderItem.objects.create(purchase_order=order, item=self.cement, quantity=5)
+
+        receipts = receive_purchase_order(order)
+
+        self.assertEqual(self._labels("stock_in"), [receipts[0].stock_in_no])
+        self.assertEqual(search(receipts[0].stock_in_no)[0]["type"], "stock_in")
+
+    def test_consolidated_orders(self):
+        PORequest.objects.create(
+            item=self.cement, requested_quantity=Decimal("2"), quantity_in_stock=0,
+            employee=self.employee, order_type="reorder", approval_status="APPROVED",
+        )
+
+        orders = consolidate_requests()
+
+        numbers = list(PurchaseOrder.objects.filter(pk__in=[o["id"] for o in orders]).values_list("order_number", flat=True))
+        self.assertEqual(self._labels("purchase_order"), numbers)
@@ -0,0 +1,27 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+
+from .index import DEFAULT_LIMIT, search
+from .models import SearchEntry
+
+ENTITY_TYPES = {key for key, _ in SearchEntry.ENTITY_TYPES}
+
+
+class SearchView(APIView):
+    """
+    GET /api/search/?q=<text>[&types=item,vehicle][&limit=20]
+    Typeahead over item names, plate numbers, employees and document numbers.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        types = [t for t in request.query_params.get("types", "").split(",") if t in ENTITY_TYPES]
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_LIMIT)), 1), 50)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+
+        return Response({"query": query, "results": search(query, types=types, limit=limit)})
@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class Sequence(models.Model):
+    """Counter behind one document number series (PO, stock-in, return, issue)."""
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=1, help_text="First number not yet handed out.")
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
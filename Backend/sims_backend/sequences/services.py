@@ -0,0 +1,90 @@
+# sequences/services.py
+"""
+Block-allocated document number sequences.
+
+Each series is one ``Sequence`` row holding the next free number. A worker
+reserves a block of numbers with a single UPDATE and hands them out from
+memory, so creating a document needs no read of the document table and two
+workers can never be given the same number. Numbers still unused in a block
+when the process exits are skipped, so series may have gaps.
+"""
+import re
+import threading
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Sequence
+
+BLOCK_SIZE = 20
+
+_blocks = {}  # sequence name -> [next number, end of block)
+_lock = threading.Lock()
+
+
+def next_numbers(name, count=1, start=None):
+    """
+    Take ``count`` numbers from sequence ``name``, in increasing order.
+
+    ``start`` is only called when the sequence is used for the first time and
+    returns the last number already taken, e.g. parsed from existing rows.
+    """
+    numbers = []
+    with _lock:
+        block = _blocks.get(name)
+        while block and block[0] < block[1] and len(numbers) < count:
+            numbers.append(block[0])
+            block[0] += 1
+
+    missing = count - len(numbers)
+    if missing:
+        first, end = _reserve(name, max(missing, BLOCK_SIZE), start)
+        numbers.extend(range(first, first + missing))
+        leftover = [first + missing, end]
+        if leftover[0] < leftover[1]:
+            # Only share the rest of the block once the reservation is
+            # committed; if the caller's transaction rolls back, so does the
+            # reservation and the block must not be used.
+            transaction.on_commit(lambda: _keep(name, leftover))
+    return numbers
+
+
+def next_number(name, start=None):
+    return next_numbers(name, 1, start)[0]
+
+
+def _reserve(name, size, start):
+    """Advance the counter by ``size`` and return the reserved range."""
+    with transaction.atomic():
+        rows = Sequence.objects.filter(name=name)
+        if not rows.update(next_value=F("next_value") + size):
+            _create(name, start)
+            rows.update(next_value=F("next_value") + size)
+        end = rows.values_list("next_value", flat=True).get()
+    return end - size, end
+
+
+def _create(name, start):
+    try:
+        with transaction.atomic():
+            Sequence.objects.create(name=name, next_value=(start() if start else 0) + 1)
+    except IntegrityError:
+        pass  # another worker created it first
+
+
+def _keep(name, block):
+    with _lock:
+        current = _blocks.get(name)
+        if current is None or current[0] >= current[1]:
+            _blocks[name] = block
+
+
+def last_number(queryset, field, prefix):
+    """Largest number used so far in ``field`` values of the form ``<prefix><digits>``."""
+    pattern = re.compile(re.escape(prefix) + r"(\d+)$")
+    largest = 0
+    for value in queryset.filter(**{f"{field}__startswith": prefix}).values_list(field, flat=True).iterator():
+        match = pattern.match(value or "")
+        if match:
+            largest = max(largest, int(match.group(1)))
+    return largest
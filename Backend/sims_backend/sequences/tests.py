@@ -0,0 +1,101 @@
+import threading
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from employees.models import Employee
+from inventory.models import Item
+from item_issuance.models import IssueRecord
+from purchase_order.models import PurchaseOrder
+from returns.models import ReturnedItem
+from stockin.models import StockIn
+from users.models import CustomUser
+
+from . import services
+from .models import Sequence
+from .services import BLOCK_SIZE, next_number, next_numbers
+
+
+class SequenceTests(TestCase):
+    def setUp(self):
+        services._blocks.clear()
+
+    def test_numbers_continue_from_the_start_callback(self):
+        self.assertEqual(next_numbers("test", 3, start=lambda: 41), [42, 43, 44])
+        self.assertEqual(Sequence.objects.get(name="test").next_value, 42 + BLOCK_SIZE)
+
+    def test_committed_block_is_not_handed_out_twice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = next_numbers("test", 5)
+        rest = next_numbers("test", BLOCK_SIZE - 5)
+        after = next_numbers("test", 1)
+
+        numbers = first + rest + after
+        self.assertEqual(numbers, list(range(1, BLOCK_SIZE + 2)))
+        self.assertEqual(Sequence.objects.get(name="test").next_value, 2 * BLOCK_SIZE + 1)
+
+    def test_rolled_back_block_is_not_reused(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.assertEqual(next_numbers("test", 1), [1])
+        # The leftover was never kept, so the next caller reserves a new block
+        self.assertEqual(next_number("test"), BLOCK_SIZE + 1)
+
+    def test_large_requests_reserve_a_block_of_their_size(self):
+        self.assertEqual(next_numbers("test", 50), list(range(1, 51)))
+        self.assertEqual(Sequence.objects.get(name="test").next_value, 51)
+
+
+class DocumentNumberTests(TestCase):
+    """Every document series is drawn from its ``Sequence`` row."""
+
+    def setUp(self):
+        services._blocks.clear()
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.employee = Employee.objects.create(job_number="J1", first_name="Ann", last_name="Ole", department="Ops")
+        self.item = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+
+    def test_purchase_orders_continue_after_existing_numbers(self):
+        PurchaseOrder.objects.bulk_create([PurchaseOrder(order_number="PO7", order_type="reorder")])
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        self.assertEqual(order.order_number, "PO8")
+        self.assertEqual(Sequence.objects.get(name="purchase_order").next_value, 8 + BLOCK_SIZE)
+
+    def test_stock_ins(self):
+        receipt = StockIn.objects.create(item=self.item, quantity=5)
+        self.assertEqual(receipt.stock_in_no, "ST-0001")
+        self.assertTrue(Sequence.objects.filter(name="stock_in").exists())
+
+    def test_issues_and_returns(self):
+        record = IssueRecord.objects.create(issued_to=self.employee, issued_by=self.user, issue_type="material")
+        self.assertEqual(record.issue_id, "ISSUE-0000001")
+        self.assertEqual(ReturnedItem.allocate_numbers(2), ["RT1", "RT2"])
+        self.assertEqual(set(Sequence.objects.values_list("name", flat=True)), {"issue", "return"})
+
+
+class ConcurrentSequenceTests(TransactionTestCase):
+    WORKERS = 20
+
+    def setUp(self):
+        services._blocks.clear()
+
+    def test_concurrent_workers_get_unique_numbers(self):
+        barrier = threading.Barrier(self.WORKERS)
+        taken = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(3):
+                    with transaction.atomic():
+                        taken.extend(next_numbers("test", 7))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(taken), self.WORKERS * 3 * 7)
+        self.assertEqual(len(set(taken)), len(taken))
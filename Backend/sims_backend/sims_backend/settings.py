@@ -45,6 +45,9 @@ INSTALLED_APPS = [
     'WriteReport',
     'StockQuantity',
     'porequest',
+    'search',
+    'valuation',
+    'sequences',
 ]
 
 # Middleware
@@ -178,6 +181,16 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache shared by every worker process, so invalidating the demand forecast
+# or a vehicle's fuel series after a write is seen by all of them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+        'KEY_PREFIX': 'sims',
+    },
+}
+
 # JWT WebSocket authentication
 CHANNELS_WS_PROTOCOLS = ["websocket"]
 
@@ -0,0 +1,71 @@
+# sims_backend/tracking.py
+"""
+Field-change tracking for models.
+
+A model lists the fields it cares about in ``tracked_fields``. Their values
+are snapshotted when an instance is loaded from the database and again after
+every save, so ``has_changed()`` and ``previous()`` answer from memory
+instead of re-reading the row. ``post_save`` receivers still see the values
+from before the save; the snapshot is only refreshed once they have run.
+"""
+import copy
+
+from django.db import models
+
+
+class FieldTrackerMixin(models.Model):
+    tracked_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked()
+        return instance
+
+    def _tracked_attname(self, field):
+        return self._meta.get_field(field).attname
+
+    def _snapshot_tracked(self, fields=None):
+        if not hasattr(self, "_tracked_snapshot"):
+            self._tracked_snapshot = {}
+        loaded = self.__dict__
+        for field in fields or self.tracked_fields:
+            if field not in self.tracked_fields:
+                continue
+            attname = self._tracked_attname(field)
+            # Deferred fields are left out and looked up on demand
+            if attname in loaded:
+                self._tracked_snapshot[field] = copy.deepcopy(loaded[attname])
+
+    def previous(self, field):
+        """Value of ``field`` when the instance was loaded or last saved; None if never saved."""
+        if field not in self.tracked_fields:
+            raise ValueError(f"{field} is not tracked on {type(self).__name__}")
+        if self.pk is None:
+            return None
+
+        snapshot = getattr(self, "_tracked_snapshot", {})
+        if field not in snapshot:
+            # Only reached for deferred fields or instances built with an explicit pk
+            snapshot[field] = type(self)._base_manager.filter(pk=self.pk).values_list(
+                self._tracked_attname(field), flat=True
+            ).first()
+            self._tracked_snapshot = snapshot
+        return snapshot[field]
+
+    def has_changed(self, field):
+        """True when ``field`` differs from ``previous(field)``, or the instance is new."""
+        if self.pk is None:
+            return True
+        return getattr(self, self._tracked_attname(field)) != self.previous(field)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_tracked(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_tracked(fields)
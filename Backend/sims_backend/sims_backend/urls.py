@@ -18,6 +18,8 @@ urlpatterns = [
     path("api/", include("WriteReport.urls")),
     path('api/stockquantity/', include('StockQuantity.urls')),
     path("api/porequests/", include("porequest.urls")),
+    path("api/search/", include("search.urls")),
+    path("api/valuation/", include("valuation.urls")),
 ]
 
 #  serve uploaded invoice PDFs
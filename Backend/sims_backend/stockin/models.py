@@ -2,11 +2,15 @@ from django.db import models
 from django.utils import timezone
 from inventory.models import Item
 from django.conf import settings
+from sequences.services import last_number, next_numbers
+from sims_backend.tracking import FieldTrackerMixin
 
 
 
 
-class StockIn(models.Model):
+class StockIn(FieldTrackerMixin, models.Model):
+    tracked_fields = ("date_added",)
+
     stock_in_no = models.CharField(max_length=50, unique=True, editable=False)
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="stock_ins")
     quantity = models.PositiveIntegerField()
@@ -23,19 +27,14 @@ class StockIn(models.Model):
     def save(self, *args, **kwargs):
         # ✅ Generate a sequential stock_in_no if not set
         if not self.stock_in_no:
-            last_record = StockIn.objects.order_by('id').last()
-            if last_record and last_record.stock_in_no.startswith('ST-'):
-                try:
-                    last_number = int(last_record.stock_in_no.split('-')[1])
-                except (IndexError, ValueError):
-                    last_number = 0
-                new_number = last_number + 1
-            else:
-                new_number = 1
-
-            # Format as ST-0001, ST-0002, etc.
-            self.stock_in_no = f"ST-{new_number:04d}"
+            self.stock_in_no = StockIn.allocate_numbers()[0]
         super().save(*args, **kwargs)
 
+    @classmethod
+    def allocate_numbers(cls, count=1):
+        """Reserve the next ``count`` stock-in numbers, formatted ST-0001, ST-0002, etc."""
+        numbers = next_numbers("stock_in", count, start=lambda: last_number(cls.objects, "stock_in_no", "ST-"))
+        return [f"ST-{n:04d}" for n in numbers]
+
     def __str__(self):
         return f"{self.stock_in_no} - {self.item.name}"
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import StockIn
 from inventory.models import Item
+from inventory.services import receive_stock
+from django.db import transaction
 
 class StockInSerializer(serializers.ModelSerializer):
     item_display = serializers.CharField(source="item.name", read_only=True)
@@ -20,21 +22,12 @@ class StockInSerializer(serializers.ModelSerializer):
         item = validated_data["item"]
         quantity = validated_data.get("quantity", 0)
 
-        # 🔹 Update item stock
-        item.quantity_in_stock += quantity
-        item.save()
-
         # 🔹 Generate stock number
-        last_stock = StockIn.objects.order_by("id").last()
-        next_number = 1
-        if last_stock:
-            try:
-                last_num = int(last_stock.stock_in_no.split("-")[1])
-                next_number = last_num + 1
-            except (IndexError, ValueError):
-                pass
-
-        stock_in_no = f"ST-{next_number:04d}"
+        stock_in_no = StockIn.allocate_numbers()[0]
         validated_data["stock_in_no"] = stock_in_no
 
-        return StockIn.objects.create(**validated_data)
+        with transaction.atomic():
+            # 🔹 Update item stock before the record is created so the
+            # stock-in notification reports the new balance
+            receive_stock(item, quantity, reference=stock_in_no, user=validated_data.get("created_by"))
+            return StockIn.objects.create(**validated_data)
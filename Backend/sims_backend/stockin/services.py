@@ -0,0 +1,78 @@
+# stockin/services.py
+"""
+Goods receipts for delivered purchase orders.
+
+A delivery becomes one ``StockIn`` row per item on the order. Their numbers
+are reserved in one block, the rows are written with one ``bulk_create`` and
+stock goes up through ``receive_stock_bulk``, priced at the MD-approved
+supplier's unit price.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from inventory.services import receive_stock_bulk
+from purchase_order.models import PurchaseOrderItem, PurchaseOrderItemSupplier
+from reports.models import Report
+from search.index import index_instances
+from .models import StockIn
+
+
+def receive_purchase_order(purchase_order, user=None):
+    """
+    Put every line of ``purchase_order`` into stock. Lines for the same item
+    are combined. Returns the created ``StockIn`` rows with their items, in
+    line order; empty when the order has no stock lines.
+    """
+    approved_price = PurchaseOrderItemSupplier.objects.filter(
+        order_item=OuterRef("pk"), approved_by_md=True
+    ).values("amount_per_unit")[:1]
+    lines = (
+        PurchaseOrderItem.objects.filter(purchase_order=purchase_order)
+        .exclude(item__category="vehicle")
+        .annotate(unit_price=Subquery(approved_price))
+        .order_by("pk")
+        .values_list("item_id", "quantity", "unit_price")
+    )
+
+    quantities, unit_costs = {}, {}
+    for item_id, quantity, unit_price in lines:
+        quantities[item_id] = quantities.get(item_id, 0) + quantity
+        if unit_price is not None:
+            unit_costs[item_id] = unit_price
+    if not quantities:
+        return []
+
+    remarks = f"Goods receipt for purchase order {purchase_order.order_number}"
+    with transaction.atomic():
+        numbers = StockIn.allocate_numbers(len(quantities))
+        StockIn.objects.bulk_create([
+            StockIn(stock_in_no=number, item_id=item_id, quantity=quantity, remarks=remarks, created_by=user)
+            for number, (item_id, quantity) in zip(numbers, quantities.items())
+        ])
+        receive_stock_bulk(
+            quantities,
+            reference=purchase_order.order_number,
+            user=user,
+            note=f"{numbers[0]} to {numbers[-1]}" if len(numbers) > 1 else numbers[0],
+            unit_costs=unit_costs,
+        )
+
+        # Backends such as MySQL do not return ids from bulk inserts
+        receipts = list(
+            StockIn.objects.filter(stock_in_no__in=numbers).select_related("item").order_by("pk")
+        )
+        index_instances(receipts)
+        # bulk_create skips the post_save hook that logs each stock-in
+        Report.objects.bulk_create([
+            Report(report_type="stock_in", stock_in=receipt, created_by=user) for receipt in receipts
+        ])
+    return receipts
+
+
+def receipt_summary(receipts):
+    """One line describing a goods receipt, with each item's new balance."""
+    return "; ".join(
+        f"{receipt.quantity} {receipt.item.unit} of {receipt.item.name.capitalize()} "
+        f"(now {receipt.item.quantity_in_stock} {receipt.item.unit})"
+        for receipt in receipts
+    )
@@ -1,3 +1,77 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from inventory.models import Fuel, Item, StockMovement, Vehicle
+from notifications_app.models import Notification
+from purchase_order.models import PurchaseOrder, PurchaseOrderItem, PurchaseOrderItemSupplier
+from reports.models import Report
+from users.models import CustomUser
+from valuation.models import CostLayer
+
+from .models import StockIn
+from .services import receive_purchase_order
+
+
+class GoodsReceiptTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="sm", email="sm@example.com", role="StoreManager", password="x")
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags", quantity_to_add=10)
+        self.sand = Item.objects.create(name="Sand", category="material", unit="tonnes")
+        diesel = Item.objects.create(name="Diesel", category="fuel", unit="litres")
+        self.lorry = Item.objects.create(name="Lorry", category="vehicle", unit="unit")
+        Vehicle.objects.create(item=self.lorry, plate_number="KAA 1", fuel_type=Fuel.objects.create(item=diesel))
+
+        self.order = PurchaseOrder.objects.create(order_type="reorder")
+        self._line(self.cement, 5, price="9.50")
+        self._line(self.cement, 3)
+        self._line(self.sand, 2, price=40)
+        self._line(self.lorry, 1, price=1000)
+        # Approved and paid; delivery is what is under test
+        PurchaseOrder.objects.filter(pk=self.order.pk).update(
+            approval_status="approved", approved_account="petty_cash", payment_status="paid",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _line(self, item, quantity, price=None):
+        line = PurchaseOrderItem.objects.create(purchase_order=self.order, item=item, quantity=quantity)
+        if price is not None:
+            PurchaseOrderItemSupplier.objects.create(
+                order_item=line, supplier_name="Acme", amount_per_unit=price, approved_by_md=True
+            )
+
+    def test_delivery_puts_the_order_into_stock(self):
+        response = self.client.post(f"/api/purchase-orders/{self.order.pk}/mark_delivered/", {}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        receipts = StockIn.objects.filter(remarks__contains=self.order.order_number).order_by("pk")
+        # Lines of the same item are combined; vehicles are not stock
+        self.assertEqual([(r.item_id, r.quantity) for r in receipts], [(self.cement.pk, 8), (self.sand.pk, 2)])
+        self.assertEqual(len({r.stock_in_no for r in receipts}), 2)
+
+        self.cement.refresh_from_db()
+        self.assertEqual(self.cement.quantity_in_stock, Decimal("18"))
+        movement = StockMovement.objects.get(item=self.sand, movement_type=StockMovement.RECEIPT)
+        self.assertEqual(movement.reference, self.order.order_number)
+        # Priced at the approved supplier's unit price
+        self.assertEqual(CostLayer.objects.get(movement=movement).unit_cost, Decimal("40"))
+        self.assertEqual(Report.objects.filter(report_type="stock_in", stock_in__in=receipts).count(), 2)
+
+        note = Notification.objects.get(user=self.user, message__contains="has been delivered")
+        self.assertIn("8 bags of Cement (now 18.00 bags)", note.message)
+
+    def test_repeated_delivery_receives_nothing_more(self):
+        url = f"/api/purchase-orders/{self.order.pk}/mark_delivered/"
+        self.client.post(url, {}, format="json")
+
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, 400)
+        self.assertEqual(StockIn.objects.count(), 2)
+
+    def test_order_without_stock_lines(self):
+        order = PurchaseOrder.objects.create(order_type="reorder")
+        PurchaseOrderItem.objects.create(purchase_order=order, item=self.lorry, quantity=1)
 
-# Create your tests here.
+        self.assertEqual(receive_purchase_order(order), [])
+        self.assertFalse(StockIn.objects.exists())
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import CostLayer, ItemCost, IssueCost
+
+
+@admin.register(ItemCost)
+class ItemCostAdmin(admin.ModelAdmin):
+    list_display = ("item", "quantity", "average_cost", "average_value", "fifo_value")
+    list_select_related = ("item",)
+    search_fields = ("item__name",)
+
+
+@admin.register(CostLayer)
+class CostLayerAdmin(admin.ModelAdmin):
+    list_display = ("item", "reference", "unit_cost", "quantity", "remaining_quantity", "created_at")
+    list_select_related = ("item",)
+    search_fields = ("item__name", "reference")
+
+
+@admin.register(IssueCost)
+class IssueCostAdmin(admin.ModelAdmin):
+    list_display = ("item", "reference", "quantity", "fifo_cost", "average_cost", "created_at")
+    list_select_related = ("item",)
+    search_fields = ("item__name", "reference")
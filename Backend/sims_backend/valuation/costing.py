@@ -0,0 +1,196 @@
+# valuation/costing.py
+"""
+Incremental stock valuation.
+
+``inventory.services`` hands every posted stock movement to this module in
+the same transaction. Receipts open a FIFO ``CostLayer`` and move the
+weighted average; issues consume the oldest open layers and are recorded as
+an ``IssueCost``. ``ItemCost`` carries the running totals, so valuation and
+cost-of-issues reports never replay the ledger.
+
+Receipts without an explicit unit cost are costed at the approved supplier
+price on the item's most recent purchase order, falling back to the current
+average. Returns come back at the current average.
+"""
+from decimal import Decimal
+
+from inventory.models import StockMovement
+from purchase_order.models import PurchaseOrderItemSupplier
+from .models import CostLayer, IssueCost, ItemCost
+
+ZERO = Decimal("0")
+COST_PLACES = Decimal("0.0001")
+STATE_FIELDS = ["quantity", "average_cost", "average_value", "fifo_value"]
+
+
+def to_cost(value):
+    return Decimal(str(value)).quantize(COST_PLACES)
+
+
+def last_purchase_costs(item_ids):
+    """Approved supplier unit price on the latest purchase order of each item."""
+    costs = {}
+    rows = (
+        PurchaseOrderItemSupplier.objects.filter(order_item__item_id__in=item_ids, approved_by_md=True)
+        .order_by("-order_item__purchase_order_id", "-id")
+        .values_list("order_item__item_id", "amount_per_unit")
+    )
+    for item_id, amount in rows:
+        costs.setdefault(item_id, amount)
+    return costs
+
+
+# ----------------------------- STATE -----------------------------
+
+def _lock_states(movements):
+    """
+    Lock the running totals of every item in ``movements``.
+
+    Items seen for the first time are seeded with one opening layer holding
+    the stock they had before the movement. Returns ``(states, new_ids)``.
+    """
+    item_ids = list({m.item_id for m in movements})
+    states = ItemCost.objects.select_for_update().in_bulk(item_ids)
+
+    first = {}
+    for movement in movements:
+        if movement.item_id not in states:
+            first.setdefault(movement.item_id, movement)
+    if not first:
+        return states, set()
+
+    purchase_costs = last_purchase_costs(list(first))
+    layers = []
+    for item_id, movement in first.items():
+        state = states[item_id] = ItemCost(item_id=item_id)
+        opening = movement.balance_after - movement.quantity
+        if opening > 0:
+            unit_cost = to_cost(purchase_costs.get(item_id, ZERO))
+            layers.append(CostLayer(
+                item_id=item_id, reference="Opening valuation", unit_cost=unit_cost,
+                quantity=opening, remaining_quantity=opening,
+            ))
+            state.quantity = opening
+            state.average_cost = unit_cost
+            state.average_value = state.fifo_value = opening * unit_cost
+    CostLayer.objects.bulk_create(layers)
+    return states, set(first)
+
+
+def _save_states(states, new_ids):
+    ItemCost.objects.bulk_create([states[pk] for pk in new_ids])
+    ItemCost.objects.bulk_update([s for pk, s in states.items() if pk not in new_ids], STATE_FIELDS)
+
+
+# ----------------------------- MOVEMENTS -----------------------------
+
+def record_movement(movement, unit_cost=None):
+    """Cost one posted movement. Must run inside the movement's transaction."""
+    if movement.quantity > 0:
+        record_receipts([movement], {movement.item_id: unit_cost} if unit_cost is not None else None)
+    elif movement.quantity < 0:
+        record_issue(movement)
+
+
+def record_receipts(movements, unit_costs=None):
+    """Open one cost layer per receipt, locking and saving each item's totals once."""
+    unit_costs = unit_costs or {}
+    states, new_ids = _lock_states(movements)
+    purchase_costs = last_purchase_costs([
+        m.item_id for m in movements
+        if m.item_id not in unit_costs and m.movement_type != StockMovement.RETURN
+    ])
+
+    layers = []
+    for movement in movements:
+        state = states[movement.item_id]
+        unit_cost = unit_costs.get(movement.item_id)
+        if unit_cost is None:
+            unit_cost = purchase_costs.get(movement.item_id, state.average_cost)
+        unit_cost = to_cost(unit_cost)
+
+        layers.append(CostLayer(
+            item_id=movement.item_id,
+            movement=movement if movement.pk else None,
+            reference=movement.reference,
+            unit_cost=unit_cost,
+            quantity=movement.quantity,
+            remaining_quantity=movement.quantity,
+        ))
+        value = movement.quantity * unit_cost
+        state.quantity += movement.quantity
+        state.average_value += value
+        state.fifo_value += value
+        state.average_cost = to_cost(state.average_value / state.quantity)
+
+    CostLayer.objects.bulk_create(layers)
+    _save_states(states, new_ids)
+
+
+def record_issue(movement):
+    """Consume FIFO layers for an outgoing movement and record its cost."""
+    quantity = -movement.quantity
+    states, new_ids = _lock_states([movement])
+    state = states[movement.item_id]
+
+    fifo_cost, remaining, consumed = ZERO, quantity, []
+    layers = CostLayer.objects.select_for_update().filter(
+        item_id=movement.item_id, remaining_quantity__gt=0
+    ).order_by("id")
+    for layer in layers:
+        taken = min(layer.remaining_quantity, remaining)
+        layer.remaining_quantity -= taken
+        fifo_cost += taken * layer.unit_cost
+        remaining -= taken
+        consumed.append(layer)
+        if not remaining:
+            break
+    CostLayer.objects.bulk_update(consumed, ["remaining_quantity"])
+    # Layers can only run short if stock was changed outside the services
+    fifo_cost += remaining * state.average_cost
+
+    if quantity >= state.quantity:
+        average_cost = state.average_value
+    else:
+        average_cost = quantity * state.average_cost
+
+    state.quantity -= quantity
+    state.average_value -= average_cost
+    state.fifo_value -= fifo_cost
+    if state.quantity <= 0:
+        state.quantity = state.average_value = state.fifo_value = ZERO
+    _save_states(states, new_ids)
+
+    return IssueCost.objects.create(
+        item_id=movement.item_id,
+        movement=movement if movement.pk else None,
+        reference=movement.reference,
+        quantity=quantity,
+        fifo_cost=fifo_cost,
+        average_cost=average_cost,
+    )
+
+
+# ----------------------------- BULK -----------------------------
+
+def open_valuations(items, unit_costs=None, reference="Opening balance (bulk import)"):
+    """Start valuation for items that have no cost history yet, at their current stock."""
+    unit_costs = unit_costs or {}
+    layers, states = [], []
+    for item in items:
+        if item.category == "vehicle":
+            continue
+        unit_cost = to_cost(unit_costs.get(item.pk) or ZERO)
+        quantity = item.quantity_in_stock or ZERO
+        value = quantity * unit_cost
+        states.append(ItemCost(
+            item_id=item.pk, quantity=quantity, average_cost=unit_cost,
+            average_value=value, fifo_value=value,
+        ))
+        if quantity > 0:
+            layers.append(CostLayer(
+                item_id=item.pk, reference=reference, unit_cost=unit_cost,
+                quantity=quantity, remaining_quantity=quantity,
+            ))
+    CostLayer.objects.bulk_create(layers)
+    ItemCost.objects.bulk_create(states)
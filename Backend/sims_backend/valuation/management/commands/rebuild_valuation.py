@@ -0,0 +1,27 @@
+# valuation/management/commands/rebuild_valuation.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.models import Item
+from valuation.costing import last_purchase_costs, open_valuations
+from valuation.models import CostLayer, ItemCost, IssueCost
+
+
+class Command(BaseCommand):
+    help = (
+        "Restart stock valuation from current stock: one opening layer per item at its "
+        "last approved purchase price, or its current average cost. Existing layers and "
+        "issue costs are discarded."
+    )
+
+    def handle(self, *args, **options):
+        items = list(Item.objects.exclude(category="vehicle").only("id", "category", "quantity_in_stock"))
+        unit_costs = dict(ItemCost.objects.values_list("item_id", "average_cost"))
+        unit_costs.update(last_purchase_costs([item.pk for item in items]))
+
+        with transaction.atomic():
+            IssueCost.objects.all().delete()
+            CostLayer.objects.all().delete()
+            ItemCost.objects.all().delete()
+            open_valuations(items, unit_costs, reference="Opening valuation")
+        self.stdout.write(self.style.SUCCESS(f"Valuation restarted for {len(items)} items."))
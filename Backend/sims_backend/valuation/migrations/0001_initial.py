@@ -0,0 +1,60 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0012_lowstockitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCost',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cost', serialize=False, to='inventory.item')),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('average_cost', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('average_value', models.DecimalField(decimal_places=4, default=0, max_digits=16)),
+                ('fifo_value', models.DecimalField(decimal_places=4, default=0, max_digits=16)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CostLayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(blank=True, default='', max_length=100)),
+                ('unit_cost', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('remaining_quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cost_layers', to='inventory.item')),
+                ('movement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cost_layers', to='inventory.stockmovement')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['item', 'remaining_quantity'], name='valuation_c_item_id_dbcb33_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueCost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(blank=True, default='', max_length=100)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('fifo_cost', models.DecimalField(decimal_places=4, max_digits=16)),
+                ('average_cost', models.DecimalField(decimal_places=4, max_digits=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='issue_costs', to='inventory.item')),
+                ('movement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='issue_costs', to='inventory.stockmovement')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['created_at'], name='valuation_i_created_9e5fc3_idx'), models.Index(fields=['item', 'created_at'], name='valuation_i_item_id_b1fca2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+
+from inventory.models import Item, StockMovement
+
+
+class CostLayer(models.Model):
+    """Stock received at one unit cost. Issues consume the oldest open layers first (FIFO)."""
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="cost_layers")
+    movement = models.ForeignKey(
+        StockMovement, on_delete=models.PROTECT, null=True, blank=True, related_name="cost_layers"
+    )
+    reference = models.CharField(max_length=100, blank=True, default="")
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    remaining_quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["item", "remaining_quantity"]),
+        ]
+
+    def __str__(self):
+        return f"{self.item.name}: {self.remaining_quantity}/{self.quantity} @ {self.unit_cost}"
+
+
+class ItemCost(models.Model):
+    """
+    Running valuation of one item under both costing methods.
+
+    Updated with every stock movement, so valuing the store reads one row per
+    item instead of replaying the ledger.
+    """
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, primary_key=True, related_name="cost")
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    average_cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    average_value = models.DecimalField(max_digits=16, decimal_places=4, default=0)
+    fifo_value = models.DecimalField(max_digits=16, decimal_places=4, default=0)
+
+    def __str__(self):
+        return f"{self.item.name}: {self.quantity} valued {self.average_value:.2f} (avg) / {self.fifo_value:.2f} (FIFO)"
+
+
+class IssueCost(models.Model):
+    """Cost of the goods taken out by one stock movement, under both methods."""
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name="issue_costs")
+    movement = models.ForeignKey(
+        StockMovement, on_delete=models.PROTECT, null=True, blank=True, related_name="issue_costs"
+    )
+    reference = models.CharField(max_length=100, blank=True, default="")
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    fifo_cost = models.DecimalField(max_digits=16, decimal_places=4)
+    average_cost = models.DecimalField(max_digits=16, decimal_places=4)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["item", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} of {self.item.name}: {self.fifo_cost:.2f} (FIFO)"
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Item
+from inventory.services import issue_stock, receive_stock
+from users.models import CustomUser
+
+from .models import CostLayer, IssueCost, ItemCost
+
+
+class CostingTests(TestCase):
+    def setUp(self):
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        receive_stock(self.cement, 10, unit_cost=5)
+        receive_stock(self.cement, 10, unit_cost=7)
+
+    def test_fifo_and_average_cost_of_an_issue(self):
+        issue_stock(self.cement, 15)
+
+        cost = IssueCost.objects.get(item=self.cement)
+        self.assertEqual((cost.quantity, cost.fifo_cost, cost.average_cost), (15, Decimal("85"), Decimal("90")))
+        self.assertEqual(
+            list(CostLayer.objects.filter(item=self.cement).values_list("remaining_quantity", flat=True)), [0, 5]
+        )
+        state = ItemCost.objects.get(item=self.cement)
+        self.assertEqual((state.quantity, state.fifo_value, state.average_value), (5, Decimal("35"), Decimal("30")))
+
+    def test_issue_larger_than_the_open_layers(self):
+        # Stock raised outside the services has no layer behind it
+        Item.objects.filter(pk=self.cement.pk).update(quantity_in_stock=F("quantity_in_stock") + 5)
+        self.cement.refresh_from_db()
+
+        issue_stock(self.cement, 25)
+
+        cost = IssueCost.objects.get(item=self.cement)
+        # 10@5 + 10@7, the 5 uncovered units at the average of 6
+        self.assertEqual(cost.fifo_cost, Decimal("150"))
+        self.assertEqual(cost.average_cost, Decimal("120"))
+        self.assertFalse(CostLayer.objects.filter(item=self.cement, remaining_quantity__gt=0).exists())
+        state = ItemCost.objects.get(item=self.cement)
+        self.assertEqual((state.quantity, state.fifo_value, state.average_value), (0, 0, 0))
+
+
+class ValuationEndpointTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create(username="md", email="md@example.com", role="ManagingDirector", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.cement = Item.objects.create(name="Cement", category="material", unit="bags")
+        self.hammer = Item.objects.create(name="Hammer", category="tool", unit="pcs")
+        receive_stock(self.cement, 10, unit_cost=5)
+        receive_stock(self.cement, 10, unit_cost=7)
+        receive_stock(self.hammer, 2, unit_cost="12.50")
+        issue_stock(self.cement, 15)
+
+    def test_inventory_valuation(self):
+        response = self.client.get("/api/valuation/inventory/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_fifo_value"], Decimal("60.00"))
+        self.assertEqual(response.data["total_average_value"], Decimal("55.00"))
+        rows = {row["name"]: row for row in response.data["items"]}
+        self.assertEqual((rows["Cement"]["quantity"], rows["Cement"]["average_cost"]), (5, Decimal("6")))
+
+        tools = self.client.get("/api/valuation/inventory/", {"category": "tool"}).data["items"]
+        self.assertEqual([row["name"] for row in tools], ["Hammer"])
+
+    def test_cost_of_issues(self):
+        today = str(timezone.localdate())
+        response = self.client.get("/api/valuation/cost-of-issues/", {"from": today, "to": today})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_fifo_cost"], Decimal("85.00"))
+        self.assertEqual(response.data["total_average_cost"], Decimal("90.00"))
+        self.assertEqual(response.data["items"][0]["quantity"], 15)
+
+        self.assertEqual(self.client.get("/api/valuation/cost-of-issues/", {"item": self.hammer.pk}).data["items"], [])
+        self.assertEqual(self.client.get("/api/valuation/cost-of-issues/", {"from": "01/01/2026"}).status_code, 400)
+
+    def test_anonymous_requests_are_rejected(self):
+        self.assertEqual(APIClient().get("/api/valuation/inventory/").status_code, 401)
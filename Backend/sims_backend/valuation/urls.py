@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import InventoryValuationView, CostOfIssuesView
+
+urlpatterns = [
+    path("inventory/", InventoryValuationView.as_view(), name="inventory-valuation"),
+    path("cost-of-issues/", CostOfIssuesView.as_view(), name="cost-of-issues"),
+]
@@ -0,0 +1,101 @@
+# valuation/views.py
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import ItemCost, IssueCost
+
+CENTS = Decimal("0.01")
+
+
+def _money(value):
+    return (value or Decimal("0")).quantize(CENTS)
+
+
+def _parse_day(value, end=False):
+    day = datetime.strptime(value, "%Y-%m-%d").date()
+    return timezone.make_aware(datetime.combine(day, time.max if end else time.min))
+
+
+# ==========================================================
+#                 INVENTORY VALUATION
+# ==========================================================
+class InventoryValuationView(APIView):
+    """Current stock value per item under weighted-average and FIFO costing."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        rows = ItemCost.objects.filter(quantity__gt=0).order_by("item__name")
+        category = request.query_params.get("category")
+        if category and category != "all":
+            rows = rows.filter(item__category=category)
+
+        items = [
+            {
+                "item_id": row["item_id"],
+                "name": row["item__name"].capitalize(),
+                "category": row["item__category"],
+                "unit": row["item__unit"],
+                "quantity": row["quantity"],
+                "average_cost": row["average_cost"],
+                "average_value": _money(row["average_value"]),
+                "fifo_value": _money(row["fifo_value"]),
+            }
+            for row in rows.values(
+                "item_id", "item__name", "item__category", "item__unit",
+                "quantity", "average_cost", "average_value", "fifo_value",
+            )
+        ]
+        return Response({
+            "total_average_value": _money(sum((i["average_value"] for i in items), Decimal("0"))),
+            "total_fifo_value": _money(sum((i["fifo_value"] for i in items), Decimal("0"))),
+            "items": items,
+        })
+
+
+# ==========================================================
+#                   COST OF ISSUES
+# ==========================================================
+class CostOfIssuesView(APIView):
+    """Cost of goods issued per item, optionally between ``from`` and ``to`` (YYYY-MM-DD)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        costs = IssueCost.objects.all()
+        try:
+            if request.query_params.get("from"):
+                costs = costs.filter(created_at__gte=_parse_day(request.query_params["from"]))
+            if request.query_params.get("to"):
+                costs = costs.filter(created_at__lte=_parse_day(request.query_params["to"], end=True))
+        except ValueError:
+            return Response({"error": "Dates must be in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+        if request.query_params.get("item"):
+            costs = costs.filter(item_id=request.query_params["item"])
+
+        rows = (
+            costs.values("item_id", "item__name", "item__unit")
+            .annotate(quantity=Sum("quantity"), fifo_cost=Sum("fifo_cost"), average_cost=Sum("average_cost"))
+            .order_by("item__name")
+        )
+        items = [
+            {
+                "item_id": row["item_id"],
+                "name": row["item__name"].capitalize(),
+                "unit": row["item__unit"],
+                "quantity": row["quantity"],
+                "fifo_cost": _money(row["fifo_cost"]),
+                "average_cost": _money(row["average_cost"]),
+            }
+            for row in rows
+        ]
+        return Response({
+            "total_fifo_cost": _money(sum((i["fifo_cost"] for i in items), Decimal("0"))),
+            "total_average_cost": _money(sum((i["average_cost"] for i in items), Decimal("0"))),
+            "items": items,
+        })